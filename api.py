@@ -6,17 +6,32 @@ Website: www.thedatasensei.com
 Year: 2025
 """
 
-import csv
-import io
-from datetime import datetime
+import asyncio
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel
 
 from main import process_video
+from src.youtube_processor.config import settings
+from src.youtube_processor.core.ingest import (
+    ingest_stream,
+    ingest_upload,
+    remove_stale_uploads,
+    remove_upload,
+)
+from src.youtube_processor.core.jobs import JobRunner, JobStore
+from src.youtube_processor.exceptions import JobQueueFullError, ValidationError
+from src.youtube_processor.models import IngestedFile, JobItemState, JobState
+from src.youtube_processor.utils.manifest import ManifestLoader, manifest_format
 
 app = FastAPI(
     title="YouTube Video Automation API",
@@ -31,6 +46,8 @@ app = FastAPI(
 
 # Constants
 TEMPLATE_PATH = Path("templates/batch_upload_template.csv")
+SSE_KEEPALIVE_INTERVAL = 15.0  # seconds between comments on an idle stream
+MULTIPART_OVERHEAD = 1024 * 1024  # Form fields and part headers around a file
 
 
 # Models for request/response
@@ -57,36 +74,66 @@ class BatchProcessingResponse(BaseModel):
     processed_videos: int = 0
     failed_videos: int = 0
     errors: List[str] = []
+    items: List[JobItemState] = []
+
+    @classmethod
+    def from_job(cls, job: JobState) -> "BatchProcessingResponse":
+        """Build the response from a stored job."""
+        return cls(
+            job_id=job.job_id,
+            status=job.status,
+            total_videos=job.total,
+            processed_videos=job.succeeded,
+            failed_videos=job.failed,
+            errors=[
+                f"Error processing {item.label}: {item.error}"
+                for item in job.items
+                if item.status == JobStore.FAILED
+            ],
+            items=job.items,
+        )
 
 
-# Store batch processing jobs
-batch_jobs: Dict[str, BatchProcessingResponse] = {}
+# Batch jobs live in SQLite, shared by every API worker and kept across restarts
+job_store = JobStore()
 
 
-async def process_batch(
-    job_id: str,
-    videos: List[BatchVideoRequest],
-) -> None:
-    """Process a batch of videos in the background."""
-    job = batch_jobs[job_id]
-
-    for video in videos:
-        try:
-            # Process video
-            process_video(
-                input_path=video.input_path,
-                title=video.title,
-                description=video.description,
-                tags=video.tags,
-                publish_time=video.publish_time,
-                is_youtube_url=video.is_youtube_url,
-            )
-            job.processed_videos += 1
-        except Exception as e:
-            job.failed_videos += 1
-            job.errors.append(f"Error processing {video.input_path}: {str(e)}")
+def process_job_item(upload_path: Optional[str] = None, **item) -> Optional[str]:
+    """Process one job item, then remove the upload it was made from."""
+    try:
+        return process_video(**item)
+    finally:
+        if upload_path:
+            remove_upload(Path(upload_path))
+
+
+# Processing runs on worker threads, never on the event loop
+job_runner = JobRunner(job_store, process_job_item, progress=True)
+
+# Uploads of jobs that never ran, e.g. because the server was killed; those
+# of jobs that are still queued or running are picked up again
+remove_stale_uploads(
+    keep=[
+        Path(item["upload_path"])
+        for item in job_store.unfinished_items()
+        if item.get("upload_path")
+    ]
+)
 
-    job.status = "completed"
+
+def submit_job(items: List[Dict]) -> JobState:
+    """Store a job, queue it for the workers and return its initial state."""
+    job_id = job_store.create_job(items)
+    try:
+        job_runner.submit(job_id)
+    except JobQueueFullError as e:
+        job_store.finish_job(job_id, status="rejected")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.details["retry_after"])},
+        ) from e
+    return job_store.get_job(job_id)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -248,7 +295,7 @@ async def root() -> str:
                 </div>
                 <div class="endpoint">
                     <span class="method">POST</span> <code>/process</code>
-                    <p>Process and upload a single video</p>
+                    <p>Queue a single video for processing and upload</p>
                 </div>
                 <div class="endpoint">
                     <span class="method">POST</span> <code>/batch/process</code>
@@ -256,12 +303,16 @@ async def root() -> str:
                 </div>
                 <div class="endpoint">
                     <span class="method">POST</span> <code>/batch/csv</code>
-                    <p>Process videos from CSV file</p>
+                    <p>Process videos from a CSV, JSONL or Parquet manifest</p>
                 </div>
                 <div class="endpoint">
                     <span class="method">GET</span> <code>/batch/status/{job_id}</code>
                     <p>Check batch processing status</p>
                 </div>
+                <div class="endpoint">
+                    <span class="method">GET</span> <code>/batch/events/{job_id}</code>
+                    <p>Follow batch progress as server-sent events</p>
+                </div>
             </div>
 
             <h2>🚀 Quick Start</h2>
@@ -288,6 +339,67 @@ async def root() -> str:
     """
 
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Refuse multipart uploads to /process from their Content-Length.
+
+    Starlette spools a multipart body to a temporary file before the
+    endpoint runs, so this is the only point at which an oversized upload
+    can be turned away before it is received.
+    """
+    length = request.headers.get("content-length", "")
+    limit = settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD
+    if request.url.path == "/process" and length.isdigit() and int(length) > limit:
+        return JSONResponse(
+            status_code=413,
+            content={
+                "detail": f"Upload exceeds the limit of "
+                f"{settings.MAX_UPLOAD_SIZE} bytes"
+            },
+        )
+    return await call_next(request)
+
+
+def queue_video(
+    input_path: str,
+    is_youtube_url: bool,
+    title: str,
+    description: str,
+    tags: str,
+    publish_time: Optional[str],
+    upload: Optional[IngestedFile] = None,
+) -> Dict[str, str]:
+    """Queue one video as a job and return the handles to follow it."""
+    # Convert tags string to list
+    tag_list = [tag.strip() for tag in tags.split(",")] if tags else None
+
+    # Queue the video; the job ID is a handle for /batch/status
+    job = submit_job(
+        [
+            {
+                "input_path": input_path,
+                "title": title,
+                "description": description,
+                "tags": tag_list,
+                "publish_time": publish_time,
+                "is_youtube_url": is_youtube_url,
+                "upload_path": str(upload.path) if upload else None,
+            }
+        ]
+    )
+
+    response = {
+        "status": "queued",
+        "job_id": job.job_id,
+        "status_url": f"/batch/status/{job.job_id}",
+        "events_url": f"/batch/events/{job.job_id}",
+    }
+    if upload:
+        response["sha256"] = upload.sha256
+    return response
+
+
 @app.post("/process")
 async def process_video_endpoint(
     title: str = Form(...),
@@ -297,15 +409,32 @@ async def process_video_endpoint(
     file: Optional[UploadFile] = None,
     youtube_url: Optional[str] = Form(None),
 ) -> Dict[str, str]:
-    """Process and upload a single video."""
+    """
+    Process and upload a single video.
+
+    This endpoint buffers: a multipart file has already been received in
+    full into a temporary file when this runs, and is then copied to the
+    upload directory, so it is written to disk twice. Without a
+    Content-Length header the size limit can only be enforced after receipt.
+    /process/stream is the streaming path: it writes the raw request body
+    to the upload directory once, as it arrives, and should be preferred
+    for large videos.
+    """
+    upload = None
     try:
         # Handle file upload
         if file:
-            temp_path = f"temp/{file.filename}"
-            with open(temp_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            input_path = temp_path
+            if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds the limit of "
+                    f"{settings.MAX_UPLOAD_SIZE} bytes",
+                )
+            try:
+                upload = await ingest_upload(file, file.filename)
+            except ValidationError as e:
+                raise HTTPException(status_code=413, detail=str(e)) from e
+            input_path = str(upload.path)
             is_youtube_url = False
         elif youtube_url:
             input_path = youtube_url
@@ -315,87 +444,168 @@ async def process_video_endpoint(
                 status_code=400, detail="Either file or youtube_url must be provided"
             )
 
-        # Convert tags string to list
-        tag_list = [tag.strip() for tag in tags.split(",")] if tags else None
-
-        # Process video
-        process_video(
-            input_path=input_path,
-            title=title,
-            description=description,
-            tags=tag_list,
-            publish_time=publish_time,
-            is_youtube_url=is_youtube_url,
+        return await run_in_threadpool(
+            queue_video,
+            input_path,
+            is_youtube_url,
+            title,
+            description,
+            tags,
+            publish_time,
+            upload,
         )
 
-        return {"status": "success", "message": "Video processed successfully"}
-
+    except HTTPException:
+        if upload:
+            remove_upload(upload.path)
+        raise
     except Exception as e:
+        if upload:
+            remove_upload(upload.path)
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@app.post("/batch/process")
-async def batch_process_videos(
-    videos: List[BatchVideoRequest],
-    background_tasks: BackgroundTasks,
-) -> BatchProcessingResponse:
-    """Process multiple videos in batch."""
-    job_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+@app.post("/process/stream")
+async def process_stream_endpoint(
+    request: Request,
+    filename: str,
+    title: str,
+    description: str = "",
+    tags: str = "",
+    publish_time: Optional[str] = None,
+    content_length: Optional[int] = Header(None),
+) -> Dict[str, str]:
+    """
+    Process and upload a single video sent as the raw request body.
 
-    # Initialize job status
-    response = BatchProcessingResponse(
-        job_id=job_id, status="processing", total_videos=len(videos)
-    )
-    batch_jobs[job_id] = response
+    The body is hashed and written to the upload directory as it arrives,
+    so it is neither held in memory nor written twice. An oversized upload
+    is refused from its Content-Length before any of it is read, or as soon
+    as a chunked body passes the limit.
+    """
+    if content_length is not None and content_length > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds the limit of {settings.MAX_UPLOAD_SIZE} bytes",
+        )
+    try:
+        upload = await ingest_stream(request.stream(), filename)
+    except ValidationError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
 
-    # Start background processing
-    background_tasks.add_task(process_batch, job_id, videos)
+    try:
+        return await run_in_threadpool(
+            queue_video,
+            str(upload.path),
+            False,
+            title,
+            description,
+            tags,
+            publish_time,
+            upload,
+        )
+    except HTTPException:
+        remove_upload(upload.path)
+        raise
+    except Exception as e:
+        remove_upload(upload.path)
+        raise HTTPException(status_code=500, detail=str(e)) from e
 
-    return response
+
+@app.post("/batch/process")
+def batch_process_videos(videos: List[BatchVideoRequest]) -> BatchProcessingResponse:
+    """Process multiple videos in batch."""
+    job = submit_job([video.model_dump() for video in videos])
+    return BatchProcessingResponse.from_job(job)
 
 
 @app.post("/batch/csv")
 async def batch_process_from_csv(
-    background_tasks: BackgroundTasks,
     csv_file: UploadFile = File(...),
 ) -> BatchProcessingResponse:
-    """Process multiple videos from a CSV file."""
+    """Process multiple videos from a manifest file (CSV, JSONL or Parquet)."""
     try:
-        # Read CSV file
-        content = await csv_file.read()
-        csv_text = content.decode("utf-8")
-        csv_io = io.StringIO(csv_text)
-        reader = csv.DictReader(csv_io)
-
-        # Convert CSV rows to BatchVideoRequest objects
-        videos = []
-        for row in reader:
-            video = BatchVideoRequest(
-                input_path=row["input_path"],
-                title=row.get("title"),
-                description=row.get("description", ""),
-                tags=row.get("tags", "").split(",") if row.get("tags") else None,
-                publish_time=row.get("publish_time"),
-                is_youtube_url=row.get("is_youtube_url", "").lower() == "true",
-            )
-            videos.append(video)
-
-        # Start batch processing
-        return await batch_process_videos(videos, background_tasks)
-
-    except Exception as e:
+        # Parsing and file checks block, so they run off the event loop
+        loader = ManifestLoader(csv_file.file, manifest_format(csv_file.filename or ""))
+        items = await run_in_threadpool(loader.load)
+    except ValidationError as e:
+        errors = e.details["value"]
         raise HTTPException(
-            status_code=400, detail=f"Error processing CSV file: {str(e)}"
+            status_code=400,
+            detail={
+                "message": e.message,
+                "errors": errors if isinstance(errors, list) else [e.message],
+            },
         ) from e
 
+    # Start batch processing
+    job = await run_in_threadpool(submit_job, [item.model_dump() for item in items])
+    return BatchProcessingResponse.from_job(job)
+
 
 @app.get("/batch/status/{job_id}")
-async def get_batch_status(job_id: str) -> BatchProcessingResponse:
+def get_batch_status(job_id: str) -> BatchProcessingResponse:
     """Get the status of a batch processing job."""
-    if job_id not in batch_jobs:
+    job = job_store.get_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
 
-    return batch_jobs[job_id]
+    return BatchProcessingResponse.from_job(job)
+
+
+@app.get("/batch/events/{job_id}")
+async def stream_batch_events(
+    job_id: str,
+    request: Request,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """
+    Stream the events of a batch job as server-sent events.
+
+    Each event carries its ID, so a reconnecting client (or EventSource,
+    which sends Last-Event-ID by itself) only receives what it missed. The
+    stream ends after the job has finished.
+    """
+    job = await run_in_threadpool(job_store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+    finished = job.status != "processing"
+
+    cursor = after
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id)
+
+    async def events():
+        nonlocal cursor
+        idle = 0.0
+        while not await request.is_disconnected():
+            batch = await run_in_threadpool(job_store.events, job_id, cursor)
+            for event in batch:
+                cursor = event.id
+                yield (
+                    f"id: {event.id}\nevent: {event.type}\n"
+                    f"data: {event.model_dump_json()}\n\n"
+                )
+                if event.type.startswith("job.") and event.type != "job.created":
+                    return
+            if batch:
+                idle = 0.0
+                continue
+            if finished:
+                return  # The client has already seen the end of the job
+
+            await asyncio.sleep(settings.JOB_EVENT_POLL_INTERVAL)
+            idle += settings.JOB_EVENT_POLL_INTERVAL
+            if idle >= SSE_KEEPALIVE_INTERVAL:
+                idle = 0.0
+                yield ": keepalive\n\n"  # Stops proxies closing the stream
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/batch/template")
@@ -8,16 +8,20 @@ Year: 2025
 
 import logging
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import typer
 
 from src.youtube_processor.core.downloader import VideoDownloader
+from src.youtube_processor.core.pipeline import BatchPipeline
 from src.youtube_processor.core.processor import VideoProcessor
+from src.youtube_processor.core.quota import QuotaScheduler
+from src.youtube_processor.core.upload_index import index_key_for
 from src.youtube_processor.core.youtube_api import YouTubeAPI
 from src.youtube_processor.logging_config import setup_logging
-from src.youtube_processor.models import VideoMetadata
+from src.youtube_processor.models import BatchItemResult, VideoMetadata
 
 # Initialize logger
 setup_logging()
@@ -31,6 +35,10 @@ def process_video(
     tags: Optional[List[str]] = None,
     publish_time: Optional[str] = None,
     is_youtube_url: bool = False,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    thumbnail_path: Optional[str] = None,
+    playlist_ids: Optional[List[str]] = None,
+    video_options: Optional[Dict[str, Any]] = None,
 ) -> Optional[str]:
     """
     Main pipeline for video processing and uploading.
@@ -42,22 +50,79 @@ def process_video(
         tags: List of video tags (optional)
         publish_time: Scheduled publish time in ISO format (optional)
         is_youtube_url: Whether the input is a YouTube URL
+        progress: Optional callback taking a stage name and details
+        thumbnail_path: Custom thumbnail set after the upload (optional)
+        playlist_ids: Playlists the video is added to (optional)
+        video_options: Further VideoMetadata fields, e.g. privacy_status
+            (optional)
+
+    Content uploaded before with the same processing settings is neither
+    downloaded nor uploaded again; only its metadata is brought up to date.
+    Thumbnail and playlist calls that did not succeed before are made after
+    either. Once the day's API quota is spent, the video waits for the reset
+    (or fails, without QUOTA_WAIT_FOR_RESET) before it is downloaded or
+    encoded.
 
     Returns:
-        Optional[str]: Path to the processed video file if successful, None otherwise
+        Optional[str]: Path to the processed video file if successful, None if
+        an earlier upload was updated instead
     """
-    processed_file_path = None
+
+    def report(stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+        if progress is not None:
+            progress(stage, data or {})
+
+    stream_spec = None
     try:
         # Initialize components
         downloader = VideoDownloader()
         processor = VideoProcessor()
         youtube_api = YouTubeAPI()
+        quota_scheduler = QuotaScheduler(youtube_api.quota)
+        publish_datetime = (
+            datetime.fromisoformat(publish_time) if publish_time else None
+        )
+
+        # Update the metadata of content that was uploaded before
+        index_key = index_key_for(input_path, is_youtube_url)
+        if index_key and youtube_api.indexed_video(index_key):
+            if is_youtube_url:
+                fetched = downloader.fetch_metadata(input_path).metadata
+                if fetched:
+                    title = title or fetched.title
+                    description = description or fetched.description
+                    tags = tags or fetched.tags
+            report("update")
+            metadata = VideoMetadata(
+                title=title or Path(input_path).stem,
+                description=description or "",
+                tags=tags or [],
+                thumbnail_path=thumbnail_path,
+                playlist_ids=playlist_ids or [],
+                **(video_options or {}),
+            )
+            video_id = quota_scheduler.run(
+                "videos.update",
+                partial(
+                    youtube_api.update_existing, index_key, metadata, publish_datetime
+                ),
+            )
+            if video_id:
+                logger.info("Updated metadata of uploaded video %s", video_id)
+                report("post_upload")
+                youtube_api.finish_upload(video_id, metadata, index_key)
+                return None
+
+        # Wait for quota before spending time on the download and the encode
+        quota_scheduler.admit("videos.insert")
 
         # Download video if it's a YouTube URL
         if is_youtube_url:
             logger.info("Downloading video from YouTube...")
+            report("download")
             video_path, metadata = downloader.download(input_path)
             input_path = str(video_path)
+            stream_spec = metadata.stream_spec
             # Use metadata if no title provided
             if not title:
                 title = metadata.title
@@ -68,35 +133,85 @@ def process_video(
 
         # Process video
         logger.info("Processing video...")
-        processed_file_path = processor.process_video(Path(input_path))
+        report("process")
+        processed_file_path = processor.process_video(
+            Path(input_path), stream_spec=stream_spec
+        )
 
         # Upload to YouTube
         logger.info("Uploading to YouTube...")
-        video_id = youtube_api.upload_video(
-            Path(processed_file_path),
-            VideoMetadata(
-                title=title or Path(input_path).stem,
-                description=description or "",
-                tags=tags or [],
+        report("upload")
+        metadata = VideoMetadata(
+            title=title or Path(input_path).stem,
+            description=description or "",
+            tags=tags or [],
+            thumbnail_path=thumbnail_path,
+            playlist_ids=playlist_ids or [],
+            **(video_options or {}),
+        )
+        video_id = quota_scheduler.run(
+            "videos.insert",
+            partial(
+                youtube_api.upload_video,
+                Path(processed_file_path),
+                metadata,
+                publish_datetime,
+                index_key=index_key,
+                progress=lambda sent, total: report(
+                    "upload", {"bytes_sent": sent, "total_bytes": total}
+                ),
             ),
-            datetime.fromisoformat(publish_time) if publish_time else None,
         )
 
         logger.info("Successfully uploaded video with ID: %s", video_id)
+        # The output is kept after failed uploads, so a retry skips the encode
+        Path(processed_file_path).unlink(missing_ok=True)
+        report("post_upload")
+        youtube_api.finish_upload(video_id, metadata, index_key)
         return str(processed_file_path)
 
     except Exception as e:
         logger.error("Error during video processing: %s", str(e))
         raise
 
-    finally:
-        # Cleanup temporary files
-        try:
-            if processed_file_path and Path(processed_file_path).exists():
-                Path(processed_file_path).unlink()
-                logger.debug("Cleaned up processed file")
-        except Exception as e:
-            logger.warning("Error during cleanup: %s", e)
+
+def process_batch_pipelined(
+    videos: List[Dict[str, Any]],
+    download_workers: Optional[int] = None,
+    process_workers: Optional[int] = None,
+    upload_workers: Optional[int] = None,
+    stream_uploads: Optional[bool] = None,
+) -> List[BatchItemResult]:
+    """
+    Run a batch with download, processing and upload overlapping.
+
+    Args:
+        videos: Dictionaries with the keyword arguments of process_video
+        download_workers: Number of concurrent downloads (optional)
+        process_workers: Number of concurrent FFmpeg jobs (optional)
+        upload_workers: Number of concurrent uploads (optional)
+        stream_uploads: Upload FFmpeg output while it is encoded (optional)
+
+    Returns:
+        List[BatchItemResult]: Per-video results in input order
+    """
+    pipeline = BatchPipeline(
+        download_workers=download_workers,
+        process_workers=process_workers,
+        upload_workers=upload_workers,
+        stream_uploads=stream_uploads,
+    )
+    results = pipeline.run_all(videos)
+
+    for stats in pipeline.stats():
+        logger.info(
+            "Stage %s: %d workers, %.0f%% utilization, max queue depth %d",
+            stats.name,
+            stats.workers,
+            stats.utilization * 100,
+            stats.max_queue_depth,
+        )
+    return results
 
 
 def verify_auth() -> bool:
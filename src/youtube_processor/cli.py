@@ -2,8 +2,9 @@
 import logging
 import traceback
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import typer
 from rich.console import Console
@@ -11,12 +12,17 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.traceback import install
 
 from .config import settings
+from .core.batch import BatchEngine
 from .core.downloader import VideoDownloader
+from .core.pipeline import BatchPipeline
 from .core.processor import VideoProcessor
+from .core.quota import QuotaScheduler
+from .core.upload_index import index_key_for
 from .core.youtube_api import YouTubeAPI
 from .exceptions import OAuth2Error, YouTubeProcessorError
 from .logging_config import setup_logging
 from .models import VideoMetadata
+from .utils.manifest import ManifestLoader
 
 # Initialize Typer app and Rich console
 app = typer.Typer(help="YouTube Video Processing CLI")
@@ -74,7 +80,12 @@ def process_local(
 
             # Upload video
             progress.add_task("Uploading to YouTube...", total=None)
-            video_id = youtube_api.upload_video(processed_path, metadata, publish_time)
+            video_id = youtube_api.upload_video(
+                processed_path,
+                metadata,
+                publish_time,
+                index_key=index_key_for(str(file_path)),
+            )
 
             # Cleanup
             processed_path.unlink(missing_ok=True)
@@ -114,16 +125,22 @@ def process_youtube(
             progress.add_task("Downloading video...", total=None)
             video_path, metadata = downloader.download(url)
 
-            # Process video
+            # Process video, reusing the stream specs reported by yt-dlp
             progress.add_task("Processing video...", total=None)
-            processed_path = processor.process_video(video_path)
+            processed_path = processor.process_video(
+                video_path, stream_spec=metadata.stream_spec
+            )
 
             # Upload video
             progress.add_task("Uploading to YouTube...", total=None)
-            video_id = youtube_api.upload_video(processed_path, metadata, publish_time)
+            video_id = youtube_api.upload_video(
+                processed_path,
+                metadata,
+                publish_time,
+                index_key=index_key_for(url, is_youtube_url=True),
+            )
 
-            # Cleanup
-            video_path.unlink(missing_ok=True)
+            # Cleanup; the download stays in the download cache for reruns
             processed_path.unlink(missing_ok=True)
 
             console.print(
@@ -137,43 +154,157 @@ def process_youtube(
         raise typer.Exit(code=1)
 
 
+def _row_metadata(
+    input_path: str,
+    fields: Dict[str, Any],
+    source: Optional[VideoMetadata] = None,
+) -> VideoMetadata:
+    """Apply a batch row's metadata fields over the source's; the row wins."""
+    # Empty cells leave the source's value, a False flag is still set
+    fields = {
+        field: value for field, value in fields.items() if value not in (None, "", [])
+    }
+    if source is None:
+        return VideoMetadata(
+            **{"title": Path(input_path).stem, "description": "", **fields},
+            original_url=input_path,
+        )
+    return source.model_copy(update=fields)
+
+
+def _process_batch_row(
+    input_path: str,
+    is_youtube_url: bool = False,
+    title: Optional[str] = None,
+    description: str = "",
+    tags: Optional[List[str]] = None,
+    publish_time: Optional[str] = None,
+    thumbnail_path: Optional[str] = None,
+    playlist_ids: Optional[List[str]] = None,
+    video_options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Run the full pipeline for one batch row inside a worker process.
+
+    Content uploaded before with the same processing settings only gets its
+    metadata updated, without being downloaded or uploaded again. Thumbnail
+    and playlist calls that did not succeed before are made after either.
+    """
+    youtube_api = YouTubeAPI()
+    quota_scheduler = QuotaScheduler()
+    scheduled = datetime.fromisoformat(publish_time) if publish_time else None
+    fields = {
+        **(video_options or {}),
+        "title": title,
+        "description": description,
+        "tags": tags,
+        "thumbnail_path": thumbnail_path,
+        "playlist_ids": playlist_ids,
+    }
+    metadata = _row_metadata(input_path, fields)
+
+    index_key = index_key_for(input_path, is_youtube_url)
+    if index_key and youtube_api.indexed_video(index_key):
+        if is_youtube_url:
+            fetched = VideoDownloader().fetch_metadata(input_path).metadata
+            if fetched:
+                metadata = _row_metadata(input_path, fields, fetched)
+        video_id = quota_scheduler.run(
+            "videos.update",
+            partial(youtube_api.update_existing, index_key, metadata, scheduled),
+        )
+        if video_id:
+            youtube_api.finish_upload(video_id, metadata, index_key)
+            return video_id
+
+    if is_youtube_url:
+        video_path, downloaded = VideoDownloader().download(input_path)
+        metadata = _row_metadata(input_path, fields, downloaded)
+    else:
+        video_path = Path(input_path)
+
+    processed_path = VideoProcessor().process_video(
+        video_path, stream_spec=metadata.stream_spec
+    )
+    video_id = quota_scheduler.run(
+        "videos.insert",
+        partial(
+            youtube_api.upload_video,
+            processed_path,
+            metadata,
+            scheduled,
+            index_key=index_key,
+        ),
+    )
+    # Kept after a failed upload for the retry; downloads belong to the
+    # download cache, which evicts them over budget
+    processed_path.unlink(missing_ok=True)
+    youtube_api.finish_upload(video_id, metadata, index_key)
+    return video_id
+
+
 @app.command()
 def batch_process(
     input_csv: Path = typer.Argument(
-        ..., help="CSV file containing video information", exists=True
-    )
+        ...,
+        help="Manifest with video information (CSV, JSONL or Parquet)",
+        exists=True,
+    ),
+    workers: Optional[int] = typer.Option(
+        None, help="Number of worker processes (defaults to the CPU count)"
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        help="Overlap downloads, processing and uploads in separate stages",
+    ),
+    stream: Optional[bool] = typer.Option(
+        None,
+        help="With --pipeline, upload FFmpeg output while it is encoded "
+        "instead of saving it first (defaults to STREAM_UPLOADS)",
+    ),
 ):
-    """Process multiple videos from a CSV file."""
-    import csv
-    from datetime import datetime
-
+    """Process multiple videos from a manifest file."""
     try:
-        with open(input_csv, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Handle both local and YouTube videos
-                if "file_path" in row:
-                    process_local(
-                        Path(row["file_path"]),
-                        title=row.get("title"),
-                        description=row.get("description", ""),
-                        tags=row.get("tags", "").split(","),
-                        publish_time=(
-                            datetime.fromisoformat(row["publish_time"])
-                            if "publish_time" in row
-                            else None
-                        ),
-                    )
-                elif "url" in row:
-                    process_youtube(
-                        row["url"],
-                        publish_time=(
-                            datetime.fromisoformat(row["publish_time"])
-                            if "publish_time" in row
-                            else None
-                        ),
-                    )
+        # Rows are read as the workers ask for them, so processing starts
+        # right away and memory does not grow with the manifest; bad rows
+        # are skipped and reported at the end
+        manifest = ManifestLoader(input_csv)
+        rows = manifest.iter_rows(skip_invalid=True)
+
+        if pipeline:
+            batch_pipeline = BatchPipeline(
+                process_workers=workers, stream_uploads=stream
+            )
+            results = batch_pipeline.run(rows)
+        else:
+            results = BatchEngine(max_workers=workers).run(_process_batch_row, rows)
+
+        total = failed = 0
+        for result in results:
+            total += 1
+            if result.success:
+                console.print(f"✅ {result.label}: uploaded as {result.result}")
+            else:
+                failed += 1
+                console.print(f"❌ {result.label}: {result.error}", style="bold red")
+
+        for error in manifest.errors:
+            console.print(f"❌ {error}", style="bold red")
+        failed += len(manifest.errors)
+        total += len(manifest.errors)
+        console.print(f"Processed {total - failed}/{total} videos")
+        if pipeline:
+            for stats in batch_pipeline.stats():
+                console.print(
+                    f"  {stats.name}: {stats.workers} workers, "
+                    f"{stats.utilization:.0%} busy, "
+                    f"max queue depth {stats.max_queue_depth}"
+                )
+        if failed:
+            raise typer.Exit(code=1)
 
+    except typer.Exit:
+        raise
     except Exception as e:
         logger.error(f"Batch processing failed: {str(e)}")
         console.print(f"❌ Batch processing failed: {str(e)}", style="bold red")
@@ -17,19 +17,58 @@ class Settings(BaseSettings):
     CONFIG_DIR: Path = CONFIG_DIR
     WORK_DIR: Path = PROJECT_ROOT / "work"
     OUTPUT_DIR: Path = PROJECT_ROOT / "downloads"
+    CACHE_DIR: Path = PROJECT_ROOT / "cache"
+    JOB_STORE_PATH: Path = PROJECT_ROOT / "work" / "jobs.db"  # API batch jobs
+    JOB_STORE_TIMEOUT: float = 30.0  # seconds to wait for a locked job store
+    JOB_WORKERS: int = 2  # Items the API processes concurrently
+    JOB_QUEUE_SIZE: int = 100  # Items the API accepts before refusing more
+    JOB_EVENT_POLL_INTERVAL: float = 0.5  # seconds between event stream checks
+    JOB_HEARTBEAT_INTERVAL: float = 30.0  # seconds between job runner heartbeats
+    JOB_RETENTION: int = 60 * 60 * 24 * 7  # seconds finished jobs are kept
+    MAX_UPLOAD_SIZE: int = 1024 * 1024 * 1024 * 20  # 20GB per uploaded video
+    INGEST_CHUNK_SIZE: int = 1024 * 1024  # Bytes read per step of an upload
+    UPLOAD_RETENTION: int = 60 * 60 * 24  # seconds before an orphaned upload goes
 
     # API Credentials
     CREDENTIALS_PATH: Path = CONFIG_DIR / "client_secrets.json"
     TOKEN_PATH: Path = CONFIG_DIR / "token.json"  # Will be generated during OAuth flow
+    TOKEN_REFRESH_MARGIN: int = 300  # seconds before expiry to refresh the token
 
     # Processing Configuration
     MAX_CONCURRENT_DOWNLOADS: int = 3
+    CONCURRENT_FRAGMENT_DOWNLOADS: int = 4  # yt-dlp fragments per download
+    DOWNLOAD_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024 * 20  # 20GB of downloads
+    DOWNLOAD_CACHE_VERIFY_CHECKSUM: bool = False  # Re-hash cached files on reuse
+    METADATA_CACHE_TTL: int = 60 * 60 * 24  # seconds before metadata is refetched
+    MAX_PROCESSING_WORKERS: Optional[int] = None  # Defaults to the CPU count
+    PIPELINE_DOWNLOAD_WORKERS: Optional[int] = None  # MAX_CONCURRENT_DOWNLOADS
+    PIPELINE_PROCESS_WORKERS: Optional[int] = None  # Defaults to the CPU count
+    PIPELINE_UPLOAD_WORKERS: int = 1
+    MANIFEST_CHUNK_ROWS: int = 10000  # Batch manifest rows validated at once
+    STAT_WORKERS: int = 16  # Directories listed at once when checking files
+    PIPELINE_QUEUE_SIZE: int = 4  # Items buffered between two stages
     MAX_RETRIES: int = 3
-    RETRY_DELAY: int = 5  # seconds
+    RETRY_DELAY: int = 5  # seconds, doubled on every further retry
+    RETRY_MAX_DELAY: int = 64  # seconds
     UPLOAD_CHUNK_SIZE: int = 1024 * 1024 * 5  # 5MB chunks for upload
+    ADAPTIVE_UPLOAD_CHUNKS: bool = True  # Resize file upload chunks as they go
+    UPLOAD_CHUNK_MIN_SIZE: int = 1024 * 1024  # Bounds for adaptive chunks, both
+    UPLOAD_CHUNK_MAX_SIZE: int = 1024 * 1024 * 64  # multiples of 256KB
+    UPLOAD_CHUNK_TARGET_SECONDS: float = 8.0  # Aimed duration of one chunk
+    UPLOAD_SESSION_TTL: int = 60 * 60 * 24 * 6  # seconds an upload stays resumable
+    POST_UPLOAD_BATCH_SIZE: int = 50  # Playlist/update calls per batch request
+    QUOTA_DAILY_LIMIT: int = 10000  # YouTube Data API units per project and day
+    QUOTA_PROJECT_ID: Optional[str] = None  # Defaults to the OAuth client's project
+    QUOTA_WAIT_FOR_RESET: bool = True  # Hold uploads until quota resets, not fail
+    STREAM_UPLOADS: bool = False  # Pipe FFmpeg output straight into the upload
+    STREAM_UPLOAD_BUFFER_CHUNKS: int = 2  # Upload chunks read ahead from FFmpeg
 
     # Video Processing
     BLACK_SCREEN_DURATION: int = 2  # seconds
+    END_SCREEN_MODE: str = "copy"  # "copy", "smart" or "reencode"
+    END_SCREEN_CACHE_MAX_BYTES: int = 1024 * 1024 * 256  # 256MB of cached clips
+    PROBE_CACHE_MAX_BYTES: int = 1024 * 1024 * 16  # 16MB of memoized probe results
+    PROCESSED_MAX_BYTES: int = 1024 * 1024 * 1024 * 20  # 20GB of outputs kept
     VIDEO_QUALITY: str = "best"
 
     # Logging
@@ -50,7 +89,12 @@ class Settings(BaseSettings):
 
     def _create_directories(self) -> None:
         """Create necessary directories if they don't exist."""
-        directories = [self.CONFIG_DIR, self.WORK_DIR, self.OUTPUT_DIR]
+        directories = [
+            self.CONFIG_DIR,
+            self.WORK_DIR,
+            self.OUTPUT_DIR,
+            self.CACHE_DIR,
+        ]
 
         if self.LOG_FILE:
             directories.append(self.LOG_FILE.parent)
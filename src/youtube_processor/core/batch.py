@@ -0,0 +1,153 @@
+import logging
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..models import BatchItemResult
+from .processor import VideoProcessor
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_count() -> int:
+    """Return the configured worker count, falling back to the CPU count."""
+    if settings.MAX_PROCESSING_WORKERS:
+        return max(1, settings.MAX_PROCESSING_WORKERS)
+    return max(1, os.cpu_count() or 1)
+
+
+def process_file(input_path: str) -> str:
+    """Run the FFmpeg stage for a single file inside a worker process."""
+    return str(VideoProcessor().process_video(Path(input_path)))
+
+
+def item_label(index: int, item: Dict[str, Any]) -> str:
+    """Return a human readable identifier for a batch item."""
+    for key in ("input_path", "file_path", "url"):
+        if item.get(key):
+            return str(item[key])
+    return f"item {index + 1}"
+
+
+def run_item(
+    func: Callable[..., Any], index: int, label: str, item: Dict[str, Any]
+) -> BatchItemResult:
+    """
+    Execute one batch item and capture its outcome.
+
+    Used by BatchEngine in its workers and by JobRunner for queued jobs.
+    Errors are returned as strings because the project's exception types
+    cannot always be pickled back to the parent process.
+    """
+    start = time.monotonic()
+    try:
+        result = func(**item)
+        return BatchItemResult(
+            index=index,
+            label=label,
+            success=True,
+            result=result,
+            duration=time.monotonic() - start,
+        )
+    except Exception as e:
+        return BatchItemResult(
+            index=index,
+            label=label,
+            success=False,
+            error=str(e),
+            duration=time.monotonic() - start,
+        )
+
+
+class BatchEngine:
+    """Runs batch items concurrently across a pool of worker processes."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        executor_factory: Callable[..., Executor] = ProcessPoolExecutor,
+    ) -> None:
+        self.max_workers = max_workers or default_worker_count()
+        self.executor_factory = executor_factory
+
+    def run(
+        self,
+        func: Callable[..., Any],
+        items: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+    ) -> Iterator[BatchItemResult]:
+        """
+        Run ``func(**item)`` for every item and yield results as they finish.
+
+        Items are pulled from ``items`` lazily and at most twice as many items
+        as there are workers are in flight at once, so ``items`` may be a
+        generator over a very large manifest.
+
+        Args:
+            func: Picklable, module-level callable executed in the workers
+            items: Keyword arguments for each call
+            on_result: Optional callback invoked in the parent for each result
+
+        Yields:
+            BatchItemResult for each item, in completion order
+        """
+        pending: Dict[Future, Tuple[int, str]] = {}
+        max_in_flight = self.max_workers * 2
+
+        logger.info(f"Starting batch with {self.max_workers} workers")
+        with self.executor_factory(max_workers=self.max_workers) as executor:
+            for index, item in enumerate(items):
+                label = item_label(index, item)
+                future = executor.submit(run_item, func, index, label, item)
+                pending[future] = (index, label)
+
+                if len(pending) >= max_in_flight:
+                    yield from self._collect(pending, on_result)
+
+            while pending:
+                yield from self._collect(pending, on_result)
+
+    def _collect(
+        self,
+        pending: Dict[Future, Tuple[int, str]],
+        on_result: Optional[Callable[[BatchItemResult], None]],
+    ) -> Iterator[BatchItemResult]:
+        """Wait for in-flight items and yield the finished ones."""
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            index, label = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died, e.g. killed by the OS
+                result = BatchItemResult(
+                    index=index, label=label, success=False, error=str(e)
+                )
+
+            if result.success:
+                logger.info(f"Batch item {label} completed in {result.duration:.1f}s")
+            else:
+                logger.error(f"Batch item {label} failed: {result.error}")
+
+            if on_result:
+                on_result(result)
+            yield result
+
+    def run_all(
+        self,
+        func: Callable[..., Any],
+        items: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+    ) -> List[BatchItemResult]:
+        """Run a whole batch and return the results in input order."""
+        results = list(self.run(func, items, on_result))
+        return sorted(results, key=lambda result: result.index)
@@ -0,0 +1,308 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from ..models import StreamSpec
+from .storage import JsonStore, file_checksum
+
+logger = logging.getLogger(__name__)
+
+
+def enforce_size_budget(
+    directory: Path, max_bytes: int, pattern: str = "*", keep: Optional[Path] = None
+) -> int:
+    """
+    Evict least recently used files until the directory fits its budget.
+
+    Recency is taken from the file modification time, which cache hits
+    refresh with ``os.utime``.
+
+    Args:
+        directory: Directory holding the cached files
+        max_bytes: Maximum total size of the matching files
+        pattern: Glob pattern selecting the files that count towards the budget
+        keep: Optional file that must never be evicted
+
+    Returns:
+        Number of bytes freed
+    """
+    entries = []
+    for path in directory.glob(pattern):
+        if path.name.startswith(".") or not path.is_file():
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        freed += size
+        logger.debug(f"Evicted cached file: {path}")
+
+    return freed
+
+
+class EndScreenCache:
+    """Content-addressed, size-bounded LRU cache of generated end-screen clips."""
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.cache_dir = Path(cache_dir or settings.CACHE_DIR / "end_screens")
+        self.max_bytes = (
+            settings.END_SCREEN_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key_for(spec: StreamSpec, duration: float) -> str:
+        """Return the content address of the clip for a stream spec."""
+        key = {
+            "width": spec.width,
+            "height": spec.height,
+            "fps": spec.fps,
+            "pix_fmt": spec.pix_fmt,
+            "codec": spec.video_codec,
+            "time_base": spec.time_base,
+            "profile": spec.profile,
+            "level": spec.level,
+            "audio_codec": spec.audio_codec,
+            "sample_rate": spec.sample_rate,
+            "channels": spec.channels,
+            "duration": duration,
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return digest[:32]
+
+    def get_or_create(
+        self,
+        spec: StreamSpec,
+        duration: float,
+        generate: Callable[[Path], None],
+    ) -> Path:
+        """
+        Return a cached clip for the spec, generating it on a miss.
+
+        Args:
+            spec: Stream parameters the clip has to match
+            duration: Clip duration in seconds
+            generate: Callable that encodes the clip to the given path
+
+        Returns:
+            Path to the cached clip
+        """
+        path = self.cache_dir / f"{self.key_for(spec, duration)}.mp4"
+
+        if path.exists():
+            os.utime(path)  # Mark as recently used
+            logger.info(f"Using cached end screen: {path.name}")
+            return path
+
+        # Encode to a private temporary name and publish atomically so
+        # concurrent jobs never read a partially written clip.
+        temp_path = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.mp4")
+        try:
+            generate(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        logger.info(f"Cached new end screen: {path.name}")
+        enforce_size_budget(self.cache_dir, self.max_bytes, "*.mp4", keep=path)
+        return path
+
+
+class DownloadCache:
+    """
+    Persistent index of completed downloads in OUTPUT_DIR, keyed by video ID.
+
+    Each entry records the requested quality, the resolved yt-dlp format, the
+    file size and its SHA-256 checksum, next to the saved yt-dlp info JSON.
+    """
+
+    INDEX_NAME = "download_index.json"
+
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.directory = Path(directory or settings.OUTPUT_DIR)
+        self.max_bytes = (
+            settings.DOWNLOAD_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index = JsonStore(self.directory / self.INDEX_NAME)
+
+    def lookup(
+        self, video_id: str, quality: str, verify_checksum: bool = False
+    ) -> Optional[Tuple[Path, Dict[str, Any]]]:
+        """
+        Return the cached file and info dict for a video, if still valid.
+
+        Args:
+            video_id: yt-dlp video ID
+            quality: Requested format selector, e.g. "best"
+            verify_checksum: Re-hash the file instead of only checking its size
+
+        Returns:
+            Tuple of video path and yt-dlp info dict, or None on a miss
+        """
+        entry = self.index.get(video_id)
+        if not entry or entry.get("quality") != quality:
+            return None
+
+        video_path = self.directory / entry["file"]
+        info_path = self.directory / entry["info_file"]
+        try:
+            valid = video_path.stat().st_size == entry["size"] and info_path.is_file()
+            if valid and verify_checksum:
+                valid = file_checksum(video_path) == entry["sha256"]
+        except FileNotFoundError:
+            valid = False
+
+        if not valid:
+            logger.info(f"Dropping stale download cache entry: {video_id}")
+            self.index.delete(video_id)
+            return None
+
+        with open(info_path, "r") as f:
+            info = json.load(f)
+        os.utime(video_path)  # Mark as recently used
+        return video_path, info
+
+    def store(
+        self, video_id: str, quality: str, video_path: Path, info: Dict[str, Any]
+    ) -> None:
+        """Record a completed download and evict old ones over budget."""
+        if not video_path.is_file():
+            logger.warning(f"Not caching missing download: {video_path}")
+            return
+
+        info_path = self.directory / f"{video_id}.info.json"
+        with open(info_path, "w") as f:
+            json.dump(info, f, default=str)
+
+        self.index.set(
+            video_id,
+            {
+                "file": video_path.name,
+                "info_file": info_path.name,
+                "quality": quality,
+                "format": info.get("format_id"),
+                "size": video_path.stat().st_size,
+                "sha256": file_checksum(video_path),
+            },
+        )
+        self.evict(keep=video_id)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used downloads until the cache fits its budget.
+
+        Args:
+            keep: Optional video ID that must not be evicted
+
+        Returns:
+            Number of bytes freed
+        """
+        entries = []
+        for video_id, entry in self.index.items():
+            try:
+                mtime = (self.directory / entry["file"]).stat().st_mtime
+            except FileNotFoundError:
+                mtime = 0.0
+            entries.append((mtime, entry["size"], video_id))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, video_id in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if video_id == keep:
+                continue
+            # Remove the video together with its info JSON, thumbnail and parts
+            for path in self.directory.glob(f"{glob.escape(video_id)}.*"):
+                path.unlink(missing_ok=True)
+            self.index.delete(video_id)
+            total -= size
+            freed += size
+            logger.info(f"Evicted cached download: {video_id}")
+
+        return freed
+
+
+class ProbeCache:
+    """
+    On-disk memo of probed stream specs for local files.
+
+    Entries are keyed by the resolved path, size and modification time, so
+    an edited or replaced file is probed again.
+    """
+
+    # Bump when StreamSpec gains probed fields, so old entries are not reused
+    VERSION = 2
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self.cache_dir = Path(cache_dir or settings.CACHE_DIR / "probes")
+        self.max_bytes = (
+            settings.PROBE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, path: Path) -> Path:
+        """Return the cache file for the current version of ``path``."""
+        stat = path.stat()
+        key = f"{self.VERSION}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+    def get_or_probe(
+        self, path: Path, probe: Callable[[Path], StreamSpec]
+    ) -> StreamSpec:
+        """
+        Return the cached stream spec of a file, probing it on a miss.
+
+        Args:
+            path: Local video file
+            probe: Callable that probes the file
+
+        Returns:
+            StreamSpec of the file
+        """
+        entry_path = self._entry_path(path)
+        try:
+            spec = StreamSpec.model_validate_json(entry_path.read_text())
+            os.utime(entry_path)  # Mark as recently used
+            logger.debug(f"Using cached probe result for {path}")
+            return spec
+        except (FileNotFoundError, ValueError):
+            pass
+
+        spec = probe(path)
+        temp_path = entry_path.with_name(f".{entry_path.name}.{uuid.uuid4().hex}")
+        try:
+            temp_path.write_text(spec.model_dump_json())
+            os.replace(temp_path, entry_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        enforce_size_budget(self.cache_dir, self.max_bytes, "*.json", keep=entry_path)
+        return spec
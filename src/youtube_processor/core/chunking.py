@@ -0,0 +1,141 @@
+from typing import Optional
+
+from googleapiclient.http import MediaFileUpload
+
+from ..config import settings
+from .streaming import CHUNK_GRANULARITY
+
+# Weight of the newest chunk in the smoothed throughput estimate
+THROUGHPUT_SMOOTHING = 0.3
+
+# Successful chunks required after a failure before chunks may grow again
+GROWTH_HOLD_CHUNKS = 3
+
+
+def align_chunk_size(size: float) -> int:
+    """Round ``size`` down to a whole number of upload granules (min. one)."""
+    return max(CHUNK_GRANULARITY, int(size) // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+
+
+class ChunkSizeController:
+    """
+    Picks the size of the next resumable upload chunk from observed transfers.
+
+    Chunks are sized so that one takes about UPLOAD_CHUNK_TARGET_SECONDS at
+    the smoothed throughput: on fast links that amortizes the per-request
+    round trip, on slow links it bounds the work a failed chunk throws away.
+    Chunks at most double per step, halve on every failure and stay small
+    until several chunks in a row went through.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        minimum: Optional[int] = None,
+        maximum: Optional[int] = None,
+        target_seconds: Optional[float] = None,
+    ) -> None:
+        self.minimum = align_chunk_size(
+            settings.UPLOAD_CHUNK_MIN_SIZE if minimum is None else minimum
+        )
+        self.maximum = max(
+            self.minimum,
+            align_chunk_size(
+                settings.UPLOAD_CHUNK_MAX_SIZE if maximum is None else maximum
+            ),
+        )
+        self.target_seconds = (
+            settings.UPLOAD_CHUNK_TARGET_SECONDS
+            if target_seconds is None
+            else target_seconds
+        )
+        self.size = self._clamp(
+            settings.UPLOAD_CHUNK_SIZE if initial is None else initial
+        )
+        self.throughput: Optional[float] = None  # bytes per second
+
+        # Per-upload statistics
+        self.chunks = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+        self.smallest = self.largest = self.size
+        self._streak = GROWTH_HOLD_CHUNKS
+
+    def _clamp(self, size: float) -> int:
+        """Align ``size`` and keep it within the configured bounds."""
+        return min(self.maximum, max(self.minimum, align_chunk_size(size)))
+
+    def _resize(self, size: float) -> None:
+        self.size = self._clamp(size)
+        self.smallest = min(self.smallest, self.size)
+        self.largest = max(self.largest, self.size)
+
+    def record_success(self, nbytes: int, seconds: float) -> None:
+        """
+        Account for a chunk the server acknowledged.
+
+        Args:
+            nbytes: Bytes acknowledged by this request
+            seconds: Wall time the request took
+        """
+        self.chunks += 1
+        self._streak += 1
+        self.bytes_sent += nbytes
+        self.seconds += seconds
+        if nbytes <= 0 or seconds <= 0:
+            return
+
+        sample = nbytes / seconds
+        if self.throughput is None:
+            self.throughput = sample
+        else:
+            self.throughput = (
+                THROUGHPUT_SMOOTHING * sample
+                + (1 - THROUGHPUT_SMOOTHING) * self.throughput
+            )
+
+        wanted = self.throughput * self.target_seconds
+        if wanted > self.size:
+            if self._streak < GROWTH_HOLD_CHUNKS:
+                return
+            wanted = min(wanted, self.size * 2)
+        self._resize(wanted)
+
+    def record_failure(self) -> None:
+        """Account for a failed chunk: halve the next one."""
+        self.failures += 1
+        self._streak = 0
+        self._resize(self.size // 2)
+
+    def summary(self) -> str:
+        """Describe the transfer so far for the log."""
+        rate = self.bytes_sent / self.seconds if self.seconds else 0.0
+        return (
+            f"{self.bytes_sent / 1024 / 1024:.1f}MB in {self.seconds:.1f}s "
+            f"({rate / 1024 / 1024:.2f}MB/s), {self.chunks} chunks, "
+            f"{self.failures} failed, chunk size "
+            f"{self.smallest // 1024}-{self.largest // 1024}KiB"
+        )
+
+
+class AdaptiveMediaFileUpload(MediaFileUpload):
+    """Resumable file upload whose chunk size follows a ChunkSizeController."""
+
+    def __init__(
+        self,
+        filename: str,
+        controller: Optional[ChunkSizeController] = None,
+        mimetype: Optional[str] = None,
+    ) -> None:
+        self.controller = controller or ChunkSizeController()
+        super().__init__(
+            filename,
+            mimetype=mimetype,
+            chunksize=self.controller.size,
+            resumable=True,
+        )
+
+    def chunksize(self) -> int:
+        """Size of the next chunk, re-read before every request."""
+        return self.controller.size
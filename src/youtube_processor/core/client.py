@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import google_auth_httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+from ..config import settings
+from ..exceptions import OAuth2Error
+
+logger = logging.getLogger(__name__)
+
+
+class YouTubeClientManager:
+    """
+    Process-wide owner of the YouTube credentials and API service.
+
+    Credentials are loaded (or obtained through the OAuth flow) once and kept
+    in memory, and refreshed shortly before they expire rather than after a
+    request fails. The discovery document is parsed once. Because httplib2
+    connections are not thread-safe, every thread gets its own authorized
+    transport and service object built from the shared document.
+    """
+
+    SCOPES = [
+        "https://www.googleapis.com/auth/youtube.upload",
+        "https://www.googleapis.com/auth/youtube",
+        "https://www.googleapis.com/auth/youtube.force-ssl",
+    ]
+    API_SERVICE_NAME = "youtube"
+    API_VERSION = "v3"
+
+    _shared: Optional["YouTubeClientManager"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        credentials_path: Optional[Path] = None,
+        token_path: Optional[Path] = None,
+        refresh_margin: Optional[int] = None,
+    ) -> None:
+        self.credentials_path = Path(credentials_path or settings.CREDENTIALS_PATH)
+        self.token_path = Path(token_path or settings.TOKEN_PATH)
+        self.refresh_margin = timedelta(
+            seconds=(
+                settings.TOKEN_REFRESH_MARGIN
+                if refresh_margin is None
+                else refresh_margin
+            )
+        )
+        self._credentials: Optional[Credentials] = None
+        self._document: Optional[Dict[str, Any]] = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @classmethod
+    def shared(cls) -> "YouTubeClientManager":
+        """Return the manager shared by every client in this process."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _find_available_port(self) -> int:
+        """Find an available port for the OAuth callback server."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("localhost", 0))
+            s.listen(1)
+            port: int = s.getsockname()[1]
+        return port
+
+    def _load_token(self) -> Optional[Credentials]:
+        """Load saved credentials, discarding an unreadable token file."""
+        if not self.token_path.exists():
+            return None
+
+        try:
+            logger.debug(f"Loading existing token from {self.token_path}")
+            credentials: Credentials = Credentials.from_authorized_user_file(
+                str(self.token_path), self.SCOPES
+            )
+            return credentials
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Error loading token: {str(e)}")
+            self.token_path.unlink(missing_ok=True)  # Delete invalid token
+            return None
+
+    def _save_token(self, credentials: Credentials) -> None:
+        """Atomically persist credentials for the next run."""
+        temp_path = self.token_path.with_name(
+            f".{self.token_path.name}.{uuid.uuid4().hex}"
+        )
+        try:
+            temp_path.write_text(credentials.to_json())
+            os.replace(temp_path, self.token_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    def _run_oauth_flow(self) -> Credentials:
+        """Obtain new credentials through the local-server OAuth flow."""
+        logger.info("Getting new credentials")
+        # Find an available port
+        port = self._find_available_port()
+        redirect_uri = f"http://localhost:{port}"
+        logger.info(f"Using redirect URI: {redirect_uri}")
+
+        try:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                self.credentials_path, self.SCOPES, redirect_uri=redirect_uri
+            )
+            credentials: Credentials = flow.run_local_server(
+                port=port, access_type="offline", include_granted_scopes="true"
+            )
+        except Exception as e:
+            logger.error(f"Failed to get new credentials: {str(e)}")
+            raise OAuth2Error(
+                f"Authentication failed: {str(e)}. "
+                f"Please ensure {redirect_uri} is added to the authorized "
+                "redirect URIs in your Google Cloud Console."
+            )
+
+        # Save the credentials for future use
+        self._save_token(credentials)
+        logger.info(f"New credentials saved to {self.token_path}")
+        return credentials
+
+    def _needs_refresh(self, credentials: Credentials) -> bool:
+        """Check whether credentials expire within the refresh margin."""
+        if not credentials.token or credentials.expiry is None:
+            return not credentials.valid
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return bool(credentials.expiry - self.refresh_margin <= now)
+
+    @property
+    def credentials(self) -> Credentials:
+        """
+        Return valid credentials, refreshing them before they expire.
+
+        Raises:
+            OAuth2Error: If no valid credentials can be obtained
+        """
+        with self._lock:
+            if self._credentials is None:
+                self._credentials = self._load_token()
+
+            credentials = self._credentials
+            if credentials is not None and self._needs_refresh(credentials):
+                if credentials.refresh_token:
+                    logger.info("Refreshing token before it expires")
+                    try:
+                        credentials.refresh(Request())
+                        self._save_token(credentials)
+                    except Exception as e:
+                        logger.error(f"Token refresh failed: {str(e)}")
+                        credentials = None
+                else:
+                    credentials = None
+
+            if credentials is None:
+                credentials = self._run_oauth_flow()
+
+            self._credentials = credentials
+            return credentials
+
+    def _discovery_document(self) -> Dict[str, Any]:
+        """Return the parsed discovery document, loading it only once."""
+        with self._lock:
+            if self._document is None:
+                document = get_static_doc(self.API_SERVICE_NAME, self.API_VERSION)
+                if document is not None:
+                    self._document = json.loads(document)
+                else:
+                    service = build(
+                        self.API_SERVICE_NAME,
+                        self.API_VERSION,
+                        credentials=self.credentials,
+                        static_discovery=False,
+                    )
+                    # Older googleapiclient releases ship no static document;
+                    # the built service keeps the fetched one only privately
+                    # pylint: disable-next=protected-access
+                    self._document = service._rootDesc
+            return self._document
+
+    def service(self) -> Any:
+        """
+        Return this thread's authorized YouTube service.
+
+        Raises:
+            OAuth2Error: If the service cannot be created
+        """
+        credentials = self.credentials
+        service = getattr(self._local, "service", None)
+        # A new OAuth flow replaces the credentials object; rebuild then
+        if service is not None and self._local.credentials is credentials:
+            return service
+
+        try:
+            http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+            service = build_from_document(self._discovery_document(), http=http)
+        except OAuth2Error:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to build YouTube service: {str(e)}")
+            raise OAuth2Error(f"YouTube API service creation failed: {str(e)}")
+
+        self._local.service = service
+        self._local.credentials = credentials
+        logger.debug(f"Built YouTube service for {threading.current_thread().name}")
+        return service
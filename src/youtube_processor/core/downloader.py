@@ -1,33 +1,144 @@
 # src/youtube_processor/core/downloader.py
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fractions import Fraction
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 
 import yt_dlp
+from yt_dlp.extractor.youtube import YoutubeIE
 
 from ..config import settings
 from ..exceptions import VideoDownloadError
-from ..models import VideoMetadata
+from ..models import DownloadResult, PrefetchResult, StreamSpec, VideoMetadata
+from .cache import DownloadCache
 
 logger = logging.getLogger(__name__)
 
+# yt-dlp reports RFC 6381 codec strings; map their prefixes to FFmpeg names
+CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hev1": "hevc",
+    "hvc1": "hevc",
+    "vp09": "vp9",
+    "av01": "av1",
+    "mp4a": "aac",
+    "ac-3": "ac3",
+    "ec-3": "eac3",
+}
+
+
+def normalize_codec(codec: Optional[str]) -> Optional[str]:
+    """Convert a yt-dlp codec string such as "avc1.640028" to an FFmpeg name."""
+    if not codec or codec == "none":
+        return None
+    name = codec.split(".")[0].lower()
+    return CODEC_NAMES.get(name, name)
+
+
+def stream_spec_from_info(info: Dict[str, Any]) -> Optional[StreamSpec]:
+    """Build a StreamSpec from a yt-dlp info dict, if it describes video."""
+    if not info.get("width") or not info.get("height"):
+        return None
+
+    vcodec = info.get("vcodec") or ""
+    # VP9 and AV1 codec strings carry the bit depth as their last field
+    bit_depth = vcodec.split(".")[-1] if vcodec[:4] in ("vp09", "av01") else ""
+    fps = Fraction(info.get("fps") or 30).limit_denominator(1001)
+    ntsc_base = round(float(fps) * 1.001)
+    if fps.denominator != 1 and abs(float(fps) * 1.001 - ntsc_base) < 0.01:
+        fps = Fraction(ntsc_base * 1000, 1001)  # 29.97 is really 30000/1001
+
+    return StreamSpec(
+        width=int(info["width"]),
+        height=int(info["height"]),
+        fps=f"{fps.numerator}/{fps.denominator}",
+        video_codec=normalize_codec(vcodec) or "h264",
+        pix_fmt="yuv420p10le" if bit_depth == "10" else "yuv420p",
+        audio_codec=normalize_codec(info.get("acodec")),
+        sample_rate=info.get("asr"),
+        channels=info.get("audio_channels"),
+    )
+
+
+def _filesize_from_info(info: Dict[str, Any]) -> Optional[int]:
+    """Return the exact or approximate download size from a yt-dlp info dict."""
+    formats = info.get("requested_formats") or [info]
+    sizes = [f.get("filesize") or f.get("filesize_approx") for f in formats]
+    if not all(sizes):
+        return None
+    return int(sum(sizes))
+
 
 class VideoDownloader:
     """Handles video downloading using yt-dlp."""
 
-    def __init__(self) -> None:
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, cache: Optional[DownloadCache] = None) -> None:
         self.output_path = Path(settings.OUTPUT_DIR)
         self._ensure_output_directory()
+        self.cache = cache or DownloadCache(self.output_path)
 
     def _ensure_output_directory(self) -> None:
         """Ensure output directory exists."""
         self.output_path.mkdir(parents=True, exist_ok=True)
         logger.info(f"Output directory ready: {self.output_path}")
 
+    @classmethod
+    def _lock_for(cls, video_id: str) -> threading.Lock:
+        """Return the process-wide lock guarding downloads of a video."""
+        with cls._locks_guard:
+            return cls._locks.setdefault(video_id, threading.Lock())
+
+    @staticmethod
+    def _metadata_from_info(info: Dict[str, Any], url: str) -> VideoMetadata:
+        """Build VideoMetadata from a yt-dlp info dict."""
+        return VideoMetadata(
+            title=info["title"],
+            description=info.get("description") or "",
+            tags=info.get("tags") or [],
+            thumbnail_url=info.get("thumbnail", ""),
+            duration=int(info["duration"]) if info.get("duration") else None,
+            original_url=url,
+            stream_spec=stream_spec_from_info(info),
+        )
+
+    def _cached_download(
+        self, video_id: Optional[str], url: str
+    ) -> Optional[Tuple[Path, VideoMetadata]]:
+        """Return a previously completed download of the video, if any."""
+        if not video_id:
+            return None
+
+        cached = self.cache.lookup(
+            video_id,
+            settings.VIDEO_QUALITY,
+            verify_checksum=settings.DOWNLOAD_CACHE_VERIFY_CHECKSUM,
+        )
+        if not cached:
+            return None
+
+        video_path, info = cached
+        logger.info(f"Reusing cached download: {video_path}")
+        return video_path, self._metadata_from_info(info, url)
+
     def download(self, url: str) -> Tuple[Path, VideoMetadata]:
         """
         Download video and extract metadata.
 
+        Completed downloads are recorded in the download cache and reused on
+        later calls for the same video ID; interrupted downloads resume from
+        their partial file.
+
         Args:
             url: YouTube video URL
 
@@ -46,27 +157,181 @@ class VideoDownloader:
             "quiet": True,
             "no_warnings": True,
             "extract_flat": False,
+            "concurrent_fragment_downloads": settings.CONCURRENT_FRAGMENT_DOWNLOADS,
+            "continuedl": True,  # Resume .part files left by interrupted runs
         }
 
         try:
+            # Known YouTube URLs can be served from the cache without any
+            # network round trip
+            cached = self._cached_download(YoutubeIE.get_temp_id(url), url)
+            if cached:
+                return cached
+
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 logger.info(f"Starting download: {url}")
-                info = ydl.extract_info(url, download=True)
+                info = ydl.extract_info(url, download=False)
 
-                video_path = self.output_path / f"{info['id']}.{info['ext']}"
+                # Serialize concurrent downloads of the same video so they
+                # never write to the same partial file
+                with self._lock_for(info["id"]):
+                    cached = self._cached_download(info["id"], url)
+                    if cached:
+                        return cached
 
-                metadata = VideoMetadata(
-                    title=info["title"],
-                    description=info["description"],
-                    tags=info.get("tags", []),
-                    thumbnail_url=info.get("thumbnail", ""),
-                    duration=info["duration"],
-                    original_url=url,
-                )
+                    ydl.process_info(info)
+                    video_path = self.output_path / f"{info['id']}.{info['ext']}"
+                    self.cache.store(
+                        info["id"],
+                        settings.VIDEO_QUALITY,
+                        video_path,
+                        ydl.sanitize_info(info),
+                    )
 
                 logger.info(f"Download complete: {video_path}")
-                return video_path, metadata
+                return video_path, self._metadata_from_info(info, url)
 
         except Exception as e:
             logger.error(f"Download failed: {str(e)}")
-            raise VideoDownloadError(f"Failed to download {url}: {str(e)}")
+            raise VideoDownloadError(f"Failed to download {url}: {str(e)}", url=url)
+
+    def download_many(
+        self, urls: Iterable[str], max_workers: Optional[int] = None
+    ) -> Iterator[DownloadResult]:
+        """
+        Download several videos concurrently.
+
+        Results are yielded as soon as each download finishes, so callers can
+        start working on the first videos while the rest are still downloading.
+
+        Args:
+            urls: YouTube video URLs
+            max_workers: Maximum parallel downloads, defaults to
+                MAX_CONCURRENT_DOWNLOADS
+
+        Yields:
+            DownloadResult for each URL, in completion order
+        """
+        for url, value, error in self._map_concurrently(
+            self.download, urls, max_workers
+        ):
+            if error:
+                yield DownloadResult(url=url, error=error)
+            else:
+                video_path, metadata = value
+                yield DownloadResult(url=url, video_path=video_path, metadata=metadata)
+
+    def fetch_metadata(self, url: str) -> PrefetchResult:
+        """
+        Resolve video metadata and stream specs without downloading the video.
+
+        Results are cached on disk for METADATA_CACHE_TTL seconds.
+
+        Args:
+            url: YouTube video URL
+
+        Returns:
+            PrefetchResult with metadata, stream spec and approximate size
+
+        Raises:
+            VideoDownloadError: If the metadata cannot be extracted
+        """
+        cache_path = self._metadata_cache_path(YoutubeIE.get_temp_id(url) or url)
+        try:
+            with open(cache_path, "r") as f:
+                entry = json.load(f)
+            if time.time() - entry["fetched_at"] < settings.METADATA_CACHE_TTL:
+                result = PrefetchResult(url=url, **entry["result"])
+                if result.metadata:
+                    result.metadata.original_url = url
+                return result
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+        ydl_opts = {
+            "format": settings.VIDEO_QUALITY,
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+        }
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                logger.info(f"Fetching metadata: {url}")
+                info = ydl.extract_info(url, download=False)
+
+            result = PrefetchResult(
+                url=url,
+                metadata=self._metadata_from_info(info, url),
+                stream_spec=stream_spec_from_info(info),
+                filesize=_filesize_from_info(info),
+            )
+        except Exception as e:
+            logger.error(f"Metadata extraction failed: {str(e)}")
+            raise VideoDownloadError(
+                f"Failed to fetch metadata for {url}: {str(e)}", url=url
+            )
+
+        entry = {
+            "fetched_at": time.time(),
+            "result": result.model_dump(mode="json", exclude={"url", "error"}),
+        }
+        temp_path = cache_path.with_name(f".{cache_path.name}.{uuid.uuid4().hex}")
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, cache_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        return result
+
+    def prefetch_metadata(
+        self, urls: Iterable[str], max_workers: Optional[int] = None
+    ) -> Iterator[PrefetchResult]:
+        """
+        Resolve metadata for many URLs concurrently, without downloading.
+
+        Use this to plan a batch (order it by duration or size, reject
+        unavailable videos) before committing to any downloads.
+
+        Args:
+            urls: YouTube video URLs
+            max_workers: Maximum parallel requests, defaults to
+                MAX_CONCURRENT_DOWNLOADS
+
+        Yields:
+            PrefetchResult for each URL, in completion order
+        """
+        for url, value, error in self._map_concurrently(
+            self.fetch_metadata, urls, max_workers
+        ):
+            yield PrefetchResult(url=url, error=error) if error else value
+
+    def _metadata_cache_path(self, key: str) -> Path:
+        """Return the on-disk location of the cached metadata for a key."""
+        cache_dir = Path(settings.CACHE_DIR) / "metadata"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        return cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+    def _map_concurrently(
+        self,
+        func: Callable[[str], Any],
+        urls: Iterable[str],
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """Run ``func`` for each URL on a thread pool, yielding as they finish."""
+        max_workers = max_workers or settings.MAX_CONCURRENT_DOWNLOADS
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="download"
+        ) as executor:
+            futures = {executor.submit(func, url): url for url in urls}
+            logger.info(f"Fetching {len(futures)} videos, {max_workers} at a time")
+
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    yield url, future.result(), None
+                except Exception as e:
+                    yield url, None, str(e)
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional
+
+from ..config import settings
+from ..exceptions import ValidationError
+from ..models import IngestedFile
+
+logger = logging.getLogger(__name__)
+
+
+def upload_root() -> Path:
+    """Return the directory holding ingested uploads."""
+    return Path(settings.WORK_DIR) / "uploads"
+
+
+async def ingest_stream(
+    chunks: AsyncIterable[bytes],
+    filename: str,
+    root: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> IngestedFile:
+    """
+    Write a stream of bytes to a private directory, hashing it on the way.
+
+    Incoming chunks are gathered into writes of about ``chunk_size`` bytes,
+    so memory use is bounded whatever the size of the file. Disk writes run
+    on a worker thread so the event loop stays free. The directory is
+    removed again if the stream fails or grows too large; the limit is
+    checked as bytes arrive, before they are written.
+
+    Args:
+        chunks: Async iterable of the file's bytes, e.g. ``request.stream()``
+        filename: Client supplied name; only its final component is used
+        root: Parent of the upload's directory, defaults to WORK_DIR/uploads
+        max_bytes: Largest accepted upload, defaults to MAX_UPLOAD_SIZE
+        chunk_size: Bytes written per step
+
+    Returns:
+        The stored file with its size and SHA-256
+
+    Raises:
+        ValidationError: If the stream exceeds ``max_bytes``
+    """
+    max_bytes = settings.MAX_UPLOAD_SIZE if max_bytes is None else max_bytes
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+    root = Path(root or upload_root())
+    root.mkdir(parents=True, exist_ok=True)
+    directory = Path(tempfile.mkdtemp(prefix="upload_", dir=root))
+    path = directory / (Path(filename or "").name or "upload")
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    try:
+        with open(path, "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValidationError(
+                        f"Upload exceeds the limit of {max_bytes} bytes",
+                        "file",
+                        size,
+                    )
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= chunk_size:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(f.write, bytes(buffer))
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    logger.info(f"Ingested upload {path.name} ({size} bytes)")
+    return IngestedFile(path=path, size=size, sha256=digest.hexdigest())
+
+
+async def ingest_upload(
+    upload: Any,
+    filename: str,
+    root: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> IngestedFile:
+    """
+    Copy an uploaded file to a private directory; see ingest_stream.
+
+    The upload is written twice: a FastAPI UploadFile has already been
+    spooled to an anonymous temporary file, which cannot be moved into
+    place. Use ingest_stream on the request body to write it only once.
+
+    Args:
+        upload: Object with an async ``read(size)``, e.g. a FastAPI UploadFile
+        filename: Client supplied name; only its final component is used
+        root: Parent of the upload's directory, defaults to WORK_DIR/uploads
+        max_bytes: Largest accepted upload, defaults to MAX_UPLOAD_SIZE
+        chunk_size: Bytes read and written per step
+
+    Returns:
+        The stored file with its size and SHA-256
+
+    Raises:
+        ValidationError: If the upload exceeds ``max_bytes``
+    """
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+
+    async def chunks() -> AsyncIterator[bytes]:
+        while chunk := await upload.read(chunk_size):
+            yield chunk
+
+    return await ingest_stream(chunks(), filename, root, max_bytes, chunk_size)
+
+
+def remove_upload(path: Path) -> None:
+    """Remove an ingested upload together with its private directory."""
+    directory = Path(path).parent
+    if directory.name.startswith("upload_"):
+        shutil.rmtree(directory, ignore_errors=True)
+        logger.debug(f"Removed upload directory: {directory}")
+
+
+def remove_stale_uploads(
+    max_age: Optional[float] = None, keep: Iterable[Path] = ()
+) -> int:
+    """
+    Remove upload directories left behind by a crashed process.
+
+    Args:
+        max_age: Seconds after which an upload counts as abandoned
+        keep: Uploads still waiting to be processed, e.g. by queued jobs,
+            which are kept however old they are
+
+    Returns:
+        Number of directories removed
+    """
+    max_age = settings.UPLOAD_RETENTION if max_age is None else max_age
+    root = upload_root()
+    if not root.is_dir():
+        return 0
+
+    cutoff = time.time() - max_age
+    in_use = {Path(path).parent for path in keep}
+    removed = 0
+    for directory in root.glob("upload_*"):
+        if directory in in_use:
+            continue
+        try:
+            if directory.stat().st_mtime < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"Removed {removed} stale upload directories")
+    return removed
@@ -0,0 +1,537 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..config import settings
+from ..exceptions import JobQueueFullError, StorageError
+from ..models import BatchItemResult, JobEvent, JobItemState, JobState
+from .batch import item_label, run_item
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    idx INTEGER,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, id);
+CREATE TABLE IF NOT EXISTS job_runners (
+    owner TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+# Heartbeats a job runner may miss before its jobs count as interrupted
+MISSED_HEARTBEATS = 3
+
+
+class JobStore:
+    """
+    Batch jobs and the state of their items, persisted in SQLite.
+
+    The database runs in WAL mode, so any number of API workers can read job
+    state while one of them writes, and state survives restarts. Every
+    thread gets its own connection.
+
+    Each job records the JobRunner that queued it. Runners write heartbeats,
+    so the jobs of one that stopped (e.g. a killed server) can be told apart
+    from jobs that are still being worked on.
+    """
+
+    # Item states, in the order an item moves through them
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or settings.JOB_STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        db = self._connection()
+        db.executescript(SCHEMA)
+        columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            try:
+                db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            except sqlite3.OperationalError:
+                pass  # Added by another worker in the meantime
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            try:
+                db = sqlite3.connect(
+                    self.path,
+                    timeout=settings.JOB_STORE_TIMEOUT,
+                    isolation_level=None,  # Transactions are explicit
+                )
+                db.row_factory = sqlite3.Row
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute("PRAGMA foreign_keys=ON")
+            except sqlite3.Error as e:
+                raise StorageError(
+                    f"Failed to open job store: {str(e)}", str(self.path), "open"
+                )
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction."""
+        db = self._connection()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except sqlite3.Error as e:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise StorageError(
+                f"Job store write failed: {str(e)}", str(self.path), "write"
+            )
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _add_event(
+        db: sqlite3.Connection,
+        job_id: str,
+        index: Optional[int],
+        event_type: str,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Append an event to the log inside the caller's transaction."""
+        db.execute(
+            "INSERT INTO job_events (job_id, idx, type, data, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (job_id, index, event_type, json.dumps(data or {}), time.time()),
+        )
+
+    def create_job(self, items: List[Dict[str, Any]]) -> str:
+        """
+        Record a new job with all its items pending.
+
+        Args:
+            items: Keyword arguments of each item, stored for the workers
+
+        Returns:
+            The new job's unique ID
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, total, created_at, updated_at) "
+                "VALUES (?, 'processing', ?, ?, ?)",
+                (job_id, len(items), now, now),
+            )
+            db.executemany(
+                "INSERT INTO job_items "
+                "(job_id, idx, label, payload, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        job_id,
+                        index,
+                        item_label(index, item),
+                        json.dumps(item, default=str),
+                        self.PENDING,
+                        now,
+                    )
+                    for index, item in enumerate(items)
+                ],
+            )
+            self._add_event(db, job_id, None, "job.created", {"total": len(items)})
+        logger.info(f"Created job {job_id} with {len(items)} items")
+        return job_id
+
+    def items(self, job_id: str) -> List[Dict[str, Any]]:
+        """Return the stored keyword arguments of a job's items, in order."""
+        rows = self._connection().execute(
+            "SELECT payload FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+        )
+        return [json.loads(row["payload"]) for row in rows]
+
+    def unfinished_items(self) -> List[Dict[str, Any]]:
+        """Return the stored keyword arguments of every pending or running item."""
+        rows = self._connection().execute(
+            "SELECT payload FROM job_items WHERE status IN (?, ?)",
+            (self.PENDING, self.RUNNING),
+        )
+        return [json.loads(row["payload"]) for row in rows]
+
+    def start_item(self, job_id: str, index: int) -> None:
+        """Mark an item as being worked on."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE job_items SET status = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (self.RUNNING, time.time(), job_id, index),
+            )
+            self._add_event(db, job_id, index, "item.running")
+
+    def report_progress(
+        self, job_id: str, index: int, stage: str, data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record the stage an item is in, with e.g. the bytes uploaded so far."""
+        with self._transaction() as db:
+            self._add_event(
+                db, job_id, index, "item.progress", {"stage": stage, **(data or {})}
+            )
+
+    def finish_item(self, job_id: str, result: BatchItemResult) -> None:
+        """Record the outcome of an item."""
+        status = self.SUCCEEDED if result.success else self.FAILED
+        value = None if result.result is None else str(result.result)
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, "
+                "updated_at = ? WHERE job_id = ? AND idx = ?",
+                (status, value, result.error, time.time(), job_id, result.index),
+            )
+            self._add_event(
+                db,
+                job_id,
+                result.index,
+                f"item.{status}",
+                {"result": value, "error": result.error},
+            )
+
+    def unfinished(self, job_id: str) -> int:
+        """Return the number of items still pending or running."""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status IN (?, ?)",
+                (job_id, self.PENDING, self.RUNNING),
+            )
+            .fetchone()
+        )
+        return int(row[0])
+
+    def finish_job(self, job_id: str, status: str = "completed") -> None:
+        """Mark a job as finished."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (status, time.time(), job_id),
+            )
+            self._add_event(db, job_id, None, f"job.{status}")
+
+    def claim_job(self, job_id: str, owner: str) -> None:
+        """Record the runner that works on a job."""
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET owner = ? WHERE id = ?", (owner, job_id))
+
+    def heartbeat(self, owner: str) -> None:
+        """Record that a runner is alive."""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO job_runners (owner, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT (owner) "
+                "DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (owner, time.time()),
+            )
+
+    def recover_interrupted(self, max_age: float) -> int:
+        """
+        Fail the unfinished items of jobs whose runner has stopped.
+
+        A job counts as interrupted when it is older than ``max_age`` and its
+        runner has not written a heartbeat for ``max_age``. Its pending and
+        running items fail with "interrupted" and the job finishes with
+        status "interrupted", so clients stop waiting for it.
+
+        Args:
+            max_age: Seconds without a heartbeat after which a runner is dead
+
+        Returns:
+            Number of jobs recovered
+        """
+        cutoff = time.time() - max_age
+        with self._transaction() as db:
+            job_ids = [
+                row["id"]
+                for row in db.execute(
+                    "SELECT id FROM jobs WHERE status = 'processing' "
+                    "AND updated_at < ? AND (owner IS NULL OR owner NOT IN "
+                    "(SELECT owner FROM job_runners WHERE heartbeat_at >= ?))",
+                    (cutoff, cutoff),
+                )
+            ]
+            for job_id in job_ids:
+                indexes = [
+                    row["idx"]
+                    for row in db.execute(
+                        "SELECT idx FROM job_items WHERE job_id = ? "
+                        "AND status IN (?, ?) ORDER BY idx",
+                        (job_id, self.PENDING, self.RUNNING),
+                    )
+                ]
+                db.execute(
+                    "UPDATE job_items SET status = ?, error = 'interrupted', "
+                    "updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                    (self.FAILED, time.time(), job_id, self.PENDING, self.RUNNING),
+                )
+                for index in indexes:
+                    self._add_event(
+                        db,
+                        job_id,
+                        index,
+                        f"item.{self.FAILED}",
+                        {"result": None, "error": "interrupted"},
+                    )
+                db.execute(
+                    "UPDATE jobs SET status = 'interrupted', updated_at = ? "
+                    "WHERE id = ?",
+                    (time.time(), job_id),
+                )
+                self._add_event(db, job_id, None, "job.interrupted")
+        for job_id in job_ids:
+            logger.warning(f"Job {job_id} was interrupted, its runner has stopped")
+        return len(job_ids)
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """
+        Delete finished jobs, with their items and events, and dead runners.
+
+        Args:
+            max_age: Seconds a finished job is kept, defaults to JOB_RETENTION
+
+        Returns:
+            Number of jobs deleted
+        """
+        max_age = settings.JOB_RETENTION if max_age is None else max_age
+        cutoff = time.time() - max_age
+        with self._transaction() as db:
+            deleted = db.execute(
+                "DELETE FROM jobs WHERE status != 'processing' AND updated_at < ?",
+                (cutoff,),
+            ).rowcount
+            db.execute("DELETE FROM job_runners WHERE heartbeat_at < ?", (cutoff,))
+        if deleted:
+            logger.info(f"Pruned {deleted} finished jobs")
+        return deleted
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[JobEvent]:
+        """
+        Return a job's events newer than ``after``, oldest first.
+
+        Args:
+            job_id: Job to read events of
+            after: ID of the last event the caller has seen
+            limit: Most events to return at once
+
+        Returns:
+            The events, empty if there are none yet
+        """
+        rows = self._connection().execute(
+            "SELECT * FROM job_events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (job_id, after, limit),
+        )
+        return [
+            JobEvent(
+                id=row["id"],
+                job_id=row["job_id"],
+                index=row["idx"],
+                type=row["type"],
+                data=json.loads(row["data"]),
+                created_at=row["created_at"],
+            )
+            for row in rows
+        ]
+
+    def get_job(self, job_id: str) -> Optional[JobState]:
+        """Return a job with the state of all its items, or None."""
+        db = self._connection()
+        # One read transaction, so the job and its items are consistent
+        db.execute("BEGIN")
+        try:
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            rows = db.execute(
+                "SELECT idx, label, status, result, error FROM job_items "
+                "WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        finally:
+            db.execute("COMMIT")
+
+        if job is None:
+            return None
+        return JobState(
+            job_id=job["id"],
+            status=job["status"],
+            total=job["total"],
+            created_at=job["created_at"],
+            updated_at=job["updated_at"],
+            items=[
+                JobItemState(
+                    index=row["idx"],
+                    label=row["label"],
+                    status=row["status"],
+                    result=row["result"],
+                    error=row["error"],
+                )
+                for row in rows
+            ],
+        )
+
+
+class JobRunner:
+    """
+    Works through stored jobs on a fixed pool of worker threads.
+
+    Items are fed to the workers through a bounded queue: ``submit`` refuses
+    a job that does not fit instead of letting a backlog grow without limit.
+    Processing runs FFmpeg and network transfers, which release the GIL, so
+    threads keep the caller (e.g. the API's event loop) free without the cost
+    of worker processes.
+
+    BatchEngine is not reused here: it runs one iterable of items per call
+    and blocks until that batch is done, while jobs arrive one request at a
+    time and share one bounded queue. Each item still runs through the same
+    ``run_item`` as in the engine, so results look the same.
+
+    With ``progress`` the function is also passed a ``progress(stage, data)``
+    callback that records item.progress events in the store.
+
+    A maintenance thread writes the runner's heartbeat every
+    JOB_HEARTBEAT_INTERVAL, fails the jobs of runners that stopped (queued
+    items live in memory and die with their process) and prunes jobs older
+    than JOB_RETENTION.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        func: Callable[..., Any],
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        progress: bool = False,
+    ) -> None:
+        self.store = store
+        self.func = func
+        self.progress = progress
+        self.workers = workers or settings.JOB_WORKERS
+        self.queue_size = queue_size or settings.JOB_QUEUE_SIZE
+        self._queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.owner = uuid.uuid4().hex
+        self.store.heartbeat(self.owner)
+        threading.Thread(
+            target=self._maintain, name="job-maintenance", daemon=True
+        ).start()
+
+    def _start(self) -> None:
+        """Start the worker threads on first use."""
+        if self._threads:
+            return
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job_id: str) -> None:
+        """
+        Queue all items of a stored job.
+
+        Raises:
+            JobQueueFullError: If the queue cannot take the whole job
+        """
+        items = self.store.items(job_id)
+        with self._lock:
+            self._start()
+            free = self.queue_size - self._queue.qsize()
+            if len(items) > free:
+                raise JobQueueFullError(
+                    f"Job queue is full ({free} of {self.queue_size} slots free)",
+                    retry_after=30,
+                )
+            self.store.claim_job(job_id, self.owner)
+            for index, item in enumerate(items):
+                self._queue.put_nowait((job_id, index, item))
+        logger.info(f"Queued job {job_id} with {len(items)} items")
+
+    def _work(self) -> None:
+        """Process queued items until the process exits."""
+        while True:
+            job_id, index, item = self._queue.get()
+            try:
+                self.store.start_item(job_id, index)
+                if self.progress:
+                    item = {**item, "progress": self._reporter(job_id, index)}
+                result = run_item(self.func, index, item_label(index, item), item)
+                self.store.finish_item(job_id, result)
+                if self.store.unfinished(job_id) == 0:
+                    self.store.finish_job(job_id)
+                    logger.info(f"Job {job_id} completed")
+            except Exception as e:
+                logger.error(f"Job {job_id} item {index} could not be recorded: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _maintain(self) -> None:
+        """Keep the runner's heartbeat fresh and clean up the store."""
+        interval = settings.JOB_HEARTBEAT_INTERVAL
+        while True:
+            try:
+                self.store.heartbeat(self.owner)
+                self.store.recover_interrupted(interval * MISSED_HEARTBEATS)
+                self.store.prune()
+            except StorageError as e:
+                logger.warning(f"Job store maintenance failed: {e}")
+            time.sleep(interval)
+
+    def _reporter(self, job_id: str, index: int) -> Callable[..., None]:
+        """Return the progress callback of one item."""
+
+        def report(stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+            try:
+                self.store.report_progress(job_id, index, stage, data)
+            except StorageError as e:
+                # Progress is informational, never worth failing the item for
+                logger.warning(f"Could not record progress of job {job_id}: {e}")
+
+        return report
+
+    def join(self) -> None:
+        """Block until every queued item has been processed."""
+        self._queue.join()
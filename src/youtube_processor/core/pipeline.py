@@ -0,0 +1,516 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..models import (
+    BatchItemResult,
+    PipelineStageStats,
+    PostUploadCall,
+    PostUploadResult,
+    VideoMetadata,
+)
+from .batch import default_worker_count
+from .downloader import VideoDownloader
+from .processor import VideoProcessor
+from .quota import QuotaScheduler
+from .upload_index import ChecksumCache, index_key_for
+from .youtube_api import YouTubeAPI
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the item stream in a stage queue
+_DONE = object()
+
+
+class _PipelineJob:
+    """State of one batch item as it moves through the pipeline."""
+
+    def __init__(self, index: int, item: Dict[str, Any]) -> None:
+        self.index = index
+        self.item = item
+        self.label = str(item.get("input_path") or f"item {index + 1}")
+        self.video_path: Optional[Path] = None
+        self.metadata: Optional[VideoMetadata] = None
+        self.processed_path: Optional[Path] = None
+        self.video_id: Optional[str] = None
+        self.index_key: Optional[str] = None
+        self.error: Optional[str] = None
+        self.started = time.monotonic()
+
+    def source(self) -> Tuple[Path, VideoMetadata]:
+        """Return the video file and metadata set by the download stage."""
+        if self.video_path is None or self.metadata is None:
+            raise RuntimeError(f"{self.label} has not been downloaded")
+        return self.video_path, self.metadata
+
+
+class _Stage:
+    """A pool of worker threads between two bounded queues."""
+
+    def __init__(
+        self,
+        name: str,
+        handler_factory: Callable[[], Callable[[_PipelineJob], None]],
+        workers: int,
+        input_queue: queue.Queue,
+        output_queue: queue.Queue,
+    ) -> None:
+        self.name = name
+        self.handler_factory = handler_factory
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stats = PipelineStageStats(name=name, workers=workers)
+        self._active = workers
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the stage's worker threads."""
+        for number in range(self.stats.workers):
+            threading.Thread(
+                target=self._work, name=f"{self.name}-{number}", daemon=True
+            ).start()
+
+    def _work(self) -> None:
+        """Process jobs until the end marker arrives."""
+        handler = None
+        while True:
+            job = self.input_queue.get()
+            if job is _DONE:
+                with self._lock:
+                    self._active -= 1
+                    remaining = self._active
+                # Wake the next sibling, or tell the next stage we are done
+                if remaining:
+                    self.input_queue.put(_DONE)
+                else:
+                    self.output_queue.put(_DONE)
+                return
+
+            with self._lock:
+                self.stats.max_queue_depth = max(
+                    self.stats.max_queue_depth, self.input_queue.qsize() + 1
+                )
+
+            if job.error is None:
+                start = time.monotonic()
+                try:
+                    # Handlers are created lazily, once per worker thread
+                    handler = handler or self.handler_factory()
+                    handler(job)
+                except Exception as e:
+                    logger.error(f"{self.name} failed for {job.label}: {str(e)}")
+                    job.error = f"{self.name} failed: {str(e)}"
+
+                with self._lock:
+                    self.stats.busy_seconds += time.monotonic() - start
+                    if job.error is None:
+                        self.stats.processed += 1
+                    else:
+                        self.stats.failed += 1
+
+            self.output_queue.put(job)
+
+    def snapshot(self) -> PipelineStageStats:
+        """Return a copy of the stage's counters with its current queue depth."""
+        with self._lock:
+            snapshot = self.stats.model_copy()
+        snapshot.queue_depth = self.input_queue.qsize()
+        return snapshot
+
+
+class BatchPipeline:
+    """
+    Runs download, processing and upload as overlapping stages.
+
+    Each stage has its own pool of worker threads and the stages are joined
+    by bounded queues, so while one item is uploading the next one is being
+    encoded and the one after that downloaded. FFmpeg runs in its own process,
+    so processing threads use every core without contending for the GIL.
+
+    With ``stream_uploads`` the upload stage runs FFmpeg itself and uploads
+    its output while it is produced, so no processed copy is written to disk;
+    the process stage then only passes items through.
+
+    Thumbnails and playlist insertions of uploaded videos are collected and
+    sent in batch requests once POST_UPLOAD_BATCH_SIZE calls are pending and
+    at the end of the run; their outcomes are in ``post_upload_results``.
+
+    Uploads only start while the daily API quota covers them; the rest wait
+    for the next quota window (or fail fast, see QUOTA_WAIT_FOR_RESET).
+    """
+
+    def __init__(
+        self,
+        download_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        upload_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        downloader_factory: Callable[[], VideoDownloader] = VideoDownloader,
+        processor_factory: Callable[[], VideoProcessor] = VideoProcessor,
+        youtube_api_factory: Callable[[], YouTubeAPI] = YouTubeAPI,
+        stream_uploads: Optional[bool] = None,
+        quota_scheduler: Optional[QuotaScheduler] = None,
+        checksums: Optional[ChecksumCache] = None,
+    ) -> None:
+        self.download_workers = (
+            download_workers
+            or settings.PIPELINE_DOWNLOAD_WORKERS
+            or settings.MAX_CONCURRENT_DOWNLOADS
+        )
+        self.process_workers = (
+            process_workers
+            or settings.PIPELINE_PROCESS_WORKERS
+            or default_worker_count()
+        )
+        self.upload_workers = upload_workers or settings.PIPELINE_UPLOAD_WORKERS
+        self.queue_size = queue_size or settings.PIPELINE_QUEUE_SIZE
+        self.downloader_factory = downloader_factory
+        self.processor_factory = processor_factory
+        self.youtube_api_factory = youtube_api_factory
+        self.stream_uploads = (
+            settings.STREAM_UPLOADS if stream_uploads is None else stream_uploads
+        )
+        self.quota_scheduler = quota_scheduler or QuotaScheduler()
+        self.checksums = checksums or ChecksumCache()
+        self.post_upload_results: List[PostUploadResult] = []
+        self._post_upload_calls: List[PostUploadCall] = []
+        self._post_upload_lock = threading.Lock()
+        self._stages: List[_Stage] = []
+        self._feed_error: Optional[Exception] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def _item_metadata(
+        self, job: _PipelineJob, metadata: Optional[VideoMetadata] = None
+    ) -> VideoMetadata:
+        """Apply the item's fields to the source metadata, or build it from them."""
+        item = job.item
+        if metadata is None:
+            return VideoMetadata(
+                title=item.get("title") or Path(item["input_path"]).stem,
+                description=item.get("description") or "",
+                tags=item.get("tags") or [],
+                thumbnail_path=item.get("thumbnail_path") or None,
+                playlist_ids=item.get("playlist_ids") or [],
+                **(item.get("video_options") or {}),
+            )
+
+        overrides = {
+            **(item.get("video_options") or {}),
+            **{
+                field: item[field]
+                for field in ("title", "description", "tags", "playlist_ids")
+                if item.get(field)
+            },
+        }
+        # A thumbnail given in the batch replaces the downloaded one
+        if item.get("thumbnail_path"):
+            overrides["thumbnail_path"] = Path(item["thumbnail_path"])
+        return metadata.model_copy(update=overrides)
+
+    def _download_handler(self) -> Callable[[_PipelineJob], None]:
+        """Return a download stage handler with its own clients."""
+        return partial(
+            self._download, self.downloader_factory(), self.youtube_api_factory()
+        )
+
+    def _process_handler(self) -> Callable[[_PipelineJob], None]:
+        """Return a process stage handler with its own processor."""
+        if self.stream_uploads:
+            return self._pass_through
+        return partial(self._process, self.processor_factory())
+
+    def _upload_handler(self) -> Callable[[_PipelineJob], None]:
+        """Return an upload stage handler with its own clients."""
+        if self.stream_uploads:
+            return partial(
+                self._stream_upload,
+                self.processor_factory(),
+                self.youtube_api_factory(),
+            )
+        return partial(self._upload, self.youtube_api_factory())
+
+    def _download(
+        self, downloader: VideoDownloader, youtube_api: YouTubeAPI, job: _PipelineJob
+    ) -> None:
+        """
+        Fetch the source video and resolve its metadata.
+
+        Content that was uploaded before with the same processing settings
+        is not downloaded at all: its metadata is updated in place, any new
+        post-upload calls are queued and the job skips the remaining stages.
+        """
+        item = job.item
+        is_youtube_url = bool(item.get("is_youtube_url"))
+        job.index_key = index_key_for(
+            item["input_path"], is_youtube_url, self.checksums
+        )
+
+        if job.index_key and youtube_api.indexed_video(job.index_key):
+            metadata = None
+            if is_youtube_url:
+                metadata = downloader.fetch_metadata(item["input_path"]).metadata
+            job.metadata = self._item_metadata(job, metadata)
+            job.video_id = self.quota_scheduler.run(
+                "videos.update",
+                partial(
+                    youtube_api.update_existing,
+                    job.index_key,
+                    job.metadata,
+                    self._publish_time(job),
+                ),
+            )
+            if job.video_id:
+                self._queue_post_upload(youtube_api, job)
+                return
+
+        if is_youtube_url:
+            job.video_path, metadata = downloader.download(item["input_path"])
+            job.metadata = self._item_metadata(job, metadata)
+        else:
+            job.video_path = Path(item["input_path"])
+            job.metadata = self._item_metadata(job)
+
+    def _process(self, processor: VideoProcessor, job: _PipelineJob) -> None:
+        """Append the end screen."""
+        if job.video_id:
+            return  # Published before, only the metadata changed
+        video_path, metadata = job.source()
+        job.processed_path = processor.process_video(
+            video_path, stream_spec=metadata.stream_spec
+        )
+
+    def _pass_through(self, job: _PipelineJob) -> None:
+        """Leave processing to the upload stage when streaming uploads."""
+
+    def _publish_time(self, job: _PipelineJob) -> Optional[datetime]:
+        """Return the scheduled publish time of a job, if any."""
+        publish_time = job.item.get("publish_time")
+        if isinstance(publish_time, str):
+            publish_time = datetime.fromisoformat(publish_time)
+        return publish_time
+
+    def _upload(self, youtube_api: YouTubeAPI, job: _PipelineJob) -> None:
+        """
+        Upload the processed video and remove the local copy.
+
+        After a failed upload the copy is kept for a retry; the processor
+        evicts abandoned outputs over its budget.
+        """
+        if job.video_id:
+            return
+        processed_path = job.processed_path
+        if processed_path is None:
+            raise RuntimeError(f"{job.label} has not been processed")
+        job.video_id = self.quota_scheduler.run(
+            "videos.insert",
+            partial(
+                youtube_api.upload_video,
+                processed_path,
+                job.source()[1],
+                self._publish_time(job),
+                index_key=job.index_key,
+            ),
+        )
+        processed_path.unlink(missing_ok=True)
+        self._queue_post_upload(youtube_api, job)
+
+    def _stream_upload(
+        self, processor: VideoProcessor, youtube_api: YouTubeAPI, job: _PipelineJob
+    ) -> None:
+        """Append the end screen and upload the output as it is encoded."""
+        if job.video_id:
+            return
+        video_path, metadata = job.source()
+
+        def upload() -> str:
+            with processor.stream_video(
+                video_path, stream_spec=metadata.stream_spec
+            ) as stream:
+                return youtube_api.upload_stream(
+                    stream,
+                    metadata,
+                    self._publish_time(job),
+                    index_key=job.index_key,
+                )
+
+        job.video_id = self.quota_scheduler.run("videos.insert", upload)
+        self._queue_post_upload(youtube_api, job)
+
+    def _queue_post_upload(self, youtube_api: YouTubeAPI, job: _PipelineJob) -> None:
+        """Collect the post-upload calls of a job, sending full batches."""
+        if job.video_id is None or job.metadata is None:
+            return
+        calls = youtube_api.upload_index.pending(
+            youtube_api.post_upload_calls(job.video_id, job.metadata, job.index_key)
+        )
+        with self._post_upload_lock:
+            self._post_upload_calls.extend(calls)
+            if len(self._post_upload_calls) < settings.POST_UPLOAD_BATCH_SIZE:
+                return
+            calls, self._post_upload_calls = self._post_upload_calls, []
+        self._run_post_upload(youtube_api, calls)
+
+    def _run_post_upload(
+        self, youtube_api: YouTubeAPI, calls: List[PostUploadCall]
+    ) -> None:
+        """Send post-upload calls; their failures never fail the upload."""
+        try:
+            results = youtube_api.post_upload(calls)
+        except Exception as e:
+            logger.error(f"Post-upload calls failed: {str(e)}")
+            results = [
+                PostUploadResult(call=call, success=False, error=str(e))
+                for call in calls
+            ]
+        with self._post_upload_lock:
+            self.post_upload_results.extend(results)
+
+    def _feed(self, items: Iterable[Dict[str, Any]], target: queue.Queue) -> None:
+        """
+        Push items into the first stage, blocking while it is full.
+
+        An error reading the items ends the feed; run re-raises it once the
+        items read before it have gone through the stages.
+        """
+        try:
+            for index, item in enumerate(items):
+                target.put(_PipelineJob(index, item))
+        except Exception as e:
+            logger.error(f"Failed to read batch items: {str(e)}")
+            self._feed_error = e
+        finally:
+            target.put(_DONE)
+
+    def run(
+        self,
+        items: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+    ) -> Iterator[BatchItemResult]:
+        """
+        Run items through the pipeline and yield results as they complete.
+
+        Args:
+            items: Dictionaries with the keyword arguments of
+                ``main.process_video`` (input_path, title, description, tags,
+                publish_time, is_youtube_url)
+            on_result: Optional callback invoked for each result
+
+        Yields:
+            BatchItemResult for each item, with the YouTube video ID as result
+
+        Raises:
+            Exception: The error that stopped reading ``items``, e.g. a
+                ValidationError of a manifest that turned unreadable, after
+                the items read before it have finished
+        """
+        queues: List[queue.Queue] = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(3)
+        ]
+        results: queue.Queue = queue.Queue()
+
+        self._stages = [
+            _Stage(
+                "download",
+                self._download_handler,
+                self.download_workers,
+                queues[0],
+                queues[1],
+            ),
+            _Stage(
+                "process",
+                self._process_handler,
+                self.process_workers,
+                queues[1],
+                queues[2],
+            ),
+            _Stage(
+                "upload",
+                self._upload_handler,
+                self.upload_workers,
+                queues[2],
+                results,
+            ),
+        ]
+
+        self._started = time.monotonic()
+        self._finished = None
+        self._feed_error = None
+        self.post_upload_results = []
+        logger.info(
+            f"Starting pipeline with {self.download_workers} download, "
+            f"{self.process_workers} process and {self.upload_workers} upload workers"
+        )
+        for stage in self._stages:
+            stage.start()
+        threading.Thread(
+            target=self._feed, args=(items, queues[0]), daemon=True
+        ).start()
+
+        while True:
+            job = results.get()
+            if job is _DONE:
+                break
+
+            result = BatchItemResult(
+                index=job.index,
+                label=job.label,
+                success=job.error is None,
+                result=job.video_id,
+                error=job.error,
+                duration=time.monotonic() - job.started,
+            )
+            if on_result:
+                on_result(result)
+            yield result
+
+        with self._post_upload_lock:
+            calls, self._post_upload_calls = self._post_upload_calls, []
+        if calls:
+            self._run_post_upload(self.youtube_api_factory(), calls)
+
+        self._finished = time.monotonic()
+        for stats in self.stats():
+            logger.info(
+                f"Stage {stats.name}: {stats.processed} ok, {stats.failed} failed, "
+                f"{stats.utilization:.0%} utilization, "
+                f"max queue depth {stats.max_queue_depth}"
+            )
+        if self._feed_error is not None:
+            raise self._feed_error
+
+    def run_all(
+        self,
+        items: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+    ) -> List[BatchItemResult]:
+        """Run a whole batch and return the results in input order."""
+        results = list(self.run(items, on_result))
+        return sorted(results, key=lambda result: result.index)
+
+    def stats(self) -> List[PipelineStageStats]:
+        """
+        Return a snapshot of per-stage counters for tuning worker counts.
+
+        A stage close to 100% utilization with a deep input queue is the
+        bottleneck; a stage with low utilization has too many workers.
+        """
+        if self._started is None:
+            return []
+
+        elapsed = (self._finished or time.monotonic()) - self._started
+        snapshots = []
+        for stage in self._stages:
+            snapshot = stage.snapshot()
+            if elapsed > 0:
+                snapshot.utilization = min(
+                    1.0, snapshot.busy_seconds / (snapshot.workers * elapsed)
+                )
+            snapshots.append(snapshot)
+        return snapshots
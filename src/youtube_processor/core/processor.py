@@ -1,28 +1,190 @@
 # src/youtube_processor/core/processor.py
+import hashlib
+import json
 import logging
+import os
+import subprocess
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    cast,
+)
 
 import ffmpeg
 
 from ..config import settings
 from ..exceptions import VideoProcessingError
+from ..models import StreamSpec
+from .cache import EndScreenCache, ProbeCache, enforce_size_budget
+from .sessions import file_fingerprint
+from .workspace import job_workspace, publish_file
 
 logger = logging.getLogger(__name__)
 
+# FFmpeg encoders used to generate end screens matching the source codec
+ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "av1": "libaom-av1",
+    "mpeg4": "mpeg4",
+}
+
+AUDIO_ENCODERS = {
+    "aac": "aac",
+    "opus": "libopus",
+    "mp3": "libmp3lame",
+    "vorbis": "libvorbis",
+    "ac3": "ac3",
+    "eac3": "eac3",
+}
+
+# ffprobe profile names mapped to the encoder's -profile:v values
+ENCODER_PROFILES = {
+    "h264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    },
+    "hevc": {"Main": "main", "Main 10": "main10"},
+}
+
+CHANNEL_LAYOUTS = {1: "mono", 2: "stereo", 6: "5.1", 8: "7.1"}
+
+# Valid END_SCREEN_MODE values
+END_SCREEN_MODES = ("copy", "smart", "reencode")
+
+# How far back from the end smart rendering looks for the last keyframe
+TAIL_SEARCH_SECONDS = 30.0
+
+# Allowed difference between the expected and the actual output duration
+DURATION_TOLERANCE = 1.0
+
+# Fragmented MP4 can be written to a pipe: no seeking back to patch the index
+FRAGMENTED_MP4_FLAGS = "frag_keyframe+empty_moov+default_base_moof"
+
+# Builds the final FFmpeg command for an output target and extra output options
+RenderPlan = Callable[..., Any]
+
+
+class TailCut(NamedTuple):
+    """Point where smart rendering stops copying and starts re-encoding."""
+
+    keyframe: float  # Presentation time of the last keyframe
+    outpoint: float  # Its decoding time, where stream copy of all streams stops
+    head_duration: float  # Length of the stream-copied part
+    duration: float  # Length of the whole source
+
+
+def _concat_quote(path: Path) -> str:
+    """Quote a path for an FFmpeg concat demuxer list."""
+    return "'" + str(path).replace("'", "'\\''") + "'"
+
+
+def _encoder_args(spec: StreamSpec) -> Dict[str, Any]:
+    """Return FFmpeg output options that encode streams matching a spec."""
+    args: Dict[str, Any] = {}
+    encoder = ENCODERS.get(spec.video_codec)
+    if encoder:
+        args["vcodec"] = encoder
+        profile = ENCODER_PROFILES.get(spec.video_codec, {}).get(spec.profile or "")
+        if profile:
+            args["profile:v"] = profile
+        if spec.video_codec == "h264" and spec.level:
+            args["level"] = f"{spec.level / 10:.1f}"  # ffprobe reports 40 for 4.0
+    if spec.pix_fmt:
+        args["pix_fmt"] = spec.pix_fmt
+    if spec.time_base and "/" in spec.time_base:
+        args["video_track_timescale"] = spec.time_base.split("/")[1]
+
+    audio_encoder = AUDIO_ENCODERS.get(spec.audio_codec or "")
+    if audio_encoder:
+        args["acodec"] = audio_encoder
+        if spec.sample_rate:
+            args["ar"] = spec.sample_rate
+        if spec.channels:
+            args["ac"] = spec.channels
+    return args
+
+
+def _end_screen_inputs(spec: StreamSpec, duration: float) -> List[Any]:
+    """Return black video and, if the spec has audio, silent audio sources."""
+    video = ffmpeg.input(
+        f"color=c=black:s={spec.width}x{spec.height}:r={spec.fps}",
+        f="lavfi",
+        t=duration,
+    ).video.filter("setsar", "1")
+    if not spec.audio_codec:
+        return [video]
+
+    layout = CHANNEL_LAYOUTS.get(spec.channels or 2, "stereo")
+    audio = ffmpeg.input(
+        f"anullsrc=r={spec.sample_rate or 48000}:cl={layout}", f="lavfi", t=duration
+    ).audio
+    return [video, audio]
+
+
+def is_concat_compatible(source: StreamSpec, clip: StreamSpec) -> bool:
+    """Check whether two files can be joined by stream copy."""
+    fields = [
+        "width",
+        "height",
+        "fps",
+        "video_codec",
+        "pix_fmt",
+        "profile",
+        "audio_codec",
+        "sample_rate",
+        "channels",
+    ]
+    mismatched = [
+        field for field in fields if getattr(source, field) != getattr(clip, field)
+    ]
+    if source.time_base and clip.time_base != source.time_base:
+        mismatched.append("time_base")
+
+    if mismatched:
+        logger.info(f"Clip differs from source in: {', '.join(mismatched)}")
+    return not mismatched
+
 
 class VideoProcessor:
     """Handles video processing using FFmpeg."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        end_screen_cache: Optional[EndScreenCache] = None,
+        probe_cache: Optional[ProbeCache] = None,
+        end_screen_mode: Optional[str] = None,
+    ) -> None:
         self.work_dir = Path(settings.WORK_DIR)
         self._ensure_work_directory()
+        self.end_screen_cache = end_screen_cache or EndScreenCache()
+        self.probe_cache = probe_cache or ProbeCache()
+        self.end_screen_mode = end_screen_mode or settings.END_SCREEN_MODE
+        if self.end_screen_mode not in END_SCREEN_MODES:
+            raise ValueError(f"Unknown end screen mode: {self.end_screen_mode}")
 
     def _ensure_work_directory(self) -> None:
         """Ensure work directory exists."""
         self.work_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Work directory ready: {self.work_dir}")
 
-    def _run_ffmpeg_command(self, stream, output_path: Path, desc: str) -> None:
+    def _run_ffmpeg_command(self, stream: Any, output_path: Path, desc: str) -> None:
         """Run FFmpeg command with error handling."""
         try:
             # Get the ffmpeg command for logging
@@ -41,43 +203,108 @@ class VideoProcessor:
             logger.error(f"FFmpeg stderr: {e.stderr.decode() if e.stderr else ''}")
             raise
 
-    def process_video(self, input_path: Path) -> Path:
+    def _probe_stream_spec(self, input_path: Path) -> StreamSpec:
+        """Read the stream parameters of a file with ffprobe."""
+        probe = ffmpeg.probe(str(input_path))
+        logger.debug(f"Video probe result: {probe}")
+
+        video_info = next(s for s in probe["streams"] if s["codec_type"] == "video")
+        audio_info: Dict[str, Any] = next(
+            (s for s in probe["streams"] if s["codec_type"] == "audio"), {}
+        )
+
+        return StreamSpec(
+            width=int(video_info["width"]),
+            height=int(video_info["height"]),
+            fps=video_info["r_frame_rate"],
+            video_codec=video_info.get("codec_name", "h264"),
+            pix_fmt=video_info.get("pix_fmt"),
+            time_base=video_info.get("time_base"),
+            profile=video_info.get("profile"),
+            level=video_info.get("level"),
+            audio_codec=audio_info.get("codec_name"),
+            sample_rate=audio_info.get("sample_rate"),
+            channels=audio_info.get("channels"),
+        )
+
+    def _probe_tail(self, input_path: Path, has_audio: bool) -> Optional[TailCut]:
         """
-        Add black screen to video end.
+        Find where the last GOP of a file starts.
+
+        Only packet headers near the end are read, nothing is decoded.
 
         Args:
             input_path: Path to input video file
+            has_audio: Whether the audio is joined along with the video
 
         Returns:
-            Path to processed video file
+            TailCut at the last keyframe, or None if none was found
+        """
+        probe_format = ffmpeg.probe(str(input_path))["format"]
+        duration = float(probe_format["duration"])
+        start_time = float(probe_format.get("start_time") or 0.0)
+        start = max(0.0, duration - TAIL_SEARCH_SECONDS)
+        probe = ffmpeg.probe(
+            str(input_path),
+            select_streams="v:0",
+            show_entries="packet=pts_time,dts_time,flags",
+            # Open-ended intervals ("start%") read nothing on some ffprobe builds
+            read_intervals=f"{start}%+{duration - start + 1}",
+        )
+        keyframes = [
+            (float(packet["pts_time"]), float(packet["dts_time"]))
+            for packet in probe.get("packets", [])
+            if packet.get("flags", "").startswith("K")
+            and packet.get("pts_time") not in (None, "N/A")
+            and packet.get("dts_time") not in (None, "N/A")
+        ]
+        if not keyframes:
+            return None
+
+        keyframe, dts = max(keyframes)
+        # ffprobe rounds to microseconds; stay just below the keyframe's DTS
+        outpoint = round(dts - 0.000001, 6)
+        # The demuxer stops every stream at the keyframe's decoding time, so
+        # with audio the re-encoded tail has to start there as well
+        head_end = outpoint if has_audio else keyframe
+        return TailCut(keyframe, outpoint, head_end - start_time, duration)
+
+    def _generate_black_screen(self, spec: StreamSpec, output_path: Path) -> None:
+        """Encode a black clip, with silence if needed, matching a stream spec."""
+        black_screen = ffmpeg.output(
+            *_end_screen_inputs(spec, settings.BLACK_SCREEN_DURATION),
+            str(output_path),
+            **_encoder_args(spec),
+        ).overwrite_output()
+
+        self._run_ffmpeg_command(black_screen, output_path, "black screen generation")
+
+    def _resolve_stream_spec(
+        self, input_path: Path, stream_spec: Optional[StreamSpec] = None
+    ) -> StreamSpec:
+        """
+        Return the stream parameters of the input, probing it if needed.
+
+        Smart rendering has to match the codec profile, which yt-dlp does not
+        report, so a known spec without one is not enough in that mode.
 
         Raises:
-            VideoProcessingError: If processing fails
+            VideoProcessingError: If the input is missing or cannot be probed
         """
-        try:
-            logger.info(f"Starting video processing for: {input_path}")
-
-            # Verify input file exists
-            if not input_path.exists():
-                raise VideoProcessingError(
-                    message=f"Input file does not exist", file_path=str(input_path)
-                )
+        # Verify input file exists
+        if not input_path.exists():
+            raise VideoProcessingError(
+                message=f"Input file does not exist", file_path=str(input_path)
+            )
 
+        if stream_spec and (self.end_screen_mode != "smart" or stream_spec.profile):
+            spec = stream_spec
+        else:
             # Get video information
             try:
-                probe = ffmpeg.probe(str(input_path))
-                logger.debug(f"Video probe result: {probe}")
-
-                video_info = next(
-                    s for s in probe["streams"] if s["codec_type"] == "video"
+                spec = self.probe_cache.get_or_probe(
+                    input_path, self._probe_stream_spec
                 )
-
-                width = int(video_info["width"])
-                height = int(video_info["height"])
-                fps = eval(video_info["r_frame_rate"])
-
-                logger.info(f"Video specs: {width}x{height} @ {fps}fps")
-
             except ffmpeg.Error as e:
                 logger.error(f"FFmpeg probe failed: {e.stderr.decode()}")
                 raise VideoProcessingError(
@@ -85,46 +312,293 @@ class VideoProcessor:
                     file_path=str(input_path),
                 )
 
-            # Generate black screen
-            black_screen_path = self.work_dir / "black_screen.mp4"
-            logger.info("Generating black screen clip")
+        logger.info(
+            f"Video specs: {spec.width}x{spec.height} @ {spec.fps}fps "
+            f"({spec.video_codec}, {spec.pix_fmt})"
+        )
+        return spec
+
+    def _end_screen(self, spec: StreamSpec) -> Path:
+        """Return the end-screen clip for a spec, encoding it once per format."""
+        return self.end_screen_cache.get_or_create(
+            spec,
+            settings.BLACK_SCREEN_DURATION,
+            lambda path: self._generate_black_screen(spec, path),
+        )
+
+    def _write_concat_list(
+        self, workspace: Path, *parts: Path, head_cut: Optional[TailCut] = None
+    ) -> Path:
+        """
+        Write a concat demuxer list joining the given files in order.
+
+        Args:
+            workspace: Job scratch directory
+            parts: Files to join
+            head_cut: Optional keyframe before which to stop reading the
+                first file
+        """
+        concat_list = workspace / "concat_list.txt"
+        with open(concat_list, "w") as f:
+            for index, part in enumerate(parts):
+                f.write(f"file {_concat_quote(part.absolute())}\n")
+                if index == 0 and head_cut is not None:
+                    f.write(f"outpoint {head_cut.outpoint}\n")
+                    f.write(f"duration {head_cut.head_duration}\n")
+
+        logger.info(f"Created concat list at: {concat_list}")
+        return concat_list
+
+    def _concat_plan(
+        self, workspace: Path, *parts: Path, head_cut: Optional[TailCut] = None
+    ) -> RenderPlan:
+        """Plan a stream-copy join of the given files."""
+        concat_list = self._write_concat_list(workspace, *parts, head_cut=head_cut)
+        return lambda target, **output_args: ffmpeg.input(
+            str(concat_list), f="concat", safe=0
+        ).output(target, c="copy", **output_args)
+
+    def _reencode_plan(
+        self, input_path: Path, spec: StreamSpec, cut: Optional[TailCut] = None
+    ) -> RenderPlan:
+        """
+        Plan a re-encode of the input, or of its tail after ``cut``, plus the
+        end screen.
 
-            black_screen = (
-                ffmpeg.input(f"color=c=black:s={width}x{height}:r={fps}", f="lavfi")
-                .output(str(black_screen_path), t=settings.BLACK_SCREEN_DURATION)
-                .overwrite_output()
+        The concat filter decodes both parts, so the result is correct for any
+        input; only the encoder settings are taken from the spec.
+        """
+
+        def build(target: str, **output_args: Any) -> Any:
+            video = ffmpeg.input(
+                str(input_path), **({"ss": cut.keyframe} if cut else {})
             )
+            streams = [video.video.filter("setsar", "1")]
+            if cut and spec.audio_codec and cut.keyframe > cut.outpoint:
+                # Audio resumes where the copied head stopped, video follows
+                # at the keyframe
+                lead = cut.keyframe - cut.outpoint
+                streams[0] = streams[0].filter("setpts", f"PTS+{lead}/TB")
+            if spec.audio_codec:
+                audio = ffmpeg.input(
+                    str(input_path), **({"ss": cut.outpoint} if cut else {})
+                )
+                streams.append(audio.audio)
+            streams += _end_screen_inputs(spec, settings.BLACK_SCREEN_DURATION)
+
+            joined = ffmpeg.concat(*streams, v=1, a=1 if spec.audio_codec else 0).node
+            outputs = [joined[0], joined[1]] if spec.audio_codec else [joined[0]]
+            return ffmpeg.output(*outputs, target, **_encoder_args(spec), **output_args)
+
+        return build
+
+    def _smart_plan(
+        self, input_path: Path, spec: StreamSpec, workspace: Path
+    ) -> Tuple[RenderPlan, Optional[float]]:
+        """
+        Plan the cheapest join that stays correct.
 
-            self._run_ffmpeg_command(
-                black_screen, black_screen_path, "black screen generation"
+        The end screen is encoded to match the source. If the clip still
+        differs from the source, the last GOP is re-encoded together with the
+        end screen and everything before it is stream-copied. The re-encoded
+        tail is probed before the join; if it does not match the source
+        either, or the source codec cannot be encoded at all, the whole video
+        is re-encoded.
+
+        Returns:
+            Tuple of the render plan and, for the stream-copy joins, the
+            expected output duration
+        """
+        cut = self._probe_tail(input_path, bool(spec.audio_codec))
+        if cut is None or cut.head_duration <= 0:
+            return self._reencode_plan(input_path, spec), None
+        expected = cut.duration + settings.BLACK_SCREEN_DURATION
+
+        if spec.video_codec not in ENCODERS:
+            logger.info(f"Cannot encode {spec.video_codec}, re-encoding whole video")
+            return self._reencode_plan(input_path, spec), None
+
+        black_screen_path = self._end_screen(spec)
+        try:
+            clip_spec = self.probe_cache.get_or_probe(
+                black_screen_path, self._probe_stream_spec
             )
+            if is_concat_compatible(spec, clip_spec):
+                logger.info("End screen matches source, joining by stream copy")
+                plan = self._concat_plan(workspace, input_path, black_screen_path)
+                return plan, expected
+        except ffmpeg.Error as e:
+            logger.warning(f"Could not probe end screen: {str(e)}")
+
+        logger.info(f"Re-encoding last GOP from {cut.keyframe:.3f}s with end screen")
+        tail = workspace / f"tail{input_path.suffix}"
+        # Keep the video's lead-in gap instead of filling it with duplicates
+        tail_stream = self._reencode_plan(input_path, spec, cut)(
+            str(tail), vsync="passthrough"
+        ).overwrite_output()
+        self._run_ffmpeg_command(tail_stream, tail, "tail re-encode")
+
+        # The output would change codec parameters midway; its duration alone
+        # would not reveal that afterwards
+        if not is_concat_compatible(spec, self._probe_stream_spec(tail)):
+            logger.info("Tail cannot be joined to the source, re-encoding whole video")
+            return self._reencode_plan(input_path, spec), None
+
+        # The source is read up to the keyframe, so its bulk is never rewritten
+        plan = self._concat_plan(workspace, input_path, tail, head_cut=cut)
+        return plan, expected
+
+    def _plan_render(
+        self, input_path: Path, spec: StreamSpec, workspace: Path
+    ) -> Tuple[RenderPlan, Optional[float]]:
+        """
+        Plan how to append the end screen in the configured mode.
 
-            # Prepare output path
-            output_path = self.work_dir / f"processed_{input_path.name}"
-
-            # Create concat file
-            concat_list = self.work_dir / "concat_list.txt"
-            with open(concat_list, "w") as f:
-                f.write(f"file '{input_path.absolute()}'\n")
-                f.write(f"file '{black_screen_path.absolute()}'\n")
-
-            logger.info(f"Created concat list at: {concat_list}")
-
-            # Concatenate videos
-            logger.info("Concatenating videos")
-            concat = (
-                ffmpeg.input(str(concat_list), f="concat", safe=0)
-                .output(str(output_path), c="copy")
-                .overwrite_output()
+        Returns:
+            Tuple of the render plan and, in smart mode, the expected output
+            duration used to verify the result
+        """
+        if self.end_screen_mode == "reencode":
+            return self._reencode_plan(input_path, spec), None
+
+        if self.end_screen_mode == "smart":
+            try:
+                return self._smart_plan(input_path, spec, workspace)
+            except (ffmpeg.Error, KeyError, ValueError) as e:
+                logger.warning(f"Smart render failed, re-encoding: {str(e)}")
+                return self._reencode_plan(input_path, spec), None
+
+        return self._concat_plan(workspace, input_path, self._end_screen(spec)), None
+
+    def _output_is_valid(self, output_path: Path, expected_duration: float) -> bool:
+        """Check that an output has a video stream and the expected duration."""
+        try:
+            probe = ffmpeg.probe(str(output_path))
+            has_video = any(s["codec_type"] == "video" for s in probe["streams"])
+            duration = float(probe["format"]["duration"])
+        except (ffmpeg.Error, KeyError, ValueError) as e:
+            logger.warning(f"Could not verify output: {str(e)}")
+            return False
+
+        if not has_video or abs(duration - expected_duration) > DURATION_TOLERANCE:
+            logger.warning(
+                f"Output duration {duration:.3f}s, expected {expected_duration:.3f}s"
             )
+            return False
+        return True
 
-            self._run_ffmpeg_command(concat, output_path, "video concatenation")
+    def output_path_for(self, input_path: Path) -> Path:
+        """
+        Return the default output of a source in WORK_DIR.
 
-            if not output_path.exists():
-                raise VideoProcessingError(
-                    message="Output file was not created", file_path=str(output_path)
+        The name depends on the source file, its size and modification time
+        and the render settings, so a rerun after a crash finds the same
+        output and can resume its unfinished upload session.
+        """
+        key = {
+            "source": str(input_path.resolve()),
+            **file_fingerprint(input_path),
+            "mode": self.end_screen_mode,
+            "end_screen": settings.BLACK_SCREEN_DURATION,
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return self.work_dir / f"processed_{digest[:16]}_{input_path.name}"
+
+    def evict_outputs(self, keep: Optional[Path] = None) -> int:
+        """
+        Remove the least recently used default outputs over budget.
+
+        Outputs stay in WORK_DIR until their upload succeeds, so failed
+        uploads can be retried without encoding again; this bounds what
+        abandoned ones take up.
+
+        Args:
+            keep: Optional output that must not be evicted
+
+        Returns:
+            Number of bytes freed
+        """
+        return enforce_size_budget(
+            self.work_dir, settings.PROCESSED_MAX_BYTES, "processed_*", keep=keep
+        )
+
+    def process_video(
+        self,
+        input_path: Path,
+        output_path: Optional[Path] = None,
+        stream_spec: Optional[StreamSpec] = None,
+    ) -> Path:
+        """
+        Add black screen to video end.
+
+        Each call works in its own scratch directory under WORK_DIR, so several
+        jobs can run at the same time. The output only appears at its final
+        path once it is complete. In smart mode the output is verified and
+        the video is fully re-encoded if the cheaper join went wrong. A
+        default output left behind by an earlier run, e.g. by a failed
+        upload, is reused as is; the least recently used default outputs are
+        evicted once they exceed PROCESSED_MAX_BYTES.
+
+        Args:
+            input_path: Path to input video file
+            output_path: Optional final path; defaults to ``output_path_for``
+            stream_spec: Optional stream parameters already known for the file,
+                e.g. from yt-dlp; when omitted the file is probed (memoized)
+
+        Returns:
+            Path to processed video file
+
+        Raises:
+            VideoProcessingError: If processing fails
+        """
+        try:
+            logger.info(f"Starting video processing for: {input_path}")
+            spec = self._resolve_stream_spec(input_path, stream_spec)
+
+            # Prepare output path
+            job_id = uuid.uuid4().hex[:12]
+            default_output = output_path is None
+            if output_path is None:
+                output_path = self.output_path_for(input_path)
+                if output_path.exists():
+                    logger.info(f"Reusing processed output: {output_path}")
+                    os.utime(output_path)  # Mark as recently used
+                    return output_path
+
+            with job_workspace(self.work_dir, prefix=f"job_{job_id}_") as workspace:
+                plan, expected_duration = self._plan_render(input_path, spec, workspace)
+
+                # Concatenate videos
+                logger.info(f"Appending end screen ({self.end_screen_mode} mode)")
+                temp_output = workspace / output_path.name
+                self._run_ffmpeg_command(
+                    plan(str(temp_output)).overwrite_output(),
+                    temp_output,
+                    "video concatenation",
                 )
 
+                if expected_duration is not None and not self._output_is_valid(
+                    temp_output, expected_duration
+                ):
+                    logger.warning("Joined output is invalid, re-encoding")
+                    self._run_ffmpeg_command(
+                        self._reencode_plan(input_path, spec)(
+                            str(temp_output)
+                        ).overwrite_output(),
+                        temp_output,
+                        "full re-encode",
+                    )
+
+                if not temp_output.exists():
+                    raise VideoProcessingError(
+                        message="Output file was not created",
+                        file_path=str(output_path),
+                    )
+
+                publish_file(temp_output, output_path)
+
+            if default_output:
+                self.evict_outputs(keep=output_path)
             logger.info(f"Processing complete: {output_path}")
             return output_path
 
@@ -133,3 +607,71 @@ class VideoProcessor:
             raise VideoProcessingError(
                 message=f"Failed to process video: {str(e)}", file_path=str(input_path)
             )
+
+    @contextmanager
+    def stream_video(
+        self, input_path: Path, stream_spec: Optional[StreamSpec] = None
+    ) -> Iterator[BinaryIO]:
+        """
+        Add black screen to video end, streaming the result instead of saving it.
+
+        FFmpeg writes fragmented MP4 to a pipe, so the output can be uploaded
+        while it is produced without an intermediate file in WORK_DIR. The
+        consumer must read the stream to its end inside the ``with`` block;
+        leaving it early stops FFmpeg. A streamed output cannot be verified
+        afterwards, so smart mode only falls back while planning.
+
+        Args:
+            input_path: Path to input video file
+            stream_spec: Optional stream parameters already known for the file
+
+        Yields:
+            Readable binary stream of the processed video
+
+        Raises:
+            VideoProcessingError: If processing fails
+        """
+        logger.info(f"Starting streamed processing for: {input_path}")
+        job_id = uuid.uuid4().hex[:12]
+        with job_workspace(self.work_dir, prefix=f"job_{job_id}_") as workspace:
+            try:
+                spec = self._resolve_stream_spec(input_path, stream_spec)
+                plan, _ = self._plan_render(input_path, spec, workspace)
+            except VideoProcessingError:
+                raise
+            except Exception as e:
+                logger.error(f"Processing failed: {str(e)}")
+                raise VideoProcessingError(
+                    message=f"Failed to process video: {str(e)}",
+                    file_path=str(input_path),
+                )
+
+            cmd = ffmpeg.compile(plan("pipe:1", f="mp4", movflags=FRAGMENTED_MP4_FLAGS))
+            logger.debug(f"Running FFmpeg command: {' '.join(cmd)}")
+
+            # Keep stderr in a file; an undrained stderr pipe could stall FFmpeg
+            log_path = workspace / "ffmpeg.log"
+            with open(log_path, "wb") as log_file:
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=log_file)
+            # stdout=PIPE always opens the pipe
+            stdout = cast(BinaryIO, process.stdout)
+
+            try:
+                yield stdout
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                stdout.close()
+
+            if process.wait() != 0:
+                stderr = log_path.read_text(errors="replace")
+                logger.error("FFmpeg video streaming failed:")
+                logger.error(f"FFmpeg stderr: {stderr}")
+                raise VideoProcessingError(
+                    message=f"Failed to process video: {stderr[-500:]}",
+                    file_path=str(input_path),
+                )
+
+        logger.info(f"Streamed processing complete: {input_path}")
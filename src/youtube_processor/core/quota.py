@@ -0,0 +1,237 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..config import settings
+from ..exceptions import QuotaExceededError
+from .storage import JsonStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Units charged per call by the YouTube Data API v3
+QUOTA_COSTS = {
+    "videos.insert": 1600,
+    "videos.update": 50,
+    "videos.list": 1,
+    "thumbnails.set": 50,
+    "playlistItems.insert": 50,
+    "playlistItems.list": 1,
+}
+
+# Error reasons the API uses once a project's daily quota is spent
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+# Daily quotas reset at midnight Pacific time. Without a tz database (e.g.
+# Windows without tzdata) fall back to standard time, which during daylight
+# saving time places the reset an hour late rather than early
+try:
+    QUOTA_TIMEZONE: Any = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8), "PST")
+
+# Days of usage history kept in the ledger
+QUOTA_HISTORY_DAYS = 7
+
+
+def project_id(credentials_path: Optional[Path] = None) -> str:
+    """Return the Google Cloud project of the OAuth client, if it is known."""
+    path = Path(credentials_path or settings.CREDENTIALS_PATH)
+    try:
+        with open(path, "r") as f:
+            secrets = json.load(f)
+        client = secrets.get("installed") or secrets.get("web") or {}
+        return client.get("project_id") or "default"
+    except (OSError, ValueError, AttributeError):
+        return "default"
+
+
+class QuotaLedger:
+    """
+    Persistent per-project, per-day record of spent API quota.
+
+    Calls are charged before they are made, with the unit costs YouTube
+    publishes, so a batch stops asking for work the API would refuse. Usage
+    is kept in a file-locked JsonStore, so every process and ledger using
+    the same cache directory charges one shared budget; days are quota
+    windows in Pacific time.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        daily_limit: Optional[int] = None,
+        project: Optional[str] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(QUOTA_TIMEZONE),
+    ) -> None:
+        self.path = Path(path or settings.CACHE_DIR / "quota_ledger.json")
+        self.daily_limit = (
+            settings.QUOTA_DAILY_LIMIT if daily_limit is None else daily_limit
+        )
+        self.project = project or settings.QUOTA_PROJECT_ID or project_id()
+        self.clock = clock
+        self.index = JsonStore(self.path)
+
+    @staticmethod
+    def cost(method: str) -> int:
+        """Return the unit cost of an API method."""
+        return QUOTA_COSTS.get(method, 1)
+
+    def window(self) -> str:
+        """Return the current quota window (Pacific date)."""
+        return self.clock().astimezone(QUOTA_TIMEZONE).date().isoformat()
+
+    def next_reset(self) -> datetime:
+        """Return when the current quota window ends."""
+        now = self.clock().astimezone(QUOTA_TIMEZONE)
+        tomorrow = now.date() + timedelta(days=1)
+        return datetime(
+            tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=QUOTA_TIMEZONE
+        )
+
+    def used(self) -> int:
+        """Return the units spent in the current window."""
+        return int(self.index.get(self.project, {}).get(self.window(), 0))
+
+    def remaining(self) -> int:
+        """Return the units left in the current window."""
+        return max(0, self.daily_limit - self.used())
+
+    def exceeded(self, method: str) -> QuotaExceededError:
+        """Return the error reporting that ``method`` has to wait for a reset."""
+        reset = self.next_reset()
+        return QuotaExceededError(
+            f"Daily API quota exhausted, {method} deferred",
+            quota_reset_time=reset.isoformat(),
+            retry_after=max(0, int((reset - self.clock()).total_seconds())),
+        )
+
+    def _update(self, change: Callable[[int], int]) -> int:
+        """Apply ``change`` to this window's usage and return the new usage."""
+        window = self.window()
+        oldest = (
+            datetime.fromisoformat(window) - timedelta(days=QUOTA_HISTORY_DAYS)
+        ).date()
+
+        def mutate(data: Dict[str, Any]) -> int:
+            days: Dict[str, int] = {
+                day: units
+                for day, units in data.get(self.project, {}).items()
+                if datetime.fromisoformat(day).date() > oldest
+            }
+            days[window] = change(days.get(window, 0))
+            data[self.project] = days
+            return days[window]
+
+        return int(self.index.update(mutate))
+
+    def charge(self, method: str) -> None:
+        """
+        Charge one call of ``method`` against today's budget.
+
+        Raises:
+            QuotaExceededError: If the remaining budget cannot cover the call
+        """
+        cost = self.cost(method)
+
+        def spend(used: int) -> int:
+            if used + cost > self.daily_limit:
+                raise self.exceeded(method)
+            return used + cost
+
+        used = self._update(spend)
+        logger.debug(f"Charged {cost} units for {method}, {used} used today")
+
+    def exhaust(self) -> None:
+        """Mark today's budget as spent after the API reported quotaExceeded."""
+        self._update(lambda used: max(used, self.daily_limit))
+        logger.warning(
+            f"API quota of project {self.project} exhausted until "
+            f"{self.next_reset().isoformat()}"
+        )
+
+    def check(self, method: str) -> None:
+        """
+        Check that the budget covers ``method`` without charging it.
+
+        Raises:
+            QuotaExceededError: If the remaining budget cannot cover the call
+        """
+        if self.remaining() < self.cost(method):
+            raise self.exceeded(method)
+
+
+class QuotaScheduler:
+    """
+    Admits API work only while the quota budget covers it.
+
+    Work arriving after the budget ran out is deferred to the next quota
+    window: with ``wait_for_reset`` the caller sleeps until the reset and
+    then runs, otherwise it fails fast with QuotaExceededError without
+    touching the API.
+    """
+
+    def __init__(
+        self,
+        ledger: Optional[QuotaLedger] = None,
+        wait_for_reset: Optional[bool] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.ledger = ledger or QuotaLedger()
+        self.wait_for_reset = (
+            settings.QUOTA_WAIT_FOR_RESET if wait_for_reset is None else wait_for_reset
+        )
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def _defer(self, error: QuotaExceededError) -> None:
+        """Sleep until the next window, or give up if not waiting."""
+        if not self.wait_for_reset:
+            raise error
+        reset = self.ledger.next_reset()
+        logger.info(f"Quota exhausted, deferring work until {reset.isoformat()}")
+        # Waiters queue up behind each other; once the window has rolled
+        # over the ones behind the first no longer sleep at all
+        with self._lock:
+            delay = (reset - self.ledger.clock()).total_seconds()
+            if delay > 0:
+                self.sleep(delay)
+
+    def admit(self, method: str) -> None:
+        """
+        Return once the budget can cover ``method``, without charging it.
+
+        Callers use this before expensive local work, e.g. downloading and
+        encoding a video, so the work is deferred rather than wasted.
+
+        Raises:
+            QuotaExceededError: If the budget is spent and not waiting
+        """
+        self.run(method, lambda: None)
+
+    def run(self, method: str, func: Callable[[], T]) -> T:
+        """
+        Call ``func`` once the budget can cover ``method``.
+
+        Args:
+            method: API method ``func`` spends quota on, e.g. "videos.insert"
+            func: Callable without arguments doing the work
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            QuotaExceededError: If the budget is spent and not waiting
+        """
+        while True:
+            try:
+                self.ledger.check(method)
+                return func()
+            except QuotaExceededError as e:
+                self._defer(e)
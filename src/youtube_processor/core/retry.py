@@ -0,0 +1,112 @@
+import http.client
+import json
+import logging
+import random
+import socket
+import ssl
+import time
+from typing import Callable, Optional, TypeVar
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Server-side failures that a later attempt can succeed at
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# 403 reasons that mean "slow down" rather than "not allowed"
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+# Transport failures: dropped connections, timeouts, truncated responses
+RETRYABLE_EXCEPTIONS = (
+    httplib2.HttpLib2Error,
+    http.client.HTTPException,
+    socket.timeout,
+    socket.gaierror,
+    ssl.SSLError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def error_reason(error: HttpError) -> Optional[str]:
+    """Return the first ``reason`` of a Google API error response, if any."""
+    try:
+        content = json.loads(error.content.decode("utf-8"))
+        reason: str = content["error"]["errors"][0]["reason"]
+        return reason
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Decides which API errors are worth retrying and how long to wait.
+
+    Waits grow exponentially from RETRY_DELAY and are fully jittered, so many
+    workers failing at once do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_retries = settings.MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = settings.RETRY_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.sleep = sleep
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Classify an error as transient (retry) or fatal (give up)."""
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            if status in RETRYABLE_STATUS_CODES:
+                return True
+            return status == 403 and error_reason(error) in RETRYABLE_REASONS
+        return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def wait(self, attempt: int, error: Exception, action: str) -> None:
+        """Log a transient failure and sleep before the next attempt."""
+        delay = self.backoff(attempt)
+        logger.warning(
+            f"{action} failed ({str(error)}), retry {attempt}/{self.max_retries} "
+            f"in {delay:.1f}s"
+        )
+        self.sleep(delay)
+
+    def call(self, func: Callable[[], T], action: str) -> T:
+        """
+        Call ``func``, retrying transient failures.
+
+        Args:
+            func: Callable without arguments
+            action: Description used in log messages
+
+        Returns:
+            Whatever ``func`` returns
+
+        Raises:
+            The last error once it is fatal or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries or not self.is_retryable(e):
+                    raise
+                self.wait(attempt, e, action)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from .stat_cache import StatCache
+from .storage import JsonStore
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(
+    path: Path, stat_cache: Optional[StatCache] = None
+) -> Dict[str, Any]:
+    """
+    Return the cheap identity of a file: its size and modification time.
+
+    With a ``stat_cache`` the values it already holds are reused.
+    """
+    if stat_cache is not None:
+        cached = stat_cache.stat(path)
+        if cached is None:
+            raise FileNotFoundError(f"Not a file: {path}")
+        return {"size": cached.size, "mtime_ns": cached.mtime_ns}
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class UploadSessionStore:
+    """
+    Crash-safe record of resumable uploads that have not finished yet.
+
+    Entries are keyed by the uploaded file and the request body, and hold
+    the session URI, the file fingerprint at the time the session started
+    and the number of bytes the server has acknowledged. A session is only
+    offered for resumption while the file is unchanged and the session is
+    younger than UPLOAD_SESSION_TTL; YouTube expires them after about a week.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: Optional[int] = None) -> None:
+        self.path = Path(path or settings.CACHE_DIR / "upload_sessions.json")
+        self.ttl = settings.UPLOAD_SESSION_TTL if ttl is None else ttl
+        self.index = JsonStore(self.path)
+
+    @staticmethod
+    def key_for(video_path: Path, body: Dict[str, Any]) -> str:
+        """Return the key of the upload of ``video_path`` with ``body``."""
+        key = {"path": str(Path(video_path).resolve()), "body": body}
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+
+    def lookup(self, key: str, video_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Return the unfinished session for an upload, if it can be resumed.
+
+        Args:
+            key: Upload key from ``key_for``
+            video_path: File being uploaded
+
+        Returns:
+            Session entry, or None if there is none or it went stale
+        """
+        entry: Optional[Dict[str, Any]] = self.index.get(key)
+        if not entry:
+            return None
+
+        try:
+            unchanged = entry["fingerprint"] == file_fingerprint(video_path)
+        except FileNotFoundError:
+            unchanged = False
+        expired = time.time() - entry["created_at"] > self.ttl
+
+        if not unchanged or expired:
+            logger.info(f"Dropping stale upload session for {video_path}")
+            self.discard(key)
+            return None
+        return entry
+
+    def save(
+        self,
+        key: str,
+        video_path: Path,
+        session_uri: str,
+        bytes_acknowledged: int,
+    ) -> None:
+        """Record the session URI and how far the upload has progressed."""
+
+        def record(data: Dict[str, Any]) -> None:
+            entry = data.get(key)
+            if entry is None or entry["session_uri"] != session_uri:
+                entry = {
+                    "source": str(video_path),
+                    "session_uri": session_uri,
+                    "fingerprint": file_fingerprint(video_path),
+                    "created_at": time.time(),
+                }
+            data[key] = {**entry, "bytes_acknowledged": bytes_acknowledged}
+
+        self.index.update(record)
+
+    def discard(self, key: str) -> None:
+        """Forget a finished or abandoned session."""
+        self.index.delete(key)
@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Union
+
+from ..config import settings
+from ..models import FileStat
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+class StatCache:
+    """
+    Per-run cache of file metadata, filled a directory at a time.
+
+    ``prefetch`` groups paths by directory and lists each directory once
+    with ``os.scandir`` instead of stat'ing every file; on network
+    filesystems the listing returns the attributes of all entries in a few
+    round trips. Directories are read concurrently on a thread pool.
+    Directories holding a single wanted file are stat'ed directly, which is
+    cheaper than listing a possibly huge directory.
+
+    Results are kept for the lifetime of the cache, so later stages can ask
+    for sizes and modification times without touching the disk again.
+    Create a new cache for every run; it never notices changes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or settings.STAT_WORKERS
+        self._stats: Dict[Path, Optional[FileStat]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: PathLike) -> Path:
+        """Return the absolute form a path is cached under."""
+        return Path(os.path.abspath(path))
+
+    def prefetch(self, paths: Iterable[PathLike]) -> None:
+        """Look up all ``paths`` not cached yet, one directory per task."""
+        wanted: Dict[Path, Set[str]] = defaultdict(set)
+        with self._lock:
+            for path in paths:
+                key = self._key(path)
+                if key not in self._stats:
+                    wanted[key.parent].add(key.name)
+        if not wanted:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for found in executor.map(self._read_directory, wanted, wanted.values()):
+                with self._lock:
+                    self._stats.update(found)
+        logger.debug(
+            f"Checked {sum(len(names) for names in wanted.values())} files "
+            f"in {len(wanted)} directories"
+        )
+
+    def _read_directory(
+        self, directory: Path, names: Set[str]
+    ) -> Dict[Path, Optional[FileStat]]:
+        """Return the metadata of ``names`` in ``directory``, None if missing."""
+        found: Dict[Path, Optional[FileStat]] = {
+            directory / name: None for name in names
+        }
+        if len(names) == 1:
+            path = directory / next(iter(names))
+            found[path] = self._stat(path)
+            return found
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        stat = entry.stat()
+                        found[directory / entry.name] = FileStat(
+                            path=directory / entry.name,
+                            size=stat.st_size,
+                            mtime_ns=stat.st_mtime_ns,
+                        )
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Unlistable (e.g. execute-only) directories can still be stat'ed
+            for path in found:
+                found[path] = self._stat(path)
+        return found
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[FileStat]:
+        """Stat one path, None unless it is a regular file."""
+        try:
+            if not path.is_file():
+                return None
+            stat = path.stat()
+        except OSError:
+            return None
+        return FileStat(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    def stat(self, path: PathLike) -> Optional[FileStat]:
+        """Return the cached metadata of a file, or None if it is not a file."""
+        key = self._key(path)
+        with self._lock:
+            if key in self._stats:
+                return self._stats[key]
+        self.prefetch([key])
+        with self._lock:
+            return self._stats[key]
+
+    def is_file(self, path: PathLike) -> bool:
+        """Return whether ``path`` is an existing regular file."""
+        return self.stat(path) is not None
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..exceptions import StorageError
+
+if sys.platform != "win32":
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+
+def file_checksum(path: Path, block_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class JsonStore:
+    """
+    Thread-safe key/value index persisted as a single JSON file.
+
+    Every write takes an exclusive lock on a sidecar ``.lock`` file, re-reads
+    the file, applies the change and atomically replaces it, so several
+    instances (and processes) can share one index without losing updates or
+    ever reading a half-written file. Reads are served from memory until the
+    file changes on disk. Where ``fcntl`` is unavailable (Windows) only the
+    threads using one instance are serialized.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._data: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the current contents, reloading them if the file changed."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._data, self._signature = {}, None
+            return self._data
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            try:
+                with open(self.path, "r") as f:
+                    self._data = json.load(f)
+            except json.JSONDecodeError as e:
+                logger.error(f"Ignoring corrupt index {self.path}: {str(e)}")
+                self._data = {}
+            self._signature = signature
+        return self._data
+
+    def _save(self, data: Dict[str, Any]) -> None:
+        """Atomically replace the file with ``data``."""
+        temp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}")
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            raise StorageError(
+                f"Failed to write index: {str(e)}", str(self.path), "write"
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
+        self._data = data
+        self._signature = None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the exclusive lock writers of the file share across processes."""
+        if sys.platform == "win32":
+            yield
+            return
+        with open(self.lock_path, "a", encoding="utf-8") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value stored under ``key``."""
+        with self._lock:
+            return self._load().get(key, default)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Return a snapshot of all entries."""
+        with self._lock:
+            return list(self._load().items())
+
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``."""
+        self.update(lambda data: data.__setitem__(key, value))
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+        self.update(lambda data: data.pop(key, None))
+
+    def update(self, mutate: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        Apply a read-modify-write change to the whole index.
+
+        Args:
+            mutate: Callable that modifies the index dictionary in place
+
+        Returns:
+            Whatever ``mutate`` returns
+        """
+        with self._lock, self._file_lock():
+            # A write from another process may have kept mtime and size
+            self._signature = None
+            data = dict(self._load())
+            result = mutate(data)
+            self._save(data)
+            return result
@@ -0,0 +1,145 @@
+import logging
+import queue
+import threading
+from typing import BinaryIO, Optional, Union
+
+from googleapiclient.http import MediaUpload
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Resumable upload chunks of unknown-length media must be multiples of 256KiB
+CHUNK_GRANULARITY = 256 * 1024
+
+
+class PipeMediaUpload(MediaUpload):
+    """
+    Resumable upload source reading from a non-seekable pipe.
+
+    The total size is unknown until the writer closes the pipe, so chunks are
+    sent with ``Content-Range: bytes a-b/*`` and the size is reported as soon
+    as the end of the stream has been seen. A reader thread keeps up to
+    ``buffer_chunks`` chunks queued ahead of the upload, so the producer keeps
+    encoding while a chunk is on the wire, and only the chunk that is still
+    waiting to be acknowledged is kept in memory.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        mimetype: str = "video/mp4",
+        chunksize: Optional[int] = None,
+        buffer_chunks: Optional[int] = None,
+    ) -> None:
+        self._stream = stream
+        self._mimetype = mimetype
+        self._chunksize = chunksize or settings.UPLOAD_CHUNK_SIZE
+        if self._chunksize % CHUNK_GRANULARITY:
+            raise ValueError(
+                f"Chunk size must be a multiple of {CHUNK_GRANULARITY} bytes"
+            )
+
+        buffer_chunks = buffer_chunks or settings.STREAM_UPLOAD_BUFFER_CHUNKS
+        self._blocks: queue.Queue = queue.Queue(
+            maxsize=max(1, buffer_chunks * self._chunksize // CHUNK_GRANULARITY)
+        )
+        self._buffer = bytearray()
+        self._buffer_start = 0  # Stream offset of the first buffered byte
+        self._next_begin = 0  # Offset the next chunk is expected to start at
+        self._total: Optional[int] = None
+        self._closed = threading.Event()
+
+        self._reader = threading.Thread(
+            target=self._read_blocks, name="pipe-upload-reader", daemon=True
+        )
+        self._reader.start()
+
+    def _read_blocks(self) -> None:
+        """Move blocks from the pipe into the bounded read-ahead queue."""
+        block: Union[bytes, Exception]
+        while not self._closed.is_set():
+            try:
+                block = self._stream.read(CHUNK_GRANULARITY) or b""
+            except Exception as e:
+                block = e
+            self._blocks.put(block)
+            if not isinstance(block, bytes) or not block:
+                return
+
+    def _fill(self, end: int) -> None:
+        """Buffer the stream up to offset ``end`` or its end."""
+        while self._total is None and self._buffer_start + len(self._buffer) < end:
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            if block:
+                self._buffer.extend(block)
+            else:
+                self._total = self._buffer_start + len(self._buffer)
+                logger.debug(f"Upload stream complete after {self._total} bytes")
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes read from the pipe so far."""
+        return self._buffer_start + len(self._buffer)
+
+    def chunksize(self) -> int:
+        return self._chunksize
+
+    def mimetype(self) -> str:
+        return self._mimetype
+
+    def size(self) -> Optional[int]:
+        """
+        Return the total size once the stream end has been reached.
+
+        The client asks for the size before every chunk, so read one byte
+        past the next chunk first; this way the final chunk always carries
+        the real total, even when it is exactly ``chunksize`` bytes long.
+        """
+        self._fill(self._next_begin + self._chunksize + 1)
+        return self._total
+
+    def resumable(self) -> bool:
+        return True
+
+    def has_stream(self) -> bool:
+        # Chunks are served through getbytes(); the pipe cannot seek
+        return False
+
+    def getbytes(self, begin: int, length: int) -> bytes:
+        """
+        Return ``length`` bytes starting at ``begin``.
+
+        Bytes before ``begin`` have been acknowledged by the server and are
+        released. A short result marks the end of the stream.
+        """
+        if begin < self._buffer_start:
+            raise ValueError(
+                f"Offset {begin} was already released (buffer starts at "
+                f"{self._buffer_start})"
+            )
+
+        del self._buffer[: begin - self._buffer_start]
+        self._buffer_start = begin
+        self._fill(begin + length)
+
+        data = bytes(self._buffer[:length])
+        self._next_begin = begin + len(data)
+        return data
+
+    def close(self) -> None:
+        """
+        Stop reading ahead and release buffered data.
+
+        The reader thread exits after its current read, once the writer has
+        produced more data or closed the pipe.
+        """
+        self._closed.set()
+        self._buffer.clear()
+        while True:
+            try:
+                self._blocks.get_nowait()
+            except queue.Empty:
+                break
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from yt_dlp.extractor.youtube import YoutubeIE
+
+from ..config import settings
+from ..models import PostUploadCall
+from .sessions import file_fingerprint
+from .stat_cache import StatCache
+from .storage import JsonStore, file_checksum
+
+logger = logging.getLogger(__name__)
+
+
+def processing_params() -> Dict[str, Any]:
+    """Return the settings that change the bytes an upload is made of."""
+    return {
+        "video_quality": settings.VIDEO_QUALITY,
+        "end_screen_mode": settings.END_SCREEN_MODE,
+        "black_screen_duration": settings.BLACK_SCREEN_DURATION,
+    }
+
+
+class ChecksumCache:
+    """
+    On-disk memo of file checksums.
+
+    Entries are keyed by the resolved path and hold the size and modification
+    time the checksum was taken at, so a file is only hashed again once it
+    has changed. With a ``stat_cache`` the sizes and times it already holds
+    are reused.
+    """
+
+    def __init__(
+        self, path: Optional[Path] = None, stat_cache: Optional[StatCache] = None
+    ) -> None:
+        self.path = Path(path or settings.CACHE_DIR / "checksums.json")
+        self.stat_cache = stat_cache
+        self.index = JsonStore(self.path)
+
+    def checksum(self, path: Path) -> str:
+        """
+        Return the SHA-256 hex digest of a file.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        key = str(Path(path).resolve())
+        fingerprint = file_fingerprint(Path(path), self.stat_cache)
+        entry = self.index.get(key)
+        if entry and entry["fingerprint"] == fingerprint:
+            return str(entry["sha256"])
+
+        digest = file_checksum(Path(path))
+        self.index.set(key, {"fingerprint": fingerprint, "sha256": digest})
+        return digest
+
+
+def source_fingerprint(
+    input_path: str,
+    is_youtube_url: bool = False,
+    checksums: Optional[ChecksumCache] = None,
+) -> str:
+    """
+    Identify the content of a source video.
+
+    YouTube sources are identified by their video ID, so they do not have to
+    be downloaded; local files by the SHA-256 of their bytes, so a renamed
+    or touched file still matches. Checksums are memoized in ``checksums``.
+    """
+    if is_youtube_url:
+        return f"youtube:{YoutubeIE.get_temp_id(input_path) or input_path}"
+    checksums = checksums or ChecksumCache()
+    return f"sha256:{checksums.checksum(Path(input_path))}"
+
+
+def index_key_for(
+    input_path: str,
+    is_youtube_url: bool = False,
+    checksums: Optional[ChecksumCache] = None,
+) -> Optional[str]:
+    """Return the UploadIndex key of a source, or None if it cannot be read."""
+    try:
+        return UploadIndex.key_for(
+            source_fingerprint(input_path, is_youtube_url, checksums)
+        )
+    except OSError as e:
+        # Unreadable sources fail in the stage that needs their bytes
+        logger.debug(f"Cannot fingerprint {input_path}: {str(e)}")
+        return None
+
+
+def post_upload_marker(call: PostUploadCall) -> str:
+    """Return what identifies a post-upload call across runs."""
+    marker = f"{call.method}:{call.target}"
+    if call.method == "thumbnails.set" and call.target:
+        try:
+            fingerprint = file_fingerprint(Path(call.target))
+            marker += f":{fingerprint['size']}:{fingerprint['mtime_ns']}"
+        except OSError:
+            pass
+    return marker
+
+
+class UploadIndex:
+    """
+    Persistent map from uploaded content to the resulting YouTube video.
+
+    Entries are keyed by the source fingerprint and the processing
+    parameters, and hold the video ID and the request body it was last
+    published with, so a later run can send only the parts that changed.
+    They also list the post-upload calls (playlist insertions, thumbnails)
+    already made for the video, so a rerun does not repeat them.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path or settings.CACHE_DIR / "upload_index.json")
+        self.index = JsonStore(self.path)
+
+    @staticmethod
+    def key_for(fingerprint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Return the index key of a source processed with ``params``."""
+        key = {
+            "source": fingerprint,
+            "params": processing_params() if params is None else params,
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode())
+        return digest.hexdigest()[:32]
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the entry of an uploaded video, if any."""
+        entry: Optional[Dict[str, Any]] = self.index.get(key)
+        return entry
+
+    def record(
+        self, key: str, video_id: str, body: Dict[str, Any], source: str = ""
+    ) -> None:
+        """Remember the video ID and body a source was published with."""
+
+        def write(data: Dict[str, Any]) -> None:
+            previous = data.get(key) or {}
+            done = previous.get("post_upload", [])
+            data[key] = {
+                "video_id": video_id,
+                "body": body,
+                "source": source,
+                "post_upload": done if previous.get("video_id") == video_id else [],
+                "updated_at": time.time(),
+            }
+
+        self.index.update(write)
+
+    def pending(self, calls: List[PostUploadCall]) -> List[PostUploadCall]:
+        """Return the calls not yet made for their entry's current video."""
+        pending = []
+        for call in calls:
+            entry = self.index.get(call.index_key) if call.index_key else None
+            if entry and entry["video_id"] == call.video_id:
+                if post_upload_marker(call) in entry.get("post_upload", []):
+                    continue
+            pending.append(call)
+        return pending
+
+    def mark_done(self, call: PostUploadCall) -> None:
+        """Remember that a post-upload call of an indexed video succeeded."""
+        index_key = call.index_key
+        if not index_key:
+            return
+        marker = post_upload_marker(call)
+
+        def mark(data: Dict[str, Any]) -> None:
+            entry = data.get(index_key)
+            if entry and entry["video_id"] == call.video_id:
+                done = entry.setdefault("post_upload", [])
+                if marker not in done:
+                    done.append(marker)
+
+        self.index.update(mark)
+
+    def discard(self, key: str) -> None:
+        """Forget an entry, e.g. after the video was deleted on YouTube."""
+        self.index.delete(key)
@@ -0,0 +1,68 @@
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def job_workspace(root: Optional[Path] = None, prefix: str = "job_") -> Iterator[Path]:
+    """
+    Create a private scratch directory for a single job.
+
+    The directory and everything in it are removed when the context exits,
+    whether the job succeeded or not.
+
+    Args:
+        root: Parent directory for the workspace, defaults to WORK_DIR
+        prefix: Prefix of the generated directory name
+
+    Yields:
+        Path to the job's scratch directory
+    """
+    root = Path(root or settings.WORK_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    workspace = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+    logger.debug(f"Created job workspace: {workspace}")
+
+    try:
+        yield workspace
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+        logger.debug(f"Removed job workspace: {workspace}")
+
+
+def publish_file(source: Path, destination: Path) -> Path:
+    """
+    Atomically move a finished file to its final location.
+
+    Readers of ``destination`` either see the complete file or nothing. When
+    the two paths are on different filesystems the file is first copied next
+    to the destination and then renamed into place.
+
+    Args:
+        source: Completed file inside a job workspace
+        destination: Final path of the file
+
+    Returns:
+        The destination path
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(source, destination)
+    except OSError:
+        staging = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(source, staging)
+            os.replace(staging, destination)
+        finally:
+            staging.unlink(missing_ok=True)
+        source.unlink(missing_ok=True)
+
+    return destination
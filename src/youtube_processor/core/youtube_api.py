@@ -1,139 +1,342 @@
 # src/youtube_processor/core/youtube_api.py
 import json
 import logging
-import socket
+import math
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, MediaFileUpload, MediaUpload
 
 from ..config import settings
-from ..exceptions import OAuth2Error, VideoUploadError
-from ..models import VideoMetadata
+from ..exceptions import (
+    OAuth2Error,
+    QuotaExceededError,
+    StorageError,
+    VideoUploadError,
+)
+from ..models import PostUploadCall, PostUploadResult, VideoMetadata
+from .chunking import AdaptiveMediaFileUpload
+from .client import YouTubeClientManager
+from .quota import QUOTA_REASONS, QuotaLedger
+from .retry import RetryPolicy, error_reason
+from .sessions import UploadSessionStore
+from .streaming import PipeMediaUpload
+from .upload_index import UploadIndex
 
 logger = logging.getLogger(__name__)
 
+# Status query answers meaning the resumable session no longer exists
+SESSION_GONE_STATUS_CODES = {404, 410}
+
+
+def _query_upload_status(request: HttpRequest, enabled: bool = True) -> None:
+    """
+    Make the next ``next_chunk`` of ``request`` first ask the server which
+    bytes it has, instead of sending from the local offset.
+
+    googleapiclient has no public switch for this. It sets the private
+    ``_in_error_state`` flag itself after a failed chunk, and this is the
+    only place that touches it.
+    """
+    request._in_error_state = enabled  # pylint: disable=protected-access
+
 
 class YouTubeAPI:
     """Handles all YouTube API operations."""
 
-    SCOPES = [
-        "https://www.googleapis.com/auth/youtube.upload",
-        "https://www.googleapis.com/auth/youtube",
-        "https://www.googleapis.com/auth/youtube.force-ssl",
-    ]
-    API_SERVICE_NAME = "youtube"
-    API_VERSION = "v3"
+    SCOPES = YouTubeClientManager.SCOPES
+    API_SERVICE_NAME = YouTubeClientManager.API_SERVICE_NAME
+    API_VERSION = YouTubeClientManager.API_VERSION
 
-    def __init__(self) -> None:
-        """Initialize YouTube API client."""
-        self.credentials_path = settings.CREDENTIALS_PATH
-        self.token_path = settings.TOKEN_PATH
+    def __init__(
+        self,
+        client_manager: Optional[YouTubeClientManager] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        session_store: Optional[UploadSessionStore] = None,
+        quota: Optional[QuotaLedger] = None,
+        upload_index: Optional[UploadIndex] = None,
+    ) -> None:
+        """
+        Initialize YouTube API client.
 
-        # Enable OAuth2.0 debug logging
-        logging.getLogger("googleapiclient.discovery_cache").setLevel(logging.ERROR)
-        logging.getLogger("googleapiclient.discovery").setLevel(logging.DEBUG)
-        logging.getLogger("google_auth_oauthlib.flow").setLevel(logging.DEBUG)
+        Args:
+            client_manager: Optional manager owning credentials and transports;
+                defaults to the one shared by the whole process
+            retry_policy: Optional policy for transient upload failures
+            session_store: Optional record of unfinished resumable uploads
+            quota: Optional ledger charged for every API call
+            upload_index: Optional map of uploaded content to video IDs
+        """
+        self.client_manager = client_manager or YouTubeClientManager.shared()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.session_store = session_store or UploadSessionStore()
+        self.quota = quota or QuotaLedger()
+        self.upload_index = upload_index or UploadIndex()
 
         try:
-            self.youtube = self._get_authenticated_service()
+            # Authenticate up front so configuration problems surface early
+            self.client_manager.service()
             logger.info("YouTube API client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize YouTube API client: {str(e)}")
             raise OAuth2Error(f"YouTube API initialization failed: {str(e)}")
 
-    def _find_available_port(self) -> int:
-        """Find an available port for the OAuth callback server."""
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(("localhost", 0))
-            s.listen(1)
-            port = s.getsockname()[1]
-        return port
+    @property
+    def youtube(self) -> Any:
+        """YouTube service for the calling thread, with fresh credentials."""
+        return self.client_manager.service()
+
+    def _video_body(
+        self, metadata: VideoMetadata, publish_time: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the videos.insert request body.
+
+        Language, license, embedding and statistics settings are only sent
+        when the metadata sets them, leaving the channel defaults otherwise.
+        """
+        snippet = {
+            "title": metadata.title,
+            "description": metadata.description,
+            "tags": metadata.tags,
+            "categoryId": metadata.category_id,
+        }
+        status = {
+            # Scheduled videos must stay private until their publish time
+            "privacyStatus": "private" if publish_time else metadata.privacy_status,
+            "publishAt": (publish_time.isoformat() + "Z" if publish_time else None),
+            "selfDeclaredMadeForKids": metadata.made_for_kids,
+        }
+        given = metadata.model_fields_set
+        if "language" in given:
+            snippet["defaultLanguage"] = metadata.language
+        if "license" in given:
+            status["license"] = metadata.license
+        if "embeddable" in given:
+            status["embeddable"] = metadata.embeddable
+        if "public_stats_viewable" in given:
+            status["publicStatsViewable"] = metadata.public_stats_viewable
+        return {"snippet": snippet, "status": status}
+
+    def _insert_video(
+        self,
+        media_body: MediaUpload,
+        body: Dict[str, Any],
+        source: str = "",
+        session_key: Optional[str] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        notify_subscribers: bool = True,
+    ) -> str:
+        """
+        Run a resumable videos.insert upload of ``media_body``.
+
+        With a ``session_key`` the session URI and progress are recorded in
+        the session store after every chunk, and an unfinished session left
+        behind by an earlier run is resumed instead of starting over.
+        ``progress`` is called with the acknowledged and total bytes after
+        every chunk; the total of a pipe is None until its end.
+        """
+        # Create upload request
+        insert_request = self.youtube.videos().insert(
+            part=",".join(body.keys()),
+            body=body,
+            media_body=media_body,
+            notifySubscribers=notify_subscribers,
+        )
+
+        resumed = None
+        if session_key is not None:
+            resumed = self.session_store.lookup(session_key, Path(source))
+        if resumed is not None:
+            logger.info(
+                f"Resuming upload of {source} "
+                f"after {resumed['bytes_acknowledged']} acknowledged bytes"
+            )
+            insert_request.resumable_uri = resumed["session_uri"]
+            # Start with a status query; the server knows best what it has
+            _query_upload_status(insert_request)
+        else:
+            self.quota.charge("videos.insert")
 
-    def _get_authenticated_service(self):
-        """Get authenticated YouTube API service."""
-        credentials = None
+        chunking = None
+        if isinstance(media_body, AdaptiveMediaFileUpload):
+            chunking = media_body.controller
+        # Asking a pipe for its size reads ahead, so only files know it upfront
+        total = None if isinstance(media_body, PipeMediaUpload) else media_body.size()
 
-        # Load existing token if available
-        if self.token_path.exists():
+        # Execute upload, resuming the same session after transient errors
+        failures = 0
+        response = None
+        while response is None:
+            offset = insert_request.resumable_progress
+            started = time.monotonic()
             try:
-                logger.debug(f"Loading existing token from {self.token_path}")
-                with open(self.token_path, "r") as token:
-                    token_data = token.read()
-                    logger.debug(f"Token data: {token_data}")
-                    credentials = Credentials.from_authorized_user_json(
-                        token_data, self.SCOPES
-                    )
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding token file: {str(e)}")
-                self.token_path.unlink(missing_ok=True)  # Delete invalid token
+                status, response = insert_request.next_chunk()
             except Exception as e:
-                logger.error(f"Error loading token: {str(e)}")
-                self.token_path.unlink(missing_ok=True)  # Delete invalid token
-
-        # If no valid credentials available, get new ones
-        if not credentials or not credentials.valid:
-            if credentials and credentials.expired and credentials.refresh_token:
-                logger.info("Refreshing expired token")
-                try:
-                    credentials.refresh(Request())
-                except Exception as e:
-                    logger.error(f"Token refresh failed: {str(e)}")
-                    credentials = None
-
-            if not credentials:
-                logger.info("Getting new credentials")
-                try:
-                    # Find an available port
-                    port = self._find_available_port()
-                    redirect_uri = f"http://localhost:{port}"
-                    logger.info(f"Using redirect URI: {redirect_uri}")
-
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        self.credentials_path, self.SCOPES, redirect_uri=redirect_uri
-                    )
-                    credentials = flow.run_local_server(
-                        port=port, access_type="offline", include_granted_scopes="true"
-                    )
-
-                    # Save the credentials for future use
-                    with open(self.token_path, "w") as token:
-                        token.write(credentials.to_json())
-                    logger.info(f"New credentials saved to {self.token_path}")
-                except Exception as e:
-                    logger.error(f"Failed to get new credentials: {str(e)}")
-                    raise OAuth2Error(
-                        f"Authentication failed: {str(e)}. "
-                        f"Please ensure {redirect_uri} is added to the authorized "
-                        "redirect URIs in your Google Cloud Console."
-                    )
+                if chunking is not None:
+                    chunking.record_failure()
+                if resumed is not None and isinstance(e, HttpError):
+                    if e.resp.status in SESSION_GONE_STATUS_CODES:
+                        logger.info(f"Upload session expired, restarting {source}")
+                        if session_key is not None:
+                            self.session_store.discard(session_key)
+                        insert_request.resumable_uri = None
+                        insert_request.resumable_progress = 0
+                        _query_upload_status(insert_request, False)
+                        resumed = None
+                        self.quota.charge("videos.insert")
+                        continue
+
+                if isinstance(e, HttpError) and error_reason(e) in QUOTA_REASONS:
+                    self.quota.exhaust()
+                    raise self.quota.exceeded("videos.insert")
+
+                failures += 1
+                retryable = self.retry_policy.is_retryable(e)
+                if failures > self.retry_policy.max_retries or not retryable:
+                    logger.error(f"Upload chunk failed: {str(e)}")
+                    if session_key is not None:
+                        if retryable:
+                            self._record_session(session_key, source, insert_request)
+                        else:
+                            self.session_store.discard(session_key)
+                    raise VideoUploadError(f"Upload failed: {str(e)}", source)
+                if insert_request.resumable_uri:
+                    # Make the next call ask the server which bytes it has
+                    # instead of assuming the failed chunk was lost entirely
+                    _query_upload_status(insert_request)
+                self.retry_policy.wait(failures, e, f"Upload of {source}")
+                continue
 
+            failures = 0  # Every acknowledged chunk renews the retry budget
+            resumed = None
+            acknowledged = (
+                media_body.size() if response else insert_request.resumable_progress
+            )
+            if chunking is not None:
+                chunking.record_success(
+                    acknowledged - offset, time.monotonic() - started
+                )
+            if progress is not None:
+                progress(acknowledged, acknowledged if response else total)
+            if status:
+                logger.debug(f"Uploaded {status.resumable_progress} bytes of {source}")
+                if session_key is not None:
+                    self._record_session(session_key, source, insert_request)
+
+        if session_key is not None:
+            self.session_store.discard(session_key)
+        logger.info("Upload completed successfully")
+        if chunking is not None:
+            logger.info(f"Upload stats for {source}: {chunking.summary()}")
+        return str(response["id"])
+
+    def _record_session(
+        self, session_key: str, source: str, insert_request: HttpRequest
+    ) -> None:
+        """Persist the session URI and acknowledged bytes of an upload."""
+        if not insert_request.resumable_uri:
+            return
         try:
-            return build(
-                self.API_SERVICE_NAME, self.API_VERSION, credentials=credentials
+            self.session_store.save(
+                session_key,
+                Path(source),
+                insert_request.resumable_uri,
+                insert_request.resumable_progress,
             )
-        except Exception as e:
-            logger.error(f"Failed to build YouTube service: {str(e)}")
-            raise OAuth2Error(f"YouTube API service creation failed: {str(e)}")
+        except StorageError as e:
+            # Losing the record only costs a restart after a crash
+            logger.warning(f"Could not record upload session: {str(e)}")
+
+    def indexed_video(self, index_key: str) -> Optional[str]:
+        """Return the video ID uploaded for an UploadIndex key, if any."""
+        entry = self.upload_index.lookup(index_key)
+        return str(entry["video_id"]) if entry else None
+
+    def update_existing(
+        self,
+        index_key: str,
+        metadata: VideoMetadata,
+        publish_time: Optional[datetime] = None,
+    ) -> Optional[str]:
+        """
+        Bring an already uploaded video's metadata up to date.
+
+        Only the parts of the request body that differ from what the video
+        was last published with are sent, in a single videos.update call.
+
+        Args:
+            index_key: UploadIndex key of the source and processing
+            metadata: Video metadata
+            publish_time: Optional scheduled publish time
+
+        Returns:
+            YouTube video ID, or None if the content has to be uploaded
+        """
+        entry = self.upload_index.lookup(index_key)
+        if not entry:
+            return None
+
+        video_id = str(entry["video_id"])
+        body = self._video_body(metadata, publish_time)
+        # JSON round trip, so the comparison sees what the index stored
+        body = json.loads(json.dumps(body, default=str))
+        changed = {
+            part: value
+            for part, value in body.items()
+            if entry["body"].get(part) != value
+        }
+        if not changed:
+            logger.info(f"Video {video_id} is already up to date")
+            return video_id
+
+        self.quota.charge("videos.update")
+        try:
+            self.retry_policy.call(
+                lambda: self.youtube.videos()
+                .update(part=",".join(changed), body={"id": video_id, **changed})
+                .execute(),
+                f"Update of {video_id}",
+            )
+        except HttpError as e:
+            if e.resp.status == 404:
+                logger.info(f"Video {video_id} no longer exists, uploading again")
+                self.upload_index.discard(index_key)
+                return None
+            if error_reason(e) in QUOTA_REASONS:
+                self.quota.exhaust()
+                raise self.quota.exceeded("videos.update")
+            raise
+
+        self.upload_index.record(index_key, video_id, body, entry.get("source", ""))
+        logger.info(f"Updated {', '.join(changed)} of video {video_id}")
+        return video_id
 
     def upload_video(
         self,
         video_path: Path,
         metadata: VideoMetadata,
         publish_time: Optional[datetime] = None,
+        index_key: Optional[str] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
     ) -> str:
         """
         Upload video to YouTube with scheduling.
 
+        An upload interrupted by a crash is resumed where the server left
+        off the next time the same file is uploaded with the same metadata.
+        With an ``index_key`` of content that was uploaded before, only the
+        metadata parts that changed are updated and nothing is uploaded.
+
         Args:
             video_path: Path to video file
             metadata: Video metadata
             publish_time: Optional scheduled publish time
+            index_key: Optional UploadIndex key of the source and processing
+            progress: Optional callback taking acknowledged and total bytes
 
         Returns:
             YouTube video ID
@@ -142,56 +345,284 @@ class YouTubeAPI:
             VideoUploadError: If upload fails
         """
         try:
-            body = {
-                "snippet": {
-                    "title": metadata.title,
-                    "description": metadata.description,
-                    "tags": metadata.tags,
-                    "categoryId": "22",  # People & Blogs category
-                },
-                "status": {
-                    "privacyStatus": "private",
-                    "publishAt": (
-                        publish_time.isoformat() + "Z" if publish_time else None
-                    ),
-                    "selfDeclaredMadeForKids": False,
-                },
-            }
+            if index_key is not None:
+                video_id = self.update_existing(index_key, metadata, publish_time)
+                if video_id:
+                    return video_id
 
-            # Create upload request
-            insert_request = self.youtube.videos().insert(
-                part=",".join(body.keys()),
-                body=body,
-                media_body=MediaFileUpload(
+            if settings.ADAPTIVE_UPLOAD_CHUNKS:
+                media_body = AdaptiveMediaFileUpload(str(video_path))
+            else:
+                media_body = MediaFileUpload(
                     str(video_path),
                     chunksize=settings.UPLOAD_CHUNK_SIZE,
                     resumable=True,
-                ),
+                )
+            body = self._video_body(metadata, publish_time)
+            video_id = self._insert_video(
+                media_body,
+                body,
+                str(video_path),
+                session_key=self.session_store.key_for(video_path, body),
+                progress=progress,
+                notify_subscribers=metadata.notify_subscribers,
             )
+            if index_key is not None:
+                self.upload_index.record(index_key, video_id, body, str(video_path))
+            return video_id
 
-            # Execute upload with progress monitoring
-            response = None
-            while response is None:
-                try:
-                    _, response = insert_request.next_chunk()
-                    if response:
-                        logger.info("Upload completed successfully")
-                        return response["id"]
-                except Exception as e:
-                    logger.error(f"Upload chunk failed: {str(e)}")
-                    raise VideoUploadError(f"Upload failed: {str(e)}")
+        except QuotaExceededError:
+            raise
+        except Exception as e:
+            logger.error(f"Upload failed: {str(e)}")
+            raise VideoUploadError(f"Failed to upload video: {str(e)}", str(video_path))
 
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        metadata: VideoMetadata,
+        publish_time: Optional[datetime] = None,
+        index_key: Optional[str] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> str:
+        """
+        Upload a video read from a pipe while it is being produced.
+
+        Args:
+            stream: Readable binary stream, e.g. from VideoProcessor.stream_video
+            metadata: Video metadata
+            publish_time: Optional scheduled publish time
+            index_key: Optional UploadIndex key to record the upload under
+            progress: Optional callback taking acknowledged and total bytes
+
+        Returns:
+            YouTube video ID
+
+        Raises:
+            VideoUploadError: If upload fails
+        """
+        media_body = PipeMediaUpload(stream, chunksize=settings.UPLOAD_CHUNK_SIZE)
+        try:
+            body = self._video_body(metadata, publish_time)
+            video_id = self._insert_video(
+                media_body,
+                body,
+                "pipe",
+                progress=progress,
+                notify_subscribers=metadata.notify_subscribers,
+            )
+            if index_key is not None:
+                self.upload_index.record(index_key, video_id, body, "pipe")
+            logger.info(f"Streamed {media_body.bytes_read} bytes for {video_id}")
+            return video_id
+
+        except QuotaExceededError:
+            raise
         except Exception as e:
             logger.error(f"Upload failed: {str(e)}")
-            raise VideoUploadError(f"Failed to upload video: {str(e)}")
+            raise VideoUploadError(f"Failed to upload video: {str(e)}", "pipe")
+        finally:
+            media_body.close()
 
     def set_thumbnail(self, video_id: str, thumbnail_path: Path) -> None:
         """Set video thumbnail."""
         try:
-            self.youtube.thumbnails().set(
-                videoId=video_id, media_body=MediaFileUpload(str(thumbnail_path))
-            ).execute()
-            logger.info(f"Thumbnail set for video {video_id}")
+            self._set_thumbnail(video_id, thumbnail_path)
         except Exception as e:
             logger.error(f"Failed to set thumbnail: {str(e)}")
             # Non-critical error, don't raise exception
+
+    def _set_thumbnail(self, video_id: str, thumbnail_path: Path) -> None:
+        """Upload a thumbnail, retrying transient failures."""
+        self.quota.charge("thumbnails.set")
+        try:
+            self.retry_policy.call(
+                lambda: self.youtube.thumbnails()
+                .set(videoId=video_id, media_body=MediaFileUpload(str(thumbnail_path)))
+                .execute(),
+                f"Thumbnail for {video_id}",
+            )
+        except HttpError as e:
+            if error_reason(e) in QUOTA_REASONS:
+                self.quota.exhaust()
+            raise
+        logger.info(f"Thumbnail set for video {video_id}")
+
+    @staticmethod
+    def post_upload_calls(
+        video_id: str, metadata: VideoMetadata, index_key: Optional[str] = None
+    ) -> List[PostUploadCall]:
+        """
+        Return the calls that finish an uploaded video: thumbnail, playlists.
+
+        With the video's UploadIndex key, successful calls are recorded in
+        the index, so ``upload_index.pending`` can leave them out next time.
+        """
+        calls = [
+            PostUploadCall(
+                method="playlistItems.insert",
+                video_id=video_id,
+                target=playlist_id,
+                index_key=index_key,
+            )
+            for playlist_id in metadata.playlist_ids
+        ]
+        if metadata.thumbnail_path:
+            calls.append(
+                PostUploadCall(
+                    method="thumbnails.set",
+                    video_id=video_id,
+                    target=str(metadata.thumbnail_path),
+                    index_key=index_key,
+                )
+            )
+        return calls
+
+    def _batch_request(self, service: Any, call: PostUploadCall) -> HttpRequest:
+        """Build the API request of a batchable post-upload call."""
+        if call.method == "playlistItems.insert":
+            return service.playlistItems().insert(
+                part="snippet",
+                body={
+                    "snippet": {
+                        "playlistId": call.target,
+                        "resourceId": {
+                            "kind": "youtube#video",
+                            "videoId": call.video_id,
+                        },
+                    }
+                },
+            )
+        raise ValueError(f"Cannot batch {call.method}")
+
+    def _execute_batch(self, calls: List[PostUploadCall]) -> List[PostUploadResult]:
+        """
+        Send calls as one batch request.
+
+        Failed parts are not retried: playlistItems.insert is not idempotent,
+        and a part that timed out may still have been applied. Failures are
+        reported instead, and since only successful calls are marked in the
+        UploadIndex, a later run sends them again.
+        """
+        results: Dict[int, PostUploadResult] = {}
+        pending: List[int] = []
+        for number, call in enumerate(calls):
+            try:
+                self.quota.charge(call.method)
+                pending.append(number)
+            except QuotaExceededError as e:
+                results[number] = PostUploadResult(
+                    call=call, success=False, error=str(e)
+                )
+        if not pending:
+            return [results[number] for number in range(len(calls))]
+
+        errors: Dict[int, Exception] = {}
+
+        def record(
+            request_id: str, response: Any, exception: Optional[Exception]
+        ) -> None:
+            number = int(request_id)
+            if exception is None:
+                results[number] = PostUploadResult(call=calls[number], success=True)
+            else:
+                errors[number] = exception
+
+        service = self.youtube
+        batch = service.new_batch_http_request()
+        for number in pending:
+            batch.add(
+                self._batch_request(service, calls[number]),
+                callback=record,
+                request_id=str(number),
+            )
+
+        try:
+            batch.execute()
+        except Exception as e:
+            for number in pending:
+                if number not in results:
+                    errors.setdefault(number, e)
+
+        for number, error in errors.items():
+            if isinstance(error, HttpError) and error_reason(error) in QUOTA_REASONS:
+                self.quota.exhaust()
+            results[number] = PostUploadResult(
+                call=calls[number], success=False, error=str(error)
+            )
+        return [results[number] for number in range(len(calls))]
+
+    def finish_upload(
+        self, video_id: str, metadata: VideoMetadata, index_key: Optional[str] = None
+    ) -> List[PostUploadResult]:
+        """
+        Make the post-upload calls of one video that have not succeeded yet.
+
+        Front ends handling one video at a time use this; BatchPipeline
+        collects the calls of many videos and sends them with ``post_upload``.
+
+        Returns:
+            One result per call made
+        """
+        calls = self.upload_index.pending(
+            self.post_upload_calls(video_id, metadata, index_key)
+        )
+        return self.post_upload(calls) if calls else []
+
+    def post_upload(
+        self, calls: List[PostUploadCall], batch_size: Optional[int] = None
+    ) -> List[PostUploadResult]:
+        """
+        Run post-upload calls for many videos with as few requests as possible.
+
+        playlistItems.insert calls are grouped into batch requests of up to
+        ``batch_size`` calls. Batch requests cannot carry
+        media uploads, so thumbnails are set one request each. A failing
+        call does not affect the others.
+
+        Args:
+            calls: Calls to make, e.g. from ``post_upload_calls``
+            batch_size: Calls per batch request, defaults to
+                POST_UPLOAD_BATCH_SIZE
+
+        Returns:
+            One result per call, in the order of ``calls``
+        """
+        batch_size = batch_size or settings.POST_UPLOAD_BATCH_SIZE
+        batched = [call for call in calls if call.method != "thumbnails.set"]
+        results: Dict[int, PostUploadResult] = {}
+
+        for start in range(0, len(batched), batch_size):
+            group = batched[start : start + batch_size]
+            for call, result in zip(group, self._execute_batch(group)):
+                results[id(call)] = result
+
+        for call in calls:
+            if call.method != "thumbnails.set":
+                continue
+            try:
+                if not call.target:
+                    raise ValueError("thumbnails.set needs a thumbnail path")
+                self._set_thumbnail(call.video_id, Path(call.target))
+                results[id(call)] = PostUploadResult(call=call, success=True)
+            except Exception as e:
+                results[id(call)] = PostUploadResult(
+                    call=call, success=False, error=str(e)
+                )
+
+        ordered = [results[id(call)] for call in calls]
+        for result in ordered:
+            if result.success:
+                self.upload_index.mark_done(result.call)
+        failed = [result for result in ordered if not result.success]
+        for result in failed:
+            logger.error(
+                f"{result.call.method} for {result.call.video_id} failed: "
+                f"{result.error}"
+            )
+        logger.info(
+            f"Post-upload: {len(ordered) - len(failed)} of {len(ordered)} calls "
+            f"succeeded in {math.ceil(len(batched) / batch_size)} batch requests and "
+            f"{len(calls) - len(batched)} thumbnail uploads"
+        )
+        return ordered
@@ -95,9 +95,15 @@ class RetryableError(YouTubeProcessorError):
 class QuotaExceededError(RetryableError):
     """Raised when YouTube API quota is exceeded."""
 
-    def __init__(self, message: str, quota_reset_time: Optional[str] = None) -> None:
-        details = {"quota_reset_time": quota_reset_time} if quota_reset_time else {}
-        super().__init__(message, details=details)
+    def __init__(
+        self,
+        message: str,
+        quota_reset_time: Optional[str] = None,
+        retry_after: int = 0,
+    ) -> None:
+        super().__init__(message, retry_after=retry_after)
+        if quota_reset_time:
+            self.details["quota_reset_time"] = quota_reset_time
 
 
 class RateLimitError(RetryableError):
@@ -112,6 +118,12 @@ class NetworkError(RetryableError):
     pass
 
 
+class JobQueueFullError(RetryableError):
+    """Raised when the job queue cannot take more work right now."""
+
+    pass
+
+
 class ValidationError(YouTubeProcessorError):
     """Raised when input validation fails."""
 
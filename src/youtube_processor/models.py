@@ -2,7 +2,7 @@
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -22,6 +22,22 @@ class VideoLicense(str, Enum):
     CREATIVE_COMMONS = "creativeCommons"
 
 
+class StreamSpec(BaseModel):
+    """Video stream parameters used to generate clips that match a source."""
+
+    width: int
+    height: int
+    fps: str = "30/1"  # Exact rational as reported by ffprobe, e.g. "30000/1001"
+    video_codec: str = "h264"
+    pix_fmt: Optional[str] = "yuv420p"
+    time_base: Optional[str] = None  # e.g. "1/15360"; None lets FFmpeg decide
+    profile: Optional[str] = None  # As reported by ffprobe, e.g. "High"
+    level: Optional[int] = None  # As reported by ffprobe, e.g. 40 for 4.0
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+
 class VideoMetadata(BaseModel):
     """Data model for video metadata."""
 
@@ -49,10 +65,42 @@ class VideoMetadata(BaseModel):
     # Playlists
     playlist_ids: List[str] = Field(default_factory=list)
 
+    # Stream parameters, when already known without probing the file
+    stream_spec: Optional[StreamSpec] = None
+
     class Config:
         use_enum_values = True
 
 
+class DownloadResult(BaseModel):
+    """Outcome of one download of a multi-URL download."""
+
+    url: str
+    video_path: Optional[Path] = None
+    metadata: Optional[VideoMetadata] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        """Whether the download succeeded."""
+        return self.error is None
+
+
+class PrefetchResult(BaseModel):
+    """Metadata of a video resolved without downloading it."""
+
+    url: str
+    metadata: Optional[VideoMetadata] = None
+    stream_spec: Optional[StreamSpec] = None
+    filesize: Optional[int] = None  # Approximate size in bytes
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        """Whether the metadata could be resolved."""
+        return self.error is None
+
+
 class BatchProcessingJob(BaseModel):
     """Data model for batch processing configuration."""
 
@@ -64,3 +112,117 @@ class BatchProcessingJob(BaseModel):
 
     class Config:
         use_enum_values = True
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single item of a batch run."""
+
+    index: int
+    label: str
+    success: bool
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    duration: float = 0.0  # seconds
+
+
+class JobItemState(BaseModel):
+    """Persisted state of one item of a batch job."""
+
+    index: int
+    label: str
+    status: str  # "pending", "running", "succeeded" or "failed"
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+
+class JobState(BaseModel):
+    """Persisted state of a batch job and its items."""
+
+    job_id: str
+    status: str  # "processing" or "completed"
+    total: int
+    created_at: float
+    updated_at: float
+    items: List[JobItemState] = Field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        """Number of items that finished successfully."""
+        return sum(item.status == "succeeded" for item in self.items)
+
+    @property
+    def failed(self) -> int:
+        """Number of items that failed."""
+        return sum(item.status == "failed" for item in self.items)
+
+
+class JobEvent(BaseModel):
+    """One entry of a job's event log."""
+
+    id: int
+    job_id: str
+    index: Optional[int] = None  # Item the event is about, None for the job
+    type: str  # e.g. "item.running", "item.progress" or "job.completed"
+    data: Dict[str, Any] = Field(default_factory=dict)
+    created_at: float
+
+
+class ManifestItem(BaseModel):
+    """One video of a batch manifest, as keyword arguments of process_video."""
+
+    input_path: str
+    is_youtube_url: bool = False
+    title: Optional[str] = None
+    description: str = ""
+    tags: List[str] = Field(default_factory=list)
+    publish_time: Optional[str] = None  # ISO format
+    thumbnail_path: Optional[str] = None
+    playlist_ids: List[str] = Field(default_factory=list)
+    # Further VideoMetadata fields the row sets, e.g. category_id
+    video_options: Dict[str, Any] = Field(default_factory=dict)
+
+
+class FileStat(BaseModel):
+    """Size and modification time of a file, as seen by a StatCache."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+class IngestedFile(BaseModel):
+    """A client upload streamed to disk."""
+
+    path: Path
+    size: int
+    sha256: str
+
+
+class PostUploadCall(BaseModel):
+    """One API call made for a video after it has been uploaded."""
+
+    method: str  # "thumbnails.set" or "playlistItems.insert"
+    video_id: str
+    target: Optional[str] = None  # Thumbnail path or playlist ID
+    index_key: Optional[str] = None  # UploadIndex entry of the uploaded content
+
+
+class PostUploadResult(BaseModel):
+    """Outcome of one post-upload call."""
+
+    call: PostUploadCall
+    success: bool
+    error: Optional[str] = None
+
+
+class PipelineStageStats(BaseModel):
+    """Throughput counters of one stage of the batch pipeline."""
+
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    utilization: float = 0.0  # busy time / (workers * elapsed time)
+    queue_depth: int = 0  # items currently waiting for this stage
+    max_queue_depth: int = 0
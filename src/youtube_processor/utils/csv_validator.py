@@ -1,17 +1,25 @@
 # src/youtube_processor/utils/csv_validator.py
 import csv
 import logging
+import re
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
 
+import numpy as np
 import pandas as pd
 
+from ..config import settings
+from ..core.stat_cache import StatCache
 from ..exceptions import ValidationError
 from ..models import PrivacyStatus, VideoLicense
 
 logger = logging.getLogger(__name__)
 
+# Tags and playlist IDs may be separated by commas or semicolons
+TAG_SEPARATORS = re.compile(r"[,;]")
+
 
 class CSVValidator:
     """Validator for batch processing CSV files."""
@@ -50,126 +58,318 @@ class CSVValidator:
         "29",
     ]
 
-    def __init__(self, csv_path: Path):
-        """Initialize validator with CSV file path."""
+    BOOLEAN_COLUMNS = [
+        "made_for_kids",
+        "embeddable",
+        "public_stats",
+        "notify_subscribers",
+    ]
+    TRUE_VALUES = {"true", "1", "yes", "y"}
+    FALSE_VALUES = {"false", "0", "no", "n", ""}
+
+    # VideoMetadata field each optional upload setting column sets
+    METADATA_FIELDS = {
+        "category": "category_id",
+        "privacy_status": "privacy_status",
+        "made_for_kids": "made_for_kids",
+        "language": "language",
+        "license": "license",
+        "embeddable": "embeddable",
+        "public_stats": "public_stats_viewable",
+        "notify_subscribers": "notify_subscribers",
+    }
+
+    # Errors quoted in the exception message; all of them are in its details
+    MAX_REPORTED_ERRORS = 20
+
+    def __init__(
+        self, csv_path: Optional[Path] = None, stat_cache: Optional[StatCache] = None
+    ):
+        """
+        Initialize validator with CSV file path.
+
+        The path is only needed by validate and iter_rows; check_frame and
+        validate_frame work on frames read elsewhere. File checks go through
+        ``stat_cache``; pass it on to later stages to reuse the sizes and
+        modification times it collected.
+        """
         self.csv_path = csv_path
+        self.stat_cache = stat_cache or StatCache()
 
     def validate(self) -> List[Dict[str, Any]]:
         """
         Validate CSV file and return processed data.
 
+        Every row is checked and all problems are reported together, each
+        with the line number it has in the file.
+
         Returns:
             List of validated row dictionaries
 
         Raises:
-            ValidationError: If validation fails
+            ValidationError: If validation fails; ``details["value"]`` lists
+                every error found
         """
-        try:
-            # Read CSV using pandas for better error handling
-            df = pd.read_csv(self.csv_path)
-
-            # Check required columns
-            missing_columns = [
-                col for col in self.REQUIRED_COLUMNS if col not in df.columns
-            ]
-            if missing_columns:
-                raise ValidationError(
-                    f"Missing required columns: {', '.join(missing_columns)}"
-                )
+        rows = list(self.iter_rows(skip_invalid=True))
+        if self.errors:
+            raise self._error(self.errors)
+        return rows
+
+    def iter_rows(
+        self, chunk_size: Optional[int] = None, skip_invalid: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Validate the CSV file in chunks and yield rows as they pass.
 
-            # Process each row
-            validated_rows = []
-            for index, row in df.iterrows():
-                try:
-                    validated_row = self._validate_row(row.to_dict(), index + 2)
-                    validated_rows.append(validated_row)
-                except Exception as e:
-                    logger.error(f"Error in row {index + 2}: {str(e)}")
-                    raise ValidationError(f"Row {index + 2}: {str(e)}")
+        Only one chunk of the file is in memory at a time, so a consumer such
+        as BatchEngine can start on the first rows of a huge manifest while
+        the rest is still being read.
 
-            return validated_rows
+        Args:
+            chunk_size: Rows read and validated at once
+            skip_invalid: Skip bad rows, collecting their errors in
+                ``self.errors``, instead of stopping at the first bad chunk
 
+        Yields:
+            Validated row dictionaries, in file order
+
+        Raises:
+            ValidationError: If the file cannot be read, lacks required
+                columns, or (unless ``skip_invalid``) a chunk has bad rows
+        """
+        self.errors = []
+        chunk_size = chunk_size or settings.MANIFEST_CHUNK_ROWS
+        try:
+            # Everything as text, so values are checked exactly as written
+            chunks = pd.read_csv(
+                self.csv_path, dtype=str, keep_default_na=False, chunksize=chunk_size
+            )
+            first_row = 2  # Header is line 1
+            with chunks:
+                for df in chunks:
+                    missing = self._missing_columns(df)
+                    if missing:
+                        raise ValidationError(
+                            f"Missing required columns: {', '.join(missing)}",
+                            "columns",
+                            missing,
+                        )
+                    rows, errors = self.validate_frame(
+                        df, first_row, drop_invalid=skip_invalid
+                    )
+                    first_row += len(df)
+                    if errors and not skip_invalid:
+                        raise self._error(errors)
+                    self.errors.extend(errors)
+                    yield from rows
+        except ValidationError:
+            raise
         except Exception as e:
             logger.error(f"CSV validation failed: {str(e)}")
-            raise ValidationError(f"CSV validation failed: {str(e)}")
-
-    def _validate_row(self, row: Dict[str, Any], row_num: int) -> Dict[str, Any]:
-        """Validate and process a single row."""
-        validated = {}
-
-        # Validate file_path or URL
-        if "file_path" in row and row["file_path"]:
-            path = Path(row["file_path"])
-            if not path.is_file() and not path.as_posix().startswith("http"):
-                raise ValidationError(f"File not found: {path}")
-            validated["file_path"] = str(path)
-
-        # Validate title
-        if not row.get("title"):
-            raise ValidationError("Title is required")
-        validated["title"] = row["title"]
-
-        # Validate description
-        validated["description"] = row.get("description", "")
-
-        # Validate tags
-        if "tags" in row and row["tags"]:
-            tags = [tag.strip() for tag in str(row["tags"]).split(",")]
-            validated["tags"] = tags
-
-        # Validate category
-        if "category" in row:
-            category = str(row["category"])
-            if category not in self.VALID_CATEGORIES:
-                raise ValidationError(f"Invalid category ID: {category}")
-            validated["category"] = category
-
-        # Validate privacy status
-        if "privacy_status" in row:
-            try:
-                status = PrivacyStatus(row["privacy_status"].lower())
-                validated["privacy_status"] = status.value
-            except ValueError:
-                raise ValidationError(
-                    f"Invalid privacy status: {row['privacy_status']}"
-                )
+            raise ValidationError(
+                f"CSV validation failed: {str(e)}", "csv_path", str(self.csv_path)
+            )
 
-        # Validate publish time
-        if "publish_time" in row and row["publish_time"]:
-            try:
-                publish_time = datetime.fromisoformat(row["publish_time"])
-                validated["publish_time"] = publish_time
-            except ValueError:
-                raise ValidationError(
-                    f"Invalid publish time format: {row['publish_time']}"
+    def _error(self, errors: List[str]) -> ValidationError:
+        """Return the exception reporting ``errors``."""
+        shown = errors[: self.MAX_REPORTED_ERRORS]
+        message = f"CSV validation failed with {len(errors)} errors:\n" + "\n".join(
+            shown
+        )
+        if len(errors) > len(shown):
+            message += f"\n... and {len(errors) - len(shown)} more"
+        logger.error(message)
+        return ValidationError(message, "rows", errors)
+
+    def validate_frame(
+        self, df: pd.DataFrame, first_row: int = 2, drop_invalid: bool = False
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Validate a manifest loaded as text columns, one column at a time.
+
+        Args:
+            df: Manifest with string columns and "" for empty cells
+            first_row: Line number of the first row in the file
+            drop_invalid: Leave rows with errors out of the result
+
+        Returns:
+            The validated rows and the errors found, as "Row N: problem"
+        """
+        missing_columns = self._missing_columns(df)
+        if missing_columns:
+            return [], [f"Missing required columns: {', '.join(missing_columns)}"]
+
+        out, omit, problems = self.check_frame(df, first_row)
+        errors = problems.tolist()
+        invalid = set(problems.index)
+
+        # Build the row dicts straight from the columns, then drop empty cells
+        keys = list(out)
+        rows = [
+            dict(zip(keys, values))
+            for values in zip(*(column.tolist() for column in out.values()))
+        ]
+        for column, mask in omit.items():
+            for position in np.flatnonzero(mask.to_numpy(dtype=bool)):
+                del rows[position][column]
+        if drop_invalid and invalid:
+            rows = [row for position, row in enumerate(rows) if position not in invalid]
+        return rows, errors
+
+    def check_frame(
+        self, df: pd.DataFrame, first_row: int = 2, require_title: bool = True
+    ) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series], pd.Series]:
+        """
+        Check and parse the known columns of a manifest frame.
+
+        This is the column validation shared by validate_frame and
+        ManifestLoader; columns ``df`` lacks are not checked.
+
+        Args:
+            df: Manifest with string columns and "" for empty cells
+            first_row: Line number of the first row in the file
+            require_title: Report rows without a title
+
+        Returns:
+            The parsed columns, masks of their cells that were left empty,
+            and the errors as "Row N: problem", indexed by row position
+        """
+        df = df.reset_index(drop=True).apply(lambda column: column.str.strip())
+        row_numbers = pd.Series(range(first_row, first_row + len(df)))
+        problems: List[pd.Series] = []
+        out: Dict[str, pd.Series] = {}
+        omit: Dict[str, pd.Series] = {}  # Cells left out of the row dicts
+
+        def flag(
+            mask: pd.Series, message: str, values: Optional[pd.Series] = None
+        ) -> None:
+            """Record ``message`` (and the bad value) for the rows in ``mask``."""
+            if not mask.any():
+                return
+            text = "Row " + row_numbers[mask].astype(str) + ": " + message
+            if values is not None:
+                text = text + values[mask]
+            problems.append(text)
+
+        def optional(column: str) -> None:
+            """Pass a text column through, leaving out its empty cells."""
+            out[column] = df[column]
+            omit[column] = df[column] == ""
+
+        # file_path: local files must exist, URLs are checked on download
+        if "file_path" in df:
+            paths = df["file_path"]
+            local = (paths != "") & ~paths.str.startswith("http")
+            missing = ~self._existing(paths[local])
+            flag(missing.reindex(df.index, fill_value=False), "File not found: ", paths)
+            optional("file_path")
+
+        if "title" in df:
+            if require_title:
+                flag(df["title"] == "", "Title is required")
+            out["title"] = df["title"]
+
+        out["description"] = (
+            df["description"] if "description" in df else pd.Series("", index=df.index)
+        )
+
+        if "tags" in df:
+            out["tags"] = pd.Series(
+                [self.split_tags(tags) for tags in df["tags"].tolist()],
+                index=df.index,
+                dtype=object,
+            )
+            omit["tags"] = out["tags"].isna()
+
+        if "category" in df:
+            category = df["category"]
+            flag(
+                (category != "") & ~category.isin(self.VALID_CATEGORIES),
+                "Invalid category ID: ",
+                category,
+            )
+            optional("category")
+
+        enums: List[Tuple[str, Type[Enum], str]] = [
+            ("privacy_status", PrivacyStatus, "Invalid privacy status: "),
+            ("license", VideoLicense, "Invalid license: "),
+        ]
+        for column, enum, message in enums:
+            if column in df:
+                # Matched case-insensitively, kept as the API spells them
+                spelling = {member.value.lower(): member.value for member in enum}
+                values = df[column].str.lower().map(spelling).fillna("")
+                flag((df[column] != "") & (values == ""), message, df[column])
+                out[column] = values
+                omit[column] = values == ""
+
+        if "publish_time" in df:
+            text = df["publish_time"]
+            lookup = self.parse_times(text.unique())
+            parsed = pd.Series(
+                [lookup[value] for value in text], index=df.index, dtype=object
+            )
+            flag((text != "") & parsed.isna(), "Invalid publish time format: ", text)
+            out["publish_time"] = parsed
+            omit["publish_time"] = parsed.isna()
+
+        if "thumbnail_path" in df:
+            thumbs = df["thumbnail_path"]
+            missing = ~self._existing(thumbs[thumbs != ""])
+            flag(
+                missing.reindex(df.index, fill_value=False),
+                "Thumbnail not found: ",
+                thumbs,
+            )
+            optional("thumbnail_path")
+
+        if "language" in df:
+            optional("language")
+
+        for column in self.BOOLEAN_COLUMNS:
+            if column in df:
+                values = df[column].str.lower()
+                flag(
+                    ~values.isin(self.TRUE_VALUES | self.FALSE_VALUES),
+                    f"Invalid value for {column}: ",
+                    df[column],
                 )
+                out[column] = values.isin(self.TRUE_VALUES)
+
+        if not problems:
+            return out, omit, pd.Series([], dtype=object)
+        # Report row by row, in the order the checks run within a row
+        return out, omit, pd.concat(problems).sort_index(kind="stable")
+
+    @classmethod
+    def _missing_columns(cls, df: pd.DataFrame) -> List[str]:
+        """Return the required columns ``df`` lacks."""
+        return [col for col in cls.REQUIRED_COLUMNS if col not in df.columns]
 
-        # Validate thumbnail path
-        if "thumbnail_path" in row and row["thumbnail_path"]:
-            thumb_path = Path(row["thumbnail_path"])
-            if not thumb_path.is_file():
-                raise ValidationError(f"Thumbnail not found: {thumb_path}")
-            validated["thumbnail_path"] = str(thumb_path)
-
-        # Validate boolean fields
-        for field in [
-            "made_for_kids",
-            "embeddable",
-            "public_stats",
-            "notify_subscribers",
-        ]:
-            if field in row:
-                validated[field] = str(row[field]).lower() == "true"
-
-        # Validate license
-        if "license" in row:
+    @staticmethod
+    def split_tags(tags: str) -> Optional[List[str]]:
+        """Split a comma or semicolon separated list, None if it is empty."""
+        if not tags:
+            return None
+        return [tag.strip() for tag in TAG_SEPARATORS.split(tags) if tag.strip()]
+
+    def _existing(self, paths: pd.Series) -> pd.Series:
+        """Return whether each path is a file, checking every path once."""
+        unique = paths.unique()
+        self.stat_cache.prefetch(unique)
+        found = {path: self.stat_cache.is_file(path) for path in unique}
+        return paths.map(found).astype(bool)
+
+    @staticmethod
+    def parse_times(values: Any) -> Dict[str, Optional[datetime]]:
+        """Parse each distinct ISO timestamp once; invalid ones map to None."""
+        parsed: Dict[str, Optional[datetime]] = {}
+        for value in values:
             try:
-                license = VideoLicense(row["license"].lower())
-                validated["license"] = license.value
+                parsed[value] = datetime.fromisoformat(value) if value else None
             except ValueError:
-                raise ValidationError(f"Invalid license: {row['license']}")
-
-        return validated
+                parsed[value] = None
+        return parsed
 
     @classmethod
     def generate_template(cls, output_path: Path) -> None:
@@ -204,9 +404,7 @@ if __name__ == "__main__":
     validator = CSVValidator(Path("batch_upload.csv"))
     try:
         validated_data = validator.validate()
-        print(f"Validated: {len(validated_data)}")
-    except Exception as e:
-        logger.error(f"CSV validation failed: {str(e)}")
-        raise ValidationError(f"CSV validation failed: {str(e)}")
+    except ValidationError as e:
+        print(e)
     else:
         print(f"Validated: {len(validated_data)}")
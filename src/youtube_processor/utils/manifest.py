@@ -0,0 +1,335 @@
+# src/youtube_processor/utils/manifest.py
+import logging
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from ..core.stat_cache import StatCache
+from ..exceptions import ValidationError
+from ..models import ManifestItem
+from .csv_validator import CSVValidator
+
+logger = logging.getLogger(__name__)
+
+ManifestSource = Union[str, Path, IO]
+
+# File suffixes and the format they are read as
+MANIFEST_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+
+# Columns the loader reads; file_path and url are older names of input_path,
+# the columns of CSV batches are checked by CSVValidator
+MANIFEST_COLUMNS = [
+    "input_path",
+    "file_path",
+    "url",
+    "is_youtube_url",
+    "title",
+    *CSVValidator.OPTIONAL_COLUMNS,
+    "playlist_ids",
+]
+
+
+def manifest_format(name: str) -> str:
+    """
+    Return the format of a manifest from its file name.
+
+    Raises:
+        ValidationError: If the suffix is not a supported format
+    """
+    suffix = Path(name).suffix.lower()
+    if suffix not in MANIFEST_FORMATS:
+        raise ValidationError(
+            f"Unsupported manifest format {suffix or name!r}, expected one of "
+            f"{', '.join(sorted(MANIFEST_FORMATS))}",
+            "format",
+            suffix,
+        )
+    return MANIFEST_FORMATS[suffix]
+
+
+def _text(column: pd.Series) -> pd.Series:
+    """Return a column as stripped text with "" for missing cells."""
+    if pd.api.types.is_bool_dtype(column):
+        column = column.map({True: "true", False: "false"})
+    elif pd.api.types.is_numeric_dtype(column):
+        column = column.astype(str).where(column.notna(), None)
+    elif column.dtype == object:
+        # JSON and Parquet may hold real lists and booleans
+        column = column.map(
+            lambda value: (
+                ",".join(map(str, value))
+                if isinstance(value, (list, tuple, np.ndarray))
+                else str(value).lower() if isinstance(value, bool) else value
+            )
+        )
+    return column.fillna("").astype(str).str.strip()
+
+
+class ManifestLoader:
+    """
+    Reads and validates batch manifests in CSV, JSONL or Parquet.
+
+    Every front end (CLI, API and Streamlit) loads manifests through this
+    class, so they all accept the same columns: ``input_path`` (or the older
+    ``file_path``/``url``), ``is_youtube_url``, ``playlist_ids`` and the
+    columns of CSVValidator, whose upload settings (category, privacy status
+    and so on) are passed on as ``video_options``. The file is read in chunks
+    and each chunk is parsed and validated column by column in one pass.
+    Parquet needs the optional ``pyarrow`` package and only reads the columns
+    above.
+    """
+
+    def __init__(
+        self,
+        source: ManifestSource,
+        format: Optional[str] = None,
+        stat_cache: Optional[StatCache] = None,
+    ) -> None:
+        """
+        Initialize the loader.
+
+        Args:
+            source: Path or binary file object of the manifest
+            format: "csv", "jsonl" or "parquet"; by default taken from the
+                file name
+            stat_cache: Cache used to check that local videos exist
+        """
+        self.source = source
+        name = (
+            source if isinstance(source, (str, Path)) else getattr(source, "name", "")
+        )
+        self.format = format or manifest_format(str(name or ""))
+        self.stat_cache = stat_cache or StatCache()
+        self.errors: List[str] = []
+
+    def load(self) -> List[ManifestItem]:
+        """
+        Load the whole manifest.
+
+        Returns:
+            The manifest's items, in file order
+
+        Raises:
+            ValidationError: If the manifest has errors; ``details["value"]``
+                lists every one of them
+        """
+        items = list(self.iter_items(skip_invalid=True))
+        if self.errors:
+            raise self._error(self.errors)
+        return items
+
+    def iter_items(
+        self, chunk_size: Optional[int] = None, skip_invalid: bool = False
+    ) -> Iterator[ManifestItem]:
+        """Yield the manifest's items as models; see iter_rows."""
+        for row in self.iter_rows(chunk_size, skip_invalid):
+            # Already validated column-wise, so skip per-row validation
+            yield ManifestItem.model_construct(**row)
+
+    def iter_rows(
+        self, chunk_size: Optional[int] = None, skip_invalid: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the manifest's rows chunk by chunk as they pass validation.
+
+        Rows are the fields of ManifestItem as plain dicts, i.e. keyword
+        arguments of process_video, ready for BatchEngine or BatchPipeline
+        without building a model per row.
+
+        Args:
+            chunk_size: Rows read and validated at once
+            skip_invalid: Skip bad rows, collecting their errors in
+                ``self.errors``, instead of stopping at the first bad chunk
+
+        Yields:
+            Dictionary for each valid row, in file order
+
+        Raises:
+            ValidationError: If the manifest cannot be read or (unless
+                ``skip_invalid``) a chunk has bad rows
+        """
+        self.errors = []
+        chunk_size = chunk_size or settings.MANIFEST_CHUNK_ROWS
+        first_row = 2 if self.format == "csv" else 1  # CSV line 1 is the header
+        try:
+            for df in self._chunks(chunk_size):
+                rows, errors = self._validate(df, first_row)
+                first_row += len(df)
+                if errors and not skip_invalid:
+                    raise self._error(errors)
+                self.errors.extend(errors)
+                yield from rows
+        except ValidationError:
+            raise
+        except Exception as e:
+            logger.error(f"Manifest could not be read: {str(e)}")
+            raise ValidationError(
+                f"Manifest could not be read: {str(e)}", "manifest", str(self.source)
+            )
+
+    def _chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Read the manifest in DataFrames of at most ``chunk_size`` rows."""
+        if self.format == "csv":
+            with pd.read_csv(
+                self.source, dtype=str, keep_default_na=False, chunksize=chunk_size
+            ) as reader:
+                yield from reader
+        elif self.format == "jsonl":
+            with pd.read_json(
+                self.source,
+                lines=True,
+                chunksize=chunk_size,
+                dtype=False,
+                convert_dates=False,
+            ) as reader:
+                yield from reader
+        elif self.format == "parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ValidationError(
+                    "Parquet manifests need pyarrow: pip install pyarrow",
+                    "format",
+                    self.format,
+                )
+            parquet = pq.ParquetFile(self.source)
+            columns = [c for c in MANIFEST_COLUMNS if c in parquet.schema_arrow.names]
+            for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            raise ValidationError(
+                f"Unsupported manifest format {self.format!r}", "format", self.format
+            )
+
+    def _validate(
+        self, df: pd.DataFrame, first_row: int
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Validate one chunk and return its valid rows and all its errors.
+
+        Input paths and the YouTube flag are resolved here; every other
+        column is checked by CSVValidator.check_frame, so CSV batches and
+        manifests accept the same values.
+        """
+        df = df.reset_index(drop=True)
+        row_numbers = pd.Series(range(first_row, first_row + len(df)))
+        empty = pd.Series("", index=df.index)
+        notes = pd.Series(False, index=df.index)
+        if self.format == "csv" and len(df.columns):
+            # Lines starting with "#" are notes, like in the batch template
+            notes = df.iloc[:, 0].str.lstrip().str.startswith("#")
+        column = {
+            name: _text(df[name]).where(~notes, "") if name in df else empty
+            for name in MANIFEST_COLUMNS
+        }
+        problems: List[pd.Series] = []
+
+        def flag(
+            mask: pd.Series, message: str, values: Optional[pd.Series] = None
+        ) -> None:
+            """Record ``message`` (and the bad value) for the rows in ``mask``."""
+            if not mask.any():
+                return
+            rows = mask.index[mask]
+            text = "Row " + row_numbers[rows].astype(str) + ": " + message
+            if values is not None:
+                text = text + values[rows]
+            problems.append(text)
+
+        # input_path, falling back to the older file_path and url columns
+        input_path = column["input_path"]
+        input_path = input_path.where(input_path != "", column["file_path"])
+        from_url = (input_path == "") & (column["url"] != "")
+        input_path = input_path.where(~from_url, column["url"])
+        flag((input_path == "") & ~notes, "input_path, file_path or url is required")
+
+        youtube_text = column["is_youtube_url"].str.lower()
+        flag(
+            ~youtube_text.isin(CSVValidator.TRUE_VALUES | CSVValidator.FALSE_VALUES),
+            "Invalid value for is_youtube_url: ",
+            column["is_youtube_url"],
+        )
+        # Without an explicit flag, rows from the url column or with a URL
+        # as their path are YouTube videos
+        is_youtube_url = (
+            youtube_text.isin(CSVValidator.TRUE_VALUES)
+            .where(youtube_text != "", from_url | input_path.str.match(r"https?://"))
+            .astype(bool)
+        )
+
+        # Local files must exist; URLs are checked when they are downloaded
+        frame = pd.DataFrame(
+            {
+                "file_path": input_path.where(~is_youtube_url, ""),
+                **{
+                    name: column[name]
+                    for name in ["title", *CSVValidator.OPTIONAL_COLUMNS]
+                    if name in df
+                },
+            }
+        )
+        validator = CSVValidator(stat_cache=self.stat_cache)
+        parsed, _, checked = validator.check_frame(
+            frame, first_row, require_title=False
+        )
+        problems.append(checked)
+
+        combined = pd.concat(problems).sort_index(kind="stable")
+        errors = combined.tolist()
+        invalid = set(combined.index) | set(notes.index[notes])
+
+        # Upload settings are only passed on where the row sets them
+        options = [
+            (field, parsed[name].tolist(), (frame[name] != "").tolist())
+            for name, field in CSVValidator.METADATA_FIELDS.items()
+            if name in frame
+        ]
+        missing = pd.Series([None] * len(df), dtype=object)
+        tags = parsed.get("tags", missing)
+        published = parsed.get("publish_time", missing)
+        rows = [
+            {
+                "input_path": input_path.iat[row],
+                "is_youtube_url": bool(is_youtube_url.iat[row]),
+                "title": column["title"].iat[row] or None,
+                "description": column["description"].iat[row],
+                "tags": tags.iat[row] or [],
+                "publish_time": (
+                    published.iat[row].isoformat() if published.iat[row] else None
+                ),
+                "thumbnail_path": column["thumbnail_path"].iat[row] or None,
+                "playlist_ids": (
+                    CSVValidator.split_tags(column["playlist_ids"].iat[row]) or []
+                ),
+                "video_options": {
+                    field: values[row] for field, values, given in options if given[row]
+                },
+            }
+            for row in range(len(df))
+            if row not in invalid
+        ]
+        return rows, errors
+
+    def _error(self, errors: List[str]) -> ValidationError:
+        """Return the exception reporting ``errors``."""
+        shown = errors[: CSVValidator.MAX_REPORTED_ERRORS]
+        message = f"Manifest has {len(errors)} errors:\n" + "\n".join(shown)
+        if len(errors) > len(shown):
+            message += f"\n... and {len(errors) - len(shown)} more"
+        logger.error(message)
+        return ValidationError(message, "rows", errors)
+
+
+def load_manifest(
+    source: ManifestSource, format: Optional[str] = None
+) -> List[ManifestItem]:
+    """Load and validate a whole manifest; see ManifestLoader.load."""
+    return ManifestLoader(source, format).load()
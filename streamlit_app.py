@@ -17,8 +17,10 @@ import streamlit as st
 from rich.logging import RichHandler
 
 from main import process_video
+from src.youtube_processor.core.batch import BatchEngine
 from src.youtube_processor.logging_config import setup_logging
-from src.youtube_processor.models import BatchProcessingJob
+from src.youtube_processor.models import BatchProcessingJob, ManifestItem
+from src.youtube_processor.utils.manifest import ManifestLoader
 
 # Configure page
 st.set_page_config(
@@ -205,49 +207,52 @@ if "batch_progress" not in st.session_state:
     st.session_state.batch_progress = {"current": 0, "total": 0, "status": {}}
 
 
-def process_batch_videos(csv_data: pd.DataFrame) -> Dict[str, str]:
+def process_batch_videos(items: List[ManifestItem]) -> Dict[str, str]:
     """
-    Process multiple videos from CSV data.
+    Process multiple videos from a batch manifest.
+
+    Videos are processed concurrently by the shared batch engine.
 
     Args:
-        csv_data: DataFrame containing video metadata
+        items: Validated manifest items
 
     Returns:
         Dict[str, str]: Dictionary of video paths and their processing status
     """
     results = {}
-    total_videos = len(csv_data)
+    total_videos = len(items)
     st.session_state.batch_progress["total"] = total_videos
-
-    for idx, row in csv_data.iterrows():
-        st.session_state.batch_progress["current"] = idx + 1
-        try:
-            # Extract data from CSV row
-            input_path = row["input_path"]
-            title = row.get("title", Path(input_path).stem)
-            description = row.get("description", "")
-            tags = row.get("tags", "").split(",") if row.get("tags") else None
-            publish_time = row.get("publish_time")
-            is_youtube_url = row.get("is_youtube_url", False)
-
-            # Process video
-            success, processed_path = process_with_progress(
-                input_path=input_path,
-                title=title,
-                description=description,
-                tags=tags,
-                publish_time=publish_time,
-                is_youtube_url=is_youtube_url,
-                file_size_mb=100,  # Default estimate
-            )
-
-            results[input_path] = "Success" if success else "Failed"
-            st.session_state.batch_progress["status"][input_path] = results[input_path]
-
-        except Exception as e:
-            logger.error("Error processing %s: %s", input_path, str(e))
-            results[input_path] = f"Error: {str(e)}"
-            st.session_state.batch_progress["status"][input_path] = results[input_path]
+    st.session_state.batch_progress["current"] = 0
+
+    progress_bar = st.progress(0.0)
+    status_text = st.empty()
+    rows = (
+        {
+            **item.model_dump(),
+            # Untitled local videos are named after their file, while URLs
+            # keep the title of the downloaded video
+            "title": item.title
+            or (None if item.is_youtube_url else Path(item.input_path).stem),
+            "tags": item.tags or None,
+        }
+        for item in items
+    )
+    for result in BatchEngine().run(process_video, rows):
+        st.session_state.batch_progress["current"] += 1
+        if result.success:
+            results[result.label] = "Success"
+        else:
+            logger.error("Error processing %s: %s", result.label, result.error)
+            results[result.label] = f"Error: {result.error}"
+        st.session_state.batch_progress["status"][result.label] = results[result.label]
+
+        progress_bar.progress(
+            st.session_state.batch_progress["current"] / max(total_videos, 1)
+        )
+        status_text.text(
+            f"📋 Processed {st.session_state.batch_progress['current']} "
+            f"of {total_videos} videos"
+        )
 
     return results
 
@@ -557,21 +562,23 @@ def main() -> None:
         # CSV file upload
         uploaded_csv = st.file_uploader(
             "Upload CSV File",
-            type=["csv"],
-            help="Upload your completed CSV file containing video metadata",
+            type=["csv", "jsonl", "parquet"],
+            help="Upload your completed CSV (or JSONL/Parquet) file containing "
+            "video metadata",
         )
 
         if uploaded_csv:
             try:
-                # Read and validate CSV
-                df = pd.read_csv(uploaded_csv)
+                # Read and validate the manifest
+                uploaded_csv.seek(0)
+                items = ManifestLoader(uploaded_csv).load()
                 st.write("Preview of CSV data:")
-                st.dataframe(df.head())
+                st.dataframe(pd.DataFrame([item.model_dump() for item in items[:5]]))
 
                 # Process batch button
                 if st.button("🚀 Process Batch"):
                     with st.spinner("Processing videos..."):
-                        results = process_batch_videos(df)
+                        results = process_batch_videos(items)
 
                         # Display results
                         st.success("Batch processing complete!")
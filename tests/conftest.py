@@ -1,9 +1,10 @@
 # tests/conftest.py
+import sys
 from pathlib import Path
 
 import pytest
 
-from youtube_processor.config import Settings
+from youtube_processor.config import Settings, settings
 
 
 @pytest.fixture
@@ -17,6 +18,20 @@ def test_settings():
     )
 
 
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Keep caches, indexes and ledgers of every test out of the project."""
+    # main.py and the front ends import the package as src.youtube_processor
+    front_end = sys.modules.get("src.youtube_processor.config")
+    for config in [settings, getattr(front_end, "settings", None)]:
+        if config is None:
+            continue
+        monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(config, "WORK_DIR", tmp_path / "work")
+        monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "downloads")
+        monkeypatch.setattr(config, "JOB_STORE_PATH", tmp_path / "work" / "jobs.db")
+
+
 @pytest.fixture(autouse=True)
 def setup_test_dirs(test_settings):
     """Create and clean up test directories."""
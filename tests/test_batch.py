@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_processor.core.batch import BatchEngine, default_worker_count
+
+
+def _square(value):
+    if value < 0:
+        raise ValueError("negative value")
+    return value * value
+
+
+def test_default_worker_count_uses_cpu_count(test_settings):
+    """Test that the worker count falls back to at least one worker."""
+    assert default_worker_count() >= 1
+
+
+def test_batch_engine_reports_results_and_failures():
+    """Test per-item results and failures across worker processes."""
+    engine = BatchEngine(max_workers=2)
+    items = [{"value": 2}, {"value": -1}, {"value": 3}]
+
+    results = engine.run_all(_square, items)
+
+    assert [result.index for result in results] == [0, 1, 2]
+    assert [result.success for result in results] == [True, False, True]
+    assert results[0].result == 4
+    assert results[2].result == 9
+    assert "negative value" in results[1].error
+
+
+def test_batch_engine_consumes_items_lazily():
+    """Test that only a bounded number of items is pulled ahead of results."""
+    pulled = []
+
+    def items():
+        for value in range(10):
+            pulled.append(value)
+            yield {"value": value}
+
+    engine = BatchEngine(max_workers=1, executor_factory=ThreadPoolExecutor)
+    results = engine.run(_square, items())
+
+    next(results)
+    assert len(pulled) <= 3
+    assert len(list(results)) == 9
@@ -0,0 +1,86 @@
+import os
+from unittest.mock import MagicMock
+
+from youtube_processor.core.cache import (
+    DownloadCache,
+    EndScreenCache,
+    ProbeCache,
+    enforce_size_budget,
+)
+from youtube_processor.models import StreamSpec
+
+
+def _write_clip(path, size=10):
+    path.write_bytes(b"\0" * size)
+
+
+def test_end_screen_cache_reuses_clip(tmp_path):
+    """Test that a clip is encoded once per distinct format."""
+    cache = EndScreenCache(cache_dir=tmp_path, max_bytes=1024)
+    generate = MagicMock(side_effect=_write_clip)
+    spec = StreamSpec(width=1920, height=1080, fps="60/1")
+
+    first = cache.get_or_create(spec, 2, generate)
+    second = cache.get_or_create(spec, 2, generate)
+    cache.get_or_create(spec.model_copy(update={"fps": "30/1"}), 2, generate)
+
+    assert first == second
+    assert first.exists()
+    assert generate.call_count == 2
+    assert not list(tmp_path.glob(".*"))  # No leftover temporary files
+
+
+def test_end_screen_cache_key_includes_duration():
+    """Test that the clip duration is part of the cache key."""
+    spec = StreamSpec(width=1280, height=720)
+
+    assert EndScreenCache.key_for(spec, 2) != EndScreenCache.key_for(spec, 3)
+
+
+def test_enforce_size_budget_evicts_least_recently_used(tmp_path):
+    """Test LRU eviction by modification time."""
+    for index, name in enumerate(["old.mp4", "mid.mp4", "new.mp4"]):
+        path = tmp_path / name
+        _write_clip(path)
+        os.utime(path, (index, index))
+
+    freed = enforce_size_budget(tmp_path, 20, "*.mp4")
+
+    assert freed == 10
+    assert not (tmp_path / "old.mp4").exists()
+    assert (tmp_path / "new.mp4").exists()
+
+
+def test_download_cache_evicts_over_budget(tmp_path):
+    """Test that old downloads are evicted together with their sidecar files."""
+    cache = DownloadCache(tmp_path, max_bytes=15)
+    for index, video_id in enumerate(["old", "new"]):
+        video_path = tmp_path / f"{video_id}.mp4"
+        _write_clip(video_path)
+        (tmp_path / f"{video_id}.webp").write_bytes(b"thumb")
+        os.utime(video_path, (index, index))
+        cache.store(video_id, "best", video_path, {"id": video_id})
+        os.utime(video_path, (index, index))
+
+    cache.evict()
+
+    assert cache.index.get("old") is None
+    assert not list(tmp_path.glob("old.*"))
+    assert cache.lookup("new", "best") is not None
+
+
+def test_probe_cache_memoizes_until_file_changes(tmp_path):
+    """Test that a file is probed once until its size or mtime changes."""
+    cache = ProbeCache(cache_dir=tmp_path / "probes")
+    video = tmp_path / "input.mp4"
+    _write_clip(video)
+    probe = MagicMock(return_value=StreamSpec(width=1280, height=720))
+
+    first = cache.get_or_probe(video, probe)
+    second = cache.get_or_probe(video, probe)
+    assert first == second
+    assert probe.call_count == 1
+
+    _write_clip(video, size=20)
+    cache.get_or_probe(video, probe)
+    assert probe.call_count == 2
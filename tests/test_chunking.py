@@ -0,0 +1,82 @@
+import json
+
+import httplib2
+from googleapiclient.http import HttpRequest
+
+from youtube_processor.core.chunking import (
+    AdaptiveMediaFileUpload,
+    ChunkSizeController,
+)
+from youtube_processor.core.streaming import CHUNK_GRANULARITY
+
+MB = 1024 * 1024
+
+
+def _controller():
+    return ChunkSizeController(
+        initial=2 * MB, minimum=1 * MB, maximum=16 * MB, target_seconds=1
+    )
+
+
+def test_controller_grows_on_fast_links_within_bounds():
+    """Test that chunks at most double per step and stop at the maximum."""
+    controller = _controller()
+
+    sizes = []
+    for _ in range(5):
+        controller.record_success(controller.size, 0.01)  # 100x the target rate
+        sizes.append(controller.size // MB)
+
+    assert sizes == [4, 8, 16, 16, 16]
+
+
+def test_controller_shrinks_on_failures_and_slow_chunks():
+    """Test that failures halve chunks and block growth for a while."""
+    controller = _controller()
+
+    controller.record_failure()
+    assert controller.size == 1 * MB
+    controller.record_success(controller.size, 0.01)
+    assert controller.size == 1 * MB  # Still holding after the failure
+
+    controller = _controller()
+    controller.record_success(2 * MB, 4)  # 0.5MB/s against a 1s target
+    assert controller.size == 1 * MB
+    assert controller.size % CHUNK_GRANULARITY == 0
+
+
+def test_adaptive_upload_rereads_chunk_size(tmp_path):
+    """Test that every request uses the controller's current chunk size."""
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"x" * (6 * CHUNK_GRANULARITY))
+    controller = ChunkSizeController(
+        initial=CHUNK_GRANULARITY, minimum=CHUNK_GRANULARITY, maximum=MB
+    )
+    media = AdaptiveMediaFileUpload(str(video_path), controller)
+    received = []
+
+    class Server:
+        def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+            if method == "POST":
+                return httplib2.Response({"status": 200, "location": "u"}), b""
+            received.append(len(body.read()))
+            if sum(received) == media.size():
+                return httplib2.Response({"status": 200}), b'{"id": "abc"}'
+            last = sum(received) - 1
+            return httplib2.Response({"status": 308, "range": f"0-{last}"}), b""
+
+    request = HttpRequest(
+        Server(),
+        lambda resp, content: json.loads(content),
+        "https://upload.test/videos",
+        method="POST",
+        body="{}",
+        headers={"content-type": "application/json"},
+        resumable=media,
+    )
+    response = None
+    while response is None:
+        _, response = request.next_chunk()
+        controller.size *= 2  # Stand in for measured growth
+
+    assert received == [CHUNK_GRANULARITY, 2 * CHUNK_GRANULARITY, 3 * CHUNK_GRANULARITY]
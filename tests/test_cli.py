@@ -0,0 +1,42 @@
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+from youtube_processor.cli import _process_batch_row
+from youtube_processor.core.quota import QuotaScheduler
+from youtube_processor.core.upload_index import index_key_for
+from youtube_processor.models import VideoMetadata
+
+from .test_youtube_api import _api, _RecordingServer
+
+
+def test_batch_row_sends_title_fixed_in_the_manifest(tmp_path):
+    """Test that a manifest title beats the one fetched from YouTube."""
+    server = _RecordingServer()
+    api = _api(server, tmp_path)
+    url = "https://youtu.be/x"
+    fetched = VideoMetadata(title="Typo", description="From YouTube", tags=["a"])
+    api.upload_index.record(
+        index_key_for(url, is_youtube_url=True), "vid", api._video_body(fetched)
+    )
+    downloader = MagicMock()
+    downloader.fetch_metadata.return_value.metadata = fetched
+
+    with ExitStack() as stack:
+        stack.enter_context(patch("youtube_processor.cli.YouTubeAPI", return_value=api))
+        stack.enter_context(
+            patch("youtube_processor.cli.VideoDownloader", return_value=downloader)
+        )
+        stack.enter_context(
+            patch(
+                "youtube_processor.cli.QuotaScheduler",
+                return_value=QuotaScheduler(api.quota, wait_for_reset=False),
+            )
+        )
+        video_id = _process_batch_row(url, is_youtube_url=True, title="Fixed")
+
+    assert video_id == "vid"
+    [(method, _, body)] = server.requests
+    assert method == "PUT"
+    assert body["snippet"]["title"] == "Fixed"
+    assert body["snippet"]["description"] == "From YouTube"
+    downloader.download.assert_not_called()
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from youtube_processor.exceptions import ValidationError
+from youtube_processor.utils.csv_validator import CSVValidator
+
+
+def _manifest(tmp_path, lines):
+    path = tmp_path / "batch.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_validator_coerces_columns(tmp_path):
+    """Test that valid rows are parsed column by column into row dicts."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = _manifest(
+        tmp_path,
+        [
+            "file_path,title,tags,category,privacy_status,publish_time,made_for_kids",
+            f'{video},First," a , b ,",22,Public,2024-02-20T15:00:00,TRUE',
+            "https://youtu.be/x,Second,,,private,,no",
+        ],
+    )
+
+    rows = CSVValidator(path).validate()
+
+    assert rows[0] == {
+        "file_path": str(video),
+        "title": "First",
+        "description": "",
+        "tags": ["a", "b"],
+        "category": "22",
+        "privacy_status": "public",
+        "publish_time": datetime(2024, 2, 20, 15, 0),
+        "made_for_kids": True,
+    }
+    assert rows[1] == {
+        "file_path": "https://youtu.be/x",
+        "title": "Second",
+        "description": "",
+        "privacy_status": "private",
+        "made_for_kids": False,
+    }
+
+
+def test_validator_reports_every_error_with_row_numbers(tmp_path):
+    """Test that all bad cells are reported at once instead of the first only."""
+    path = _manifest(
+        tmp_path,
+        [
+            "file_path,title,category,privacy_status,license,publish_time",
+            "https://youtu.be/a,Fine,22,private,youtube,2024-01-01T00:00:00",
+            f"{tmp_path / 'missing.mp4'},,99,secret,youtube,",
+            "https://youtu.be/b,Late,22,private,gpl,tomorrow",
+        ],
+    )
+
+    with pytest.raises(ValidationError) as error:
+        CSVValidator(path).validate()
+
+    assert error.value.details["field"] == "rows"
+    assert error.value.details["value"] == [
+        f"Row 3: File not found: {tmp_path / 'missing.mp4'}",
+        "Row 3: Title is required",
+        "Row 3: Invalid category ID: 99",
+        "Row 3: Invalid privacy status: secret",
+        "Row 4: Invalid license: gpl",
+        "Row 4: Invalid publish time format: tomorrow",
+    ]
+
+
+def test_validator_streams_rows_chunk_by_chunk(tmp_path):
+    """Test that rows are yielded per chunk and bad rows stop or are skipped."""
+    lines = ["file_path,title,category"]
+    lines += [f"https://youtu.be/{i},Video {i},22" for i in range(5)]
+    lines += ["https://youtu.be/bad,Bad,99"]
+    path = _manifest(tmp_path, lines)
+    validator = CSVValidator(path)
+
+    rows = validator.iter_rows(chunk_size=2)
+    # Good chunks arrive before the chunk with the bad row has been read
+    assert [next(rows)["title"] for _ in range(4)] == [f"Video {i}" for i in range(4)]
+    with pytest.raises(ValidationError):
+        next(rows)
+
+    lenient = list(validator.iter_rows(chunk_size=4, skip_invalid=True))
+    assert len(lenient) == 5
+    assert validator.errors == ["Row 7: Invalid category ID: 99"]
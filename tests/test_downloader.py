@@ -1,9 +1,12 @@
 # tests/test_downloader.py
+from contextlib import ExitStack
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from youtube_processor.config import settings
+from youtube_processor.core.cache import DownloadCache
 from youtube_processor.core.downloader import VideoDownloader
 from youtube_processor.exceptions import VideoDownloadError
 
@@ -54,3 +57,117 @@ def test_download_error(test_settings):
 
         with pytest.raises(VideoDownloadError):
             downloader.download(url)
+
+
+def test_download_many_streams_results(test_settings):
+    """Test concurrent downloads with per-URL results and failures."""
+    downloader = VideoDownloader()
+    urls = [f"https://www.youtube.com/watch?v=video{i}" for i in range(4)]
+
+    def extract_info(url, download=True):
+        if url.endswith("video2"):
+            raise Exception("Video unavailable")
+        video_id = url.rsplit("=", 1)[1]
+        return {
+            "id": video_id,
+            "ext": "mp4",
+            "title": video_id,
+            "description": "",
+            "duration": 10,
+        }
+
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
+        mock_ydl.return_value.__enter__.return_value.extract_info.side_effect = (
+            extract_info
+        )
+        results = {result.url: result for result in downloader.download_many(urls, 2)}
+
+    assert set(results) == set(urls)
+    assert not results[urls[2]].success
+    assert "Video unavailable" in results[urls[2]].error
+    assert results[urls[0]].metadata.title == "video0"
+    assert results[urls[3]].video_path.name == "video3.mp4"
+
+
+def test_download_reuses_cached_file(test_settings, tmp_path):
+    """Test that a completed download is reused instead of re-fetched."""
+    downloader = VideoDownloader(cache=DownloadCache(tmp_path))
+    downloader.output_path = tmp_path
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    info = {
+        "id": "dQw4w9WgXcQ",
+        "ext": "mp4",
+        "title": "Cached Video",
+        "description": "Test Description",
+        "duration": 100,
+        "format_id": "137+140",
+    }
+
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
+        ydl = mock_ydl.return_value.__enter__.return_value
+        ydl.extract_info.return_value = info
+        ydl.sanitize_info.side_effect = lambda value: value
+        ydl.process_info.side_effect = lambda value: (
+            tmp_path / "dQw4w9WgXcQ.mp4"
+        ).write_bytes(b"video")
+
+        first_path, _ = downloader.download(url)
+        second_path, metadata = downloader.download(url)
+
+    assert first_path == second_path
+    assert metadata.title == "Cached Video"
+    assert ydl.process_info.call_count == 1
+    assert ydl.extract_info.call_count == 1  # Cache hit needs no network
+
+
+def test_download_refetches_changed_file(test_settings, tmp_path):
+    """Test that a cached file whose size changed is downloaded again."""
+    cache = DownloadCache(tmp_path)
+    video_path = tmp_path / "abc.mp4"
+    video_path.write_bytes(b"video")
+    cache.store("abc", "best", video_path, {"id": "abc", "title": "t"})
+
+    video_path.write_bytes(b"truncated video")
+
+    assert cache.lookup("abc", "best") is None
+    assert cache.index.get("abc") is None
+
+
+def test_prefetch_metadata_without_download(test_settings, tmp_path):
+    """Test concurrent metadata-only extraction with an on-disk cache."""
+    downloader = VideoDownloader()
+    urls = [
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://www.youtube.com/watch?v=bbbbbbbbbbb",
+    ]
+    info = {
+        "id": "aaaaaaaaaaa",
+        "title": "Planned Video",
+        "description": "",
+        "duration": 600,
+        "width": 1920,
+        "height": 1080,
+        "fps": 60,
+        "vcodec": "avc1.640028",
+        "acodec": "mp4a.40.2",
+        "requested_formats": [{"filesize": 1000}, {"filesize_approx": 200}],
+    }
+
+    with ExitStack() as stack:
+        mock_ydl = stack.enter_context(patch("yt_dlp.YoutubeDL"))
+        stack.enter_context(patch.object(settings, "CACHE_DIR", tmp_path))
+        ydl = mock_ydl.return_value.__enter__.return_value
+        ydl.extract_info.return_value = info
+
+        results = list(downloader.prefetch_metadata(urls))
+        cached = downloader.fetch_metadata(urls[0])
+
+    assert len(results) == 2
+    assert all(call.kwargs["download"] is False for call in ydl.extract_info.mock_calls)
+    assert ydl.extract_info.call_count == 2  # Third lookup served from disk
+    assert cached.metadata.duration == 600
+    assert cached.stream_spec.fps == "60/1"
+    assert cached.stream_spec.video_codec == "h264"
+    assert cached.stream_spec.audio_codec == "aac"
+    assert cached.filesize == 1200
+    ydl.process_info.assert_not_called()
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from youtube_processor.core import ingest
+from youtube_processor.core.ingest import (
+    ingest_stream,
+    ingest_upload,
+    remove_stale_uploads,
+)
+from youtube_processor.exceptions import ValidationError
+
+
+class _Upload:
+    """Async reader standing in for a FastAPI UploadFile."""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+        self.reads = []
+
+    async def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+def test_ingest_streams_upload_in_chunks(tmp_path):
+    """Test that uploads are copied chunk by chunk into private directories."""
+    data = os.urandom(10_000)
+    upload = _Upload(data)
+
+    stored = asyncio.run(
+        ingest_upload(upload, "../../clip.mp4", root=tmp_path, chunk_size=4096)
+    )
+    again = asyncio.run(ingest_upload(_Upload(data), "clip.mp4", root=tmp_path))
+
+    assert stored.path.parent.parent == tmp_path  # Traversal stripped
+    assert stored.path.read_bytes() == data
+    assert (stored.size, stored.sha256) == (10_000, hashlib.sha256(data).hexdigest())
+    assert max(upload.reads) == 4096
+    assert again.path != stored.path
+
+
+def test_ingest_stream_stops_reading_past_the_limit(tmp_path):
+    """Test that a request body is refused while it arrives, not after."""
+    received = []
+
+    async def body(chunks):
+        for chunk in chunks:
+            received.append(chunk)
+            yield chunk
+
+    stored = asyncio.run(
+        ingest_stream(body([b"a" * 10] * 5), "clip.mp4", root=tmp_path, chunk_size=16)
+    )
+    assert stored.path.read_bytes() == b"a" * 50
+
+    received.clear()
+    with pytest.raises(ValidationError):
+        asyncio.run(
+            ingest_stream(
+                body([b"b" * 10] * 100), "big.mp4", root=tmp_path, max_bytes=25
+            )
+        )
+    assert len(received) == 3
+    assert list(tmp_path.iterdir()) == [stored.path.parent]
+
+
+def test_ingest_cleans_up_rejected_and_stale_uploads(tmp_path, monkeypatch):
+    """Test that the size limit is enforced and partial files are removed."""
+    with pytest.raises(ValidationError):
+        asyncio.run(
+            ingest_upload(
+                _Upload(b"x" * 5000),
+                "big.mp4",
+                root=tmp_path,
+                max_bytes=4000,
+                chunk_size=1024,
+            )
+        )
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setattr(ingest, "upload_root", lambda: tmp_path)
+    stale = tmp_path / "upload_old"
+    stale.mkdir()
+    old = time.time() - 7200
+    os.utime(stale, (old, old))
+    queued = tmp_path / "upload_queued"
+    queued.mkdir()
+    os.utime(queued, (old, old))
+    (tmp_path / "upload_new").mkdir()
+    assert remove_stale_uploads(max_age=3600, keep=[queued / "clip.mp4"]) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "upload_new",
+        "upload_queued",
+    ]
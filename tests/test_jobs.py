@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from youtube_processor.core.jobs import JobRunner, JobStore
+from youtube_processor.exceptions import JobQueueFullError
+from youtube_processor.models import BatchItemResult
+
+
+def test_job_store_tracks_items_across_instances(tmp_path):
+    """Test that job state is persisted and visible to other store instances."""
+    store = JobStore(tmp_path / "jobs.db")
+    items = [{"input_path": "a.mp4", "title": "A"}, {"input_path": "b.mp4"}]
+    job_id = store.create_job(items)
+
+    store.start_item(job_id, 0)
+    store.finish_item(
+        job_id, BatchItemResult(index=1, label="b.mp4", success=False, error="boom")
+    )
+
+    job = JobStore(tmp_path / "jobs.db").get_job(job_id)
+    assert job.status == "processing"
+    assert [item.status for item in job.items] == ["running", "failed"]
+    assert job.items[1].error == "boom"
+    assert job.failed == 1
+    assert store.items(job_id) == items
+    assert store.unfinished_items() == items[:1]
+
+    store.finish_item(
+        job_id, BatchItemResult(index=0, label="a.mp4", success=True, result="vid")
+    )
+    store.finish_job(job_id)
+    assert store.unfinished_items() == []
+    job = store.get_job(job_id)
+    assert (job.status, job.succeeded, job.items[0].result) == ("completed", 1, "vid")
+    assert store.get_job("missing") is None
+
+
+def test_job_store_ids_are_unique_under_concurrent_submissions(tmp_path):
+    """Test that simultaneous submissions from several writers never collide."""
+    job_ids = []
+
+    def submit():
+        store = JobStore(tmp_path / "jobs.db")  # Like a separate API worker
+        for _ in range(10):
+            job_ids.append(store.create_job([{"input_path": "a.mp4"}]))
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(job_ids)) == 40
+    store = JobStore(tmp_path / "jobs.db")
+    assert all(store.get_job(job_id).total == 1 for job_id in job_ids)
+
+
+def test_job_runner_processes_queued_jobs_off_the_caller(tmp_path):
+    """Test that submit returns at once and workers record every outcome."""
+    store = JobStore(tmp_path / "jobs.db")
+    release = threading.Event()
+
+    def process(input_path):
+        release.wait(5)
+        if input_path == "bad.mp4":
+            raise ValueError("corrupt")
+        return input_path.upper()
+
+    runner = JobRunner(store, process, workers=2, queue_size=3)
+    job_id = store.create_job([{"input_path": "a.mp4"}, {"input_path": "bad.mp4"}])
+    runner.submit(job_id)
+    assert store.get_job(job_id).status == "processing"
+
+    # A job larger than the free queue space is refused as a whole
+    too_big = store.create_job([{"input_path": "x.mp4"}] * 4)
+    with pytest.raises(JobQueueFullError):
+        runner.submit(too_big)
+    assert store.unfinished(too_big) == 4
+
+    release.set()
+    runner.join()
+    job = store.get_job(job_id)
+    assert job.status == "completed"
+    assert [item.status for item in job.items] == ["succeeded", "failed"]
+    assert (job.items[0].result, job.items[1].error) == ("A.MP4", "corrupt")
+
+
+def test_job_events_can_be_followed_incrementally(tmp_path):
+    """Test that state changes and progress are logged as resumable events."""
+    store = JobStore(tmp_path / "jobs.db")
+    job_id = store.create_job([{"input_path": "a.mp4"}])
+
+    def process(input_path, progress):
+        progress("upload", {"bytes_sent": 512, "total_bytes": 1024})
+        return "vid"
+
+    runner = JobRunner(store, process, workers=1, progress=True)
+    runner.submit(job_id)
+    runner.join()
+
+    events = store.events(job_id)
+    assert [event.type for event in events] == [
+        "job.created",
+        "item.running",
+        "item.progress",
+        "item.succeeded",
+        "job.completed",
+    ]
+    assert events[2].index == 0
+    assert events[2].data == {"stage": "upload", "bytes_sent": 512, "total_bytes": 1024}
+
+    # A reconnecting client only gets what it has not seen yet
+    resumed = store.events(job_id, after=events[2].id)
+    assert [event.type for event in resumed] == ["item.succeeded", "job.completed"]
+    assert store.events(job_id, after=events[-1].id) == []
+
+
+def test_job_store_recovers_jobs_of_stopped_runners(tmp_path):
+    """Test that jobs left unfinished by a dead runner finish as interrupted."""
+    store = JobStore(tmp_path / "jobs.db")
+    dead = store.create_job([{"input_path": "a.mp4"}, {"input_path": "b.mp4"}])
+    live = store.create_job([{"input_path": "c.mp4"}])
+    store.heartbeat("old-server")
+    store.claim_job(dead, "old-server")
+    store.start_item(dead, 0)
+    store.claim_job(live, "new-server")
+    time.sleep(0.05)
+    store.heartbeat("new-server")
+
+    assert store.recover_interrupted(max_age=0.02) == 1
+
+    job = store.get_job(dead)
+    assert job.status == "interrupted"
+    assert [(item.status, item.error) for item in job.items] == [
+        ("failed", "interrupted"),
+        ("failed", "interrupted"),
+    ]
+    assert store.events(dead)[-1].type == "job.interrupted"
+    assert store.get_job(live).status == "processing"
+    assert store.recover_interrupted(max_age=0.02) == 0
+
+    # Finished jobs are pruned together with their items and events
+    assert store.prune(max_age=3600) == 0
+    assert store.prune(max_age=0) == 1
+    assert store.get_job(dead) is None
+    assert store.events(dead) == []
+    assert store.get_job(live) is not None
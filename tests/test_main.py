@@ -0,0 +1,112 @@
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+import main
+from src.youtube_processor.core.quota import QuotaLedger, QuotaScheduler
+from src.youtube_processor.exceptions import QuotaExceededError, VideoUploadError
+
+
+def _patched_components(stack):
+    """Patch the components process_video builds and return their mocks."""
+    api = stack.enter_context(patch("main.YouTubeAPI")).return_value
+    processor = stack.enter_context(patch("main.VideoProcessor")).return_value
+    downloader = stack.enter_context(patch("main.VideoDownloader")).return_value
+    api.indexed_video.return_value = None
+    api.upload_video.return_value = "vid"
+    return api, processor, downloader
+
+
+def test_process_video_sets_thumbnail_and_playlists(tmp_path):
+    """Test that single videos get their post-upload calls too."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    thumbnail = tmp_path / "thumb.jpg"
+    processed = tmp_path / "processed.mp4"
+    processed.write_bytes(b"processed")
+
+    with ExitStack() as stack:
+        api, processor, _ = _patched_components(stack)
+        processor.process_video.return_value = processed
+        main.process_video(
+            str(video), title="T", thumbnail_path=str(thumbnail), playlist_ids=["PL1"]
+        )
+
+    video_id, metadata, index_key = api.finish_upload.call_args.args
+    assert video_id == "vid"
+    assert metadata.thumbnail_path == thumbnail
+    assert metadata.playlist_ids == ["PL1"]
+    assert index_key == api.upload_video.call_args.kwargs["index_key"]
+    assert not processed.exists()
+
+
+def test_process_video_keeps_output_of_failed_upload(tmp_path):
+    """Test that a retry after a failed upload does not encode again."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    processed = tmp_path / "processed.mp4"
+    processed.write_bytes(b"processed")
+
+    with ExitStack() as stack:
+        api, processor, _ = _patched_components(stack)
+        processor.process_video.return_value = processed
+        api.upload_video.side_effect = VideoUploadError(
+            "Connection reset", str(processed)
+        )
+        with pytest.raises(VideoUploadError):
+            main.process_video(str(video), title="T")
+
+    assert processed.exists()
+
+
+def test_process_video_waits_for_quota_before_encoding(tmp_path):
+    """Test that a spent budget holds the video before download and encode."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    ledger = QuotaLedger(tmp_path / "ledger.json", daily_limit=10_000)
+    ledger.exhaust()
+    processed = tmp_path / "processed.mp4"
+    processed.write_bytes(b"processed")
+    events = []
+
+    def sleep(_delay):
+        events.append("slept")
+        ledger.daily_limit = 20_000
+
+    with ExitStack() as stack:
+        api, processor, _ = _patched_components(stack)
+        stack.enter_context(
+            patch(
+                "main.QuotaScheduler",
+                return_value=QuotaScheduler(ledger, wait_for_reset=True, sleep=sleep),
+            )
+        )
+        processor.process_video.side_effect = lambda *a, **k: (
+            events.append("encoded") or processed
+        )
+        main.process_video(str(video), title="T")
+
+    assert events == ["slept", "encoded"]
+    api.upload_video.assert_called_once()
+
+
+def test_process_video_fails_fast_without_quota(tmp_path):
+    """Test that nothing is downloaded or encoded when not waiting for quota."""
+    ledger = QuotaLedger(tmp_path / "ledger.json", daily_limit=10_000)
+    ledger.exhaust()
+
+    with ExitStack() as stack:
+        api, processor, downloader = _patched_components(stack)
+        stack.enter_context(
+            patch(
+                "main.QuotaScheduler",
+                return_value=QuotaScheduler(ledger, wait_for_reset=False),
+            )
+        )
+        with pytest.raises(QuotaExceededError):
+            main.process_video("https://youtu.be/abc", title="T")
+
+    downloader.download.assert_not_called()
+    processor.process_video.assert_not_called()
+    api.upload_video.assert_not_called()
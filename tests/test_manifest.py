@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from youtube_processor.exceptions import ValidationError
+from youtube_processor.models import ManifestItem
+from youtube_processor.utils.csv_validator import CSVValidator
+from youtube_processor.utils.manifest import ManifestLoader
+
+
+def test_loader_reads_all_formats_into_one_schema(tmp_path):
+    """Test that CSV, JSONL and Parquet manifests yield the same items."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    expected = [
+        ManifestItem(input_path=str(video), title="Local", tags=["a", "b"]),
+        ManifestItem(
+            input_path="https://youtu.be/x",
+            is_youtube_url=True,
+            publish_time="2024-03-20T15:00:00",
+        ),
+    ]
+
+    csv_path = tmp_path / "batch.csv"
+    csv_path.write_text(
+        "file_path,url,title,tags,publish_time\n"
+        f"{video},,Local,a;b,\n"
+        ",https://youtu.be/x,,,2024-03-20T15:00:00\n"
+        "# Notes are skipped\n"
+    )
+    jsonl_path = tmp_path / "batch.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"input_path": str(video), "title": "Local", "tags": ["a", "b"]})
+        + "\n"
+        + json.dumps(
+            {
+                "input_path": "https://youtu.be/x",
+                "is_youtube_url": True,
+                "publish_time": "2024-03-20T15:00:00",
+            }
+        )
+    )
+
+    assert ManifestLoader(csv_path).load() == expected
+    assert ManifestLoader(jsonl_path).load() == expected
+    with open(csv_path, "rb") as f:  # File objects name their format too
+        assert ManifestLoader(f).load() == expected
+
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    parquet_path = tmp_path / "batch.parquet"
+    # video_options is filled from the setting columns, not a column itself
+    rows = [item.model_dump(exclude={"video_options"}) for item in expected]
+    pd.DataFrame(rows).to_parquet(parquet_path)
+    assert ManifestLoader(parquet_path).load() == expected
+
+
+def test_loader_reports_all_errors_and_streams_valid_rows(tmp_path):
+    """Test that bad rows are reported with line numbers or skipped."""
+    path = tmp_path / "batch.csv"
+    path.write_text(
+        "input_path,is_youtube_url,publish_time\n"
+        "https://youtu.be/a,true,\n"
+        f"{tmp_path / 'missing.mp4'},false,soon\n"
+        ",maybe,\n"
+    )
+
+    with pytest.raises(ValidationError) as error:
+        ManifestLoader(path).load()
+    assert error.value.details["value"] == [
+        f"Row 3: File not found: {tmp_path / 'missing.mp4'}",
+        "Row 3: Invalid publish time format: soon",
+        "Row 4: input_path, file_path or url is required",
+        "Row 4: Invalid value for is_youtube_url: maybe",
+    ]
+
+    loader = ManifestLoader(path)
+    rows = list(loader.iter_rows(chunk_size=1, skip_invalid=True))
+    assert [row["input_path"] for row in rows] == ["https://youtu.be/a"]
+    assert len(loader.errors) == 4
+
+    with pytest.raises(ValidationError):
+        ManifestLoader(tmp_path / "batch.xlsx")
+
+
+def test_loader_normalizes_publish_times(tmp_path):
+    """Test that rows carry publish times in ISO form."""
+    path = tmp_path / "batch.csv"
+    path.write_text(
+        "input_path,publish_time\n"
+        "https://youtu.be/a,2024-03-20 15:00\n"
+        "https://youtu.be/b,\n"
+    )
+
+    items = ManifestLoader(path).load()
+
+    assert [item.publish_time for item in items] == ["2024-03-20T15:00:00", None]
+
+
+def test_loader_carries_thumbnails_and_playlists(tmp_path):
+    """Test that post-upload columns reach the items."""
+    (tmp_path / "a.jpg").write_bytes(b"jpeg")
+    path = tmp_path / "batch.csv"
+    path.write_text(
+        "input_path,thumbnail_path,playlist_ids\n"
+        f"https://youtu.be/a,{tmp_path / 'a.jpg'},PL1;PL2\n"
+        "https://youtu.be/b,,\n"
+    )
+
+    items = ManifestLoader(path).load()
+
+    assert items[0].thumbnail_path == str(tmp_path / "a.jpg")
+    assert items[0].playlist_ids == ["PL1", "PL2"]
+    assert items[1].thumbnail_path is None
+    assert items[1].playlist_ids == []
+
+
+def test_loader_checks_columns_like_the_csv_validator(tmp_path):
+    """Test that manifests accept and check the CSV batch columns."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = tmp_path / "batch.csv"
+    path.write_text(
+        "file_path,title,tags,category,privacy_status,license,made_for_kids,"
+        "thumbnail_path\n"
+        f"{video},Kids,a;b,27,Public,creativecommons,yes,\n"
+        f"{video},Plain,a,,,,,\n"
+        f"{video},Bad,,99,secret,,maybe,{tmp_path / 'missing.jpg'}\n"
+    )
+    loader = ManifestLoader(path)
+
+    items = list(loader.iter_items(skip_invalid=True))
+
+    assert items[0].tags == ["a", "b"]
+    assert items[0].video_options == {
+        "category_id": "27",
+        "privacy_status": "public",
+        "license": "creativeCommons",
+        "made_for_kids": True,
+    }
+    assert items[1].video_options == {}
+    assert len(items) == 2
+    assert loader.errors == [
+        "Row 4: Invalid category ID: 99",
+        "Row 4: Invalid privacy status: secret",
+        f"Row 4: Thumbnail not found: {tmp_path / 'missing.jpg'}",
+        "Row 4: Invalid value for made_for_kids: maybe",
+    ]
+    assert CSVValidator.split_tags("a;b, c") == ["a", "b", "c"]
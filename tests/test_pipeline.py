@@ -0,0 +1,226 @@
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from youtube_processor.core.pipeline import BatchPipeline
+from youtube_processor.core.quota import QuotaLedger, QuotaScheduler
+from youtube_processor.core.upload_index import ChecksumCache
+from youtube_processor.core.youtube_api import YouTubeAPI
+from youtube_processor.exceptions import ValidationError
+from youtube_processor.models import PostUploadResult, VideoMetadata
+from youtube_processor.utils.manifest import ManifestLoader
+
+
+def _scheduler(tmp_path, wait_for_reset=True):
+    return QuotaScheduler(
+        QuotaLedger(tmp_path / "quota.json", project="test"), wait_for_reset
+    )
+
+
+def _make_pipeline(tmp_path, uploads, quota_scheduler=None):
+    def process_video(video_path, stream_spec=None):
+        if video_path.name == "broken.mp4":
+            raise RuntimeError("corrupt input")
+        processed = tmp_path / f"processed_{video_path.name}"
+        processed.write_bytes(b"video")
+        return processed
+
+    def upload_video(path, metadata, publish_time, index_key=None):
+        uploads.append((path.name, metadata.title, publish_time))
+        return f"id-{metadata.title}"
+
+    downloader = MagicMock()
+    downloader.download.return_value = (
+        tmp_path / "remote.mp4",
+        VideoMetadata(title="Remote", description="From YouTube"),
+    )
+    processor = MagicMock()
+    processor.process_video.side_effect = process_video
+    youtube_api = MagicMock()
+    youtube_api.upload_video.side_effect = upload_video
+    youtube_api.indexed_video.return_value = None
+
+    return BatchPipeline(
+        download_workers=2,
+        process_workers=2,
+        upload_workers=1,
+        queue_size=1,
+        downloader_factory=lambda: downloader,
+        processor_factory=lambda: processor,
+        youtube_api_factory=lambda: youtube_api,
+        quota_scheduler=quota_scheduler or _scheduler(tmp_path),
+        checksums=ChecksumCache(tmp_path / "checksums.json"),
+    )
+
+
+def test_pipeline_runs_all_stages(tmp_path):
+    """Test that items flow through download, processing and upload."""
+    uploads = []
+    pipeline = _make_pipeline(tmp_path, uploads)
+    items = [
+        {"input_path": str(tmp_path / "a.mp4"), "title": "A"},
+        {"input_path": "https://youtu.be/x", "is_youtube_url": True},
+        {"input_path": str(tmp_path / "broken.mp4"), "title": "B"},
+        {
+            "input_path": str(tmp_path / "c.mp4"),
+            "title": "C",
+            "publish_time": "2024-03-20T15:00:00",
+        },
+    ]
+
+    results = pipeline.run_all(items)
+
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[0].result == "id-A"
+    assert results[1].result == "id-Remote"
+    assert "corrupt input" in results[2].error
+    assert len(uploads) == 3
+    assert not list(tmp_path.glob("processed_*"))  # Uploaded files are removed
+
+
+def test_pipeline_fails_when_the_manifest_breaks_midway(tmp_path):
+    """Test that a manifest read error fails the run instead of cutting it short."""
+    uploads = []
+    pipeline = _make_pipeline(tmp_path, uploads)
+    for name in ("a.mp4", "b.mp4"):
+        (tmp_path / name).write_bytes(b"video")
+    path = tmp_path / "batch.jsonl"
+    path.write_text(
+        json.dumps({"input_path": str(tmp_path / "a.mp4"), "title": "A"})
+        + "\n{not json\n"
+        + json.dumps({"input_path": str(tmp_path / "b.mp4"), "title": "B"})
+        + "\n"
+    )
+    rows = ManifestLoader(path).iter_rows(chunk_size=1, skip_invalid=True)
+    results = []
+
+    with pytest.raises(ValidationError, match="could not be read"):
+        for result in pipeline.run(rows):
+            results.append(result)
+
+    assert [result.result for result in results] == ["id-A"]
+    assert [upload[1] for upload in uploads] == ["A"]
+
+
+def test_pipeline_exposes_stage_stats(tmp_path):
+    """Test per-stage counters used for tuning."""
+    pipeline = _make_pipeline(tmp_path, [])
+    items = [{"input_path": str(tmp_path / f"{i}.mp4")} for i in range(5)]
+
+    pipeline.run_all(items)
+    stats = {stage.name: stage for stage in pipeline.stats()}
+
+    assert set(stats) == {"download", "process", "upload"}
+    assert stats["upload"].processed == 5
+    assert stats["process"].workers == 2
+    assert all(0.0 <= stage.utilization <= 1.0 for stage in stats.values())
+    assert all(stage.queue_depth == 0 for stage in stats.values())
+
+
+def test_pipeline_streams_uploads_without_processed_files(tmp_path):
+    """Test that streaming mode uploads FFmpeg output without saving it."""
+    processor = MagicMock()
+    processor.stream_video.return_value.__enter__.return_value = io.BytesIO(b"v")
+    youtube_api = MagicMock()
+    youtube_api.upload_stream.return_value = "id-stream"
+    youtube_api.indexed_video.return_value = None
+    pipeline = BatchPipeline(
+        processor_factory=lambda: processor,
+        youtube_api_factory=lambda: youtube_api,
+        stream_uploads=True,
+        quota_scheduler=_scheduler(tmp_path),
+        checksums=ChecksumCache(tmp_path / "checksums.json"),
+    )
+
+    results = pipeline.run_all([{"input_path": str(tmp_path / "a.mp4")}])
+
+    assert results[0].result == "id-stream"
+    processor.process_video.assert_not_called()
+    youtube_api.upload_video.assert_not_called()
+    assert youtube_api.upload_stream.call_args[0][0].read() == b"v"
+
+
+def test_pipeline_defers_uploads_once_quota_is_spent(tmp_path):
+    """Test that uploads beyond the daily budget are not attempted."""
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"video")
+    scheduler = _scheduler(tmp_path, wait_for_reset=False)
+    scheduler.ledger.exhaust()
+    uploads = []
+    pipeline = _make_pipeline(tmp_path, uploads, quota_scheduler=scheduler)
+
+    results = pipeline.run_all([{"input_path": str(video), "title": "A"}])
+
+    assert not results[0].success
+    assert "quota" in results[0].error
+    assert uploads == []
+
+
+def test_pipeline_batches_post_upload_calls(tmp_path):
+    """Test that playlist and thumbnail calls are sent together after uploads."""
+    uploads = []
+    pipeline = _make_pipeline(tmp_path, uploads)
+    youtube_api = pipeline.youtube_api_factory()
+    youtube_api.post_upload_calls.side_effect = YouTubeAPI.post_upload_calls
+    youtube_api.upload_index.pending.side_effect = lambda calls: calls
+    youtube_api.post_upload.side_effect = lambda calls: [
+        PostUploadResult(call=call, success=True) for call in calls
+    ]
+    items = []
+    for name in ("a.mp4", "b.mp4"):
+        (tmp_path / name).write_bytes(b"video")
+        items.append(
+            {"input_path": str(tmp_path / name), "title": name, "playlist_ids": ["p"]}
+        )
+
+    pipeline.run_all(items)
+
+    youtube_api.post_upload.assert_called_once()
+    assert sorted(result.call.video_id for result in pipeline.post_upload_results) == [
+        "id-a.mp4",
+        "id-b.mp4",
+    ]
+
+
+def test_pipeline_updates_indexed_content_without_reuploading(tmp_path):
+    """Test that already uploaded content skips download, processing and upload."""
+    uploads = []
+    pipeline = _make_pipeline(tmp_path, uploads)
+    youtube_api = pipeline.youtube_api_factory()
+    youtube_api.indexed_video.side_effect = lambda key: "vid"
+    youtube_api.update_existing.return_value = "vid"
+    youtube_api.post_upload_calls.side_effect = YouTubeAPI.post_upload_calls
+    youtube_api.upload_index.pending.side_effect = lambda calls: calls[1:]
+    youtube_api.post_upload.side_effect = lambda calls: [
+        PostUploadResult(call=call, success=True) for call in calls
+    ]
+    downloader = pipeline.downloader_factory()
+    downloader.fetch_metadata.return_value.metadata = VideoMetadata(
+        title="Remote", description=""
+    )
+    item = {
+        "input_path": "https://youtu.be/x",
+        "is_youtube_url": True,
+        "title": "Fix",
+        "playlist_ids": ["old", "new"],
+    }
+
+    results = pipeline.run_all([item])
+
+    assert results[0].result == "vid"
+    downloader.download.assert_not_called()
+    pipeline.processor_factory().process_video.assert_not_called()
+    assert uploads == []
+    assert youtube_api.update_existing.call_args[0][1].title == "Fix"
+    # Only the playlist the video was not added to before
+    assert [r.call.target for r in pipeline.post_upload_results] == ["new"]
+
+    # Updates wait for quota like uploads do
+    scheduler = _scheduler(tmp_path, wait_for_reset=False)
+    scheduler.ledger.exhaust()
+    pipeline.quota_scheduler = scheduler
+    youtube_api.update_existing.reset_mock()
+    assert "quota" in pipeline.run_all([item])[0].error
+    youtube_api.update_existing.assert_not_called()
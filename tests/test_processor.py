@@ -1,11 +1,20 @@
 # tests/test_processor.py
+import os
+from contextlib import ExitStack
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from youtube_processor.core.processor import VideoProcessor
+from youtube_processor.config import settings
+from youtube_processor.core.processor import (
+    TailCut,
+    VideoProcessor,
+    _encoder_args,
+    is_concat_compatible,
+)
 from youtube_processor.exceptions import VideoProcessingError
+from youtube_processor.models import StreamSpec
 
 
 def test_processor_initialization(test_settings):
@@ -40,3 +49,250 @@ def test_process_video(test_settings, tmp_path):
 
         output_path = processor.process_video(input_path)
         assert output_path.exists()
+
+
+def _fake_concat(stream, output_path, desc):
+    output_path.write_bytes(b"video")
+
+
+def test_default_outputs_are_evicted_over_budget(monkeypatch):
+    """Test that outputs kept for retries are bounded by their budget."""
+    processor = VideoProcessor()
+    old = processor.work_dir / "processed_1_old.mp4"
+    new = processor.work_dir / "processed_2_new.mp4"
+    other = processor.work_dir / "notes.txt"
+    for path in (old, new, other):
+        path.write_bytes(b"x" * 10)
+    os.utime(old, (1, 1))
+    monkeypatch.setattr(settings, "PROCESSED_MAX_BYTES", 15)
+
+    assert processor.evict_outputs() == 10
+
+    assert not old.exists()
+    assert new.exists()
+    assert other.exists()
+
+
+def test_process_video_uses_isolated_workspace(test_settings, tmp_path):
+    """Test that jobs use scratch directories and reuse a source's output."""
+    processor = VideoProcessor()
+    processor.work_dir = tmp_path
+    input_path = tmp_path / "input.mp4"
+    input_path.touch()
+    spec = StreamSpec(width=1920, height=1080)
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(processor, "_probe_stream_spec", return_value=spec)
+        )
+        stack.enter_context(
+            patch.object(
+                processor.end_screen_cache,
+                "get_or_create",
+                return_value=tmp_path / "b.mp4",
+            )
+        )
+        mock_run = stack.enter_context(
+            patch.object(processor, "_run_ffmpeg_command", side_effect=_fake_concat)
+        )
+        first = processor.process_video(input_path)
+        second = processor.process_video(input_path)
+        input_path.write_bytes(b"changed")
+        third = processor.process_video(input_path)
+
+    assert first == second
+    assert third != first
+    assert mock_run.call_count == 2
+    assert first.read_bytes() == b"video"
+    assert not list(tmp_path.glob("job_*"))
+
+
+def test_process_video_cleans_up_on_failure(test_settings, tmp_path):
+    """Test that the workspace is removed and no output is left on failure."""
+    processor = VideoProcessor()
+    processor.work_dir = tmp_path
+    input_path = tmp_path / "input.mp4"
+    input_path.touch()
+    output_path = tmp_path / "out.mp4"
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(
+                processor,
+                "_probe_stream_spec",
+                return_value=StreamSpec(width=2, height=2),
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor.end_screen_cache,
+                "get_or_create",
+                return_value=tmp_path / "b.mp4",
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor, "_run_ffmpeg_command", side_effect=RuntimeError("boom")
+            )
+        )
+        with pytest.raises(VideoProcessingError):
+            processor.process_video(input_path, output_path)
+
+    assert not output_path.exists()
+    assert not list(tmp_path.glob("job_*"))
+
+
+def test_process_video_skips_probe_with_known_spec(test_settings, tmp_path):
+    """Test that a stream spec from yt-dlp replaces probing the file."""
+    processor = VideoProcessor()
+    processor.work_dir = tmp_path
+    input_path = tmp_path / "input.mp4"
+    input_path.touch()
+    spec = StreamSpec(width=1280, height=720, fps="30")
+
+    with ExitStack() as stack:
+        mock_probe = stack.enter_context(patch.object(processor, "_probe_stream_spec"))
+        mock_end_screen = stack.enter_context(
+            patch.object(
+                processor.end_screen_cache,
+                "get_or_create",
+                return_value=tmp_path / "b.mp4",
+            )
+        )
+        stack.enter_context(
+            patch.object(processor, "_run_ffmpeg_command", side_effect=_fake_concat)
+        )
+        processor.process_video(input_path, stream_spec=spec)
+
+    mock_probe.assert_not_called()
+    assert mock_end_screen.call_args[0][0] == spec
+
+
+def test_encoder_args_match_source_profile():
+    """Test that end screens are encoded with the source profile and audio."""
+    spec = StreamSpec(
+        width=1920,
+        height=1080,
+        profile="High",
+        level=41,
+        audio_codec="aac",
+        sample_rate=44100,
+        channels=1,
+    )
+
+    args = _encoder_args(spec)
+
+    assert args["vcodec"] == "libx264"
+    assert args["profile:v"] == "high"
+    assert args["level"] == "4.1"
+    assert (args["acodec"], args["ar"], args["ac"]) == ("aac", 44100, 1)
+
+
+def test_is_concat_compatible_detects_mismatch():
+    """Test that a differing profile or audio track prevents stream copy."""
+    source = StreamSpec(width=1280, height=720, profile="Main", audio_codec="aac")
+
+    assert is_concat_compatible(source, source.model_copy())
+    assert not is_concat_compatible(
+        source, source.model_copy(update={"profile": "High"})
+    )
+    assert not is_concat_compatible(
+        source, source.model_copy(update={"audio_codec": None})
+    )
+
+
+def test_smart_mode_reencodes_tail_and_verifies_output(test_settings, tmp_path):
+    """Test tail re-encoding and the full re-encode fallback in smart mode."""
+    processor = VideoProcessor(end_screen_mode="smart")
+    processor.work_dir = tmp_path
+    input_path = tmp_path / "input.mp4"
+    input_path.touch()
+    spec = StreamSpec(width=640, height=360, profile="Main")
+    steps = []
+
+    def run(stream, output_path, desc):
+        steps.append(desc)
+        output_path.write_bytes(b"video")
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(
+                processor, "_probe_tail", return_value=TailCut(58.0, 57.9, 57.9, 60.0)
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor.end_screen_cache,
+                "get_or_create",
+                return_value=tmp_path / "b.mp4",
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor.probe_cache,
+                "get_or_probe",
+                return_value=spec.model_copy(update={"profile": "High"}),
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor, "_probe_stream_spec", return_value=spec.model_copy()
+            )
+        )
+        mock_valid = stack.enter_context(
+            patch.object(processor, "_output_is_valid", return_value=False)
+        )
+        stack.enter_context(
+            patch.object(processor, "_run_ffmpeg_command", side_effect=run)
+        )
+        processor.process_video(input_path, tmp_path / "out.mp4", stream_spec=spec)
+
+    assert steps == ["tail re-encode", "video concatenation", "full re-encode"]
+    assert mock_valid.call_args[0][1] == 60.0 + test_settings.BLACK_SCREEN_DURATION
+
+
+def test_smart_mode_reencodes_all_when_tail_mismatches(test_settings, tmp_path):
+    """Test that a tail with other codec parameters is never joined by copy."""
+    processor = VideoProcessor(end_screen_mode="smart")
+    processor.work_dir = tmp_path
+    input_path = tmp_path / "input.mp4"
+    input_path.touch()
+    spec = StreamSpec(width=640, height=360, profile="Baseline", audio_codec="aac")
+    # The encoder only produces Constrained Baseline, for the clip and the tail
+    encoded = spec.model_copy(update={"profile": "Constrained Baseline"})
+    steps = []
+
+    def run(stream, output_path, desc):
+        steps.append(desc)
+        output_path.write_bytes(b"video")
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(
+                processor, "_probe_tail", return_value=TailCut(58.0, 57.9, 57.9, 60.0)
+            )
+        )
+        stack.enter_context(
+            patch.object(
+                processor.end_screen_cache,
+                "get_or_create",
+                return_value=tmp_path / "b.mp4",
+            )
+        )
+        stack.enter_context(
+            patch.object(processor.probe_cache, "get_or_probe", return_value=encoded)
+        )
+        mock_probe = stack.enter_context(
+            patch.object(processor, "_probe_stream_spec", return_value=encoded)
+        )
+        mock_concat = stack.enter_context(patch.object(processor, "_concat_plan"))
+        mock_valid = stack.enter_context(patch.object(processor, "_output_is_valid"))
+        stack.enter_context(
+            patch.object(processor, "_run_ffmpeg_command", side_effect=run)
+        )
+        processor.process_video(input_path, tmp_path / "out.mp4", stream_spec=spec)
+
+    assert mock_probe.call_args[0][0].name == "tail.mp4"
+    mock_concat.assert_not_called()
+    mock_valid.assert_not_called()
+    assert steps == ["tail re-encode", "video concatenation"]
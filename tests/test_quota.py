@@ -0,0 +1,100 @@
+import multiprocessing
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from youtube_processor.core.quota import QUOTA_TIMEZONE, QuotaLedger, QuotaScheduler
+from youtube_processor.exceptions import QuotaExceededError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = datetime(2025, 3, 1, 23, 0, tzinfo=QUOTA_TIMEZONE)
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def _fixed_clock():
+    return datetime(2025, 3, 1, 12, 0, tzinfo=QUOTA_TIMEZONE)
+
+
+def _charge_many(path, count=50):
+    ledger = QuotaLedger(path, daily_limit=10**6, project="p", clock=_fixed_clock)
+    for _ in range(count):
+        ledger.charge("videos.list")
+
+
+def _ledger(tmp_path, clock, daily_limit=3500):
+    return QuotaLedger(
+        tmp_path / "quota.json", daily_limit=daily_limit, project="p", clock=clock
+    )
+
+
+def test_ledger_persists_usage_per_project_and_day(tmp_path):
+    """Test that charges survive restarts and reset with the Pacific day."""
+    clock = _Clock()
+    ledger = _ledger(tmp_path, clock)
+    ledger.charge("videos.insert")
+    ledger.charge("thumbnails.set")
+
+    assert _ledger(tmp_path, clock).used() == 1650
+    assert QuotaLedger(tmp_path / "quota.json", project="other").used() == 0
+
+    ledger.charge("videos.insert")
+    with pytest.raises(QuotaExceededError) as error:
+        ledger.charge("videos.insert")
+    assert error.value.details["quota_reset_time"] == "2025-03-02T00:00:00-08:00"
+    assert error.value.details["retry_after"] == 3600
+    assert ledger.used() == 3250  # A refused charge is not recorded
+
+    clock.now += timedelta(hours=1)
+    assert ledger.remaining() == 3500
+
+
+def test_ledger_counts_concurrent_charges_from_other_ledgers(tmp_path):
+    """Test that charges from separate ledgers and threads are never lost."""
+    path = tmp_path / "quota.json"
+    threads = [threading.Thread(target=_charge_many, args=(path,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _ledger(tmp_path, _fixed_clock).used() == 200
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork and fcntl")
+def test_ledger_counts_concurrent_charges_from_other_processes(tmp_path):
+    """Test that processes sharing the ledger file charge one budget."""
+    path = tmp_path / "quota.json"
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        pool.map(_charge_many, [path] * 4)
+
+    assert _ledger(tmp_path, _fixed_clock).used() == 200
+
+
+def test_scheduler_defers_work_to_next_window(tmp_path):
+    """Test that work waits for the quota reset instead of failing."""
+    clock = _Clock()
+    ledger = _ledger(tmp_path, clock)
+    ledger.exhaust()
+    calls = []
+
+    def upload():
+        ledger.charge("videos.insert")
+        calls.append(clock())
+        return "id"
+
+    with pytest.raises(QuotaExceededError):
+        QuotaScheduler(ledger, wait_for_reset=False).run("videos.insert", upload)
+    assert calls == []
+
+    scheduler = QuotaScheduler(ledger, wait_for_reset=True, sleep=clock.sleep)
+    assert scheduler.run("videos.insert", upload) == "id"
+    assert calls == [datetime(2025, 3, 2, tzinfo=QUOTA_TIMEZONE)]
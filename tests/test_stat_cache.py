@@ -0,0 +1,39 @@
+import os
+
+from youtube_processor.core import stat_cache as stat_cache_module
+from youtube_processor.core.sessions import file_fingerprint
+from youtube_processor.core.stat_cache import StatCache
+
+
+def test_stat_cache_lists_each_directory_once(tmp_path, monkeypatch):
+    """Test that files are checked per directory and answered from the cache."""
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        for name in ("1.mp4", "2.mp4"):
+            (tmp_path / directory / name).write_bytes(b"x" * 10)
+    (tmp_path / "a" / "sub.mp4").mkdir()  # A directory is not a file
+    listed = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        listed.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(stat_cache_module.os, "scandir", counting_scandir)
+    cache = StatCache(max_workers=2)
+    paths = [tmp_path / d / n for d in ("a", "b") for n in ("1.mp4", "2.mp4")]
+    cache.prefetch(paths + [tmp_path / "a" / "sub.mp4", tmp_path / "c" / "x.mp4"])
+
+    assert sorted(listed) == [tmp_path / "a", tmp_path / "b"]
+    assert all(cache.is_file(path) for path in paths)
+    assert not cache.is_file(tmp_path / "a" / "sub.mp4")
+    assert not cache.is_file(tmp_path / "c" / "x.mp4")
+
+    (tmp_path / "a" / "1.mp4").write_bytes(b"changed")
+    stat = (tmp_path / "b" / "2.mp4").stat()
+    assert file_fingerprint(tmp_path / "b" / "2.mp4", cache) == {
+        "size": 10,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    assert cache.stat(tmp_path / "a" / "1.mp4").size == 10  # Cached for the run
+    assert len(listed) == 2
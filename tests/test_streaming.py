@@ -0,0 +1,79 @@
+import io
+import json
+
+import httplib2
+import pytest
+from googleapiclient.http import HttpRequest
+
+from youtube_processor.core.streaming import CHUNK_GRANULARITY, PipeMediaUpload
+
+
+class _ResumableServer:
+    """Records chunk uploads and acknowledges every byte it receives."""
+
+    def __init__(self):
+        self.ranges = []
+        self.data = b""
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if uri == "https://upload.test/videos":
+            return httplib2.Response({"status": 200, "location": "https://s/1"}), b""
+
+        self.ranges.append(headers.get("Content-Range"))
+        self.data += body
+        if not headers["Content-Range"].endswith("/*"):
+            return httplib2.Response({"status": 200}), b'{"id": "abc"}'
+        return (
+            httplib2.Response({"status": 308, "range": f"0-{len(self.data) - 1}"}),
+            b"",
+        )
+
+
+def _upload(payload, chunksize=CHUNK_GRANULARITY):
+    server = _ResumableServer()
+    media = PipeMediaUpload(io.BytesIO(payload), chunksize=chunksize)
+    request = HttpRequest(
+        server,
+        lambda resp, content: json.loads(content),
+        "https://upload.test/videos",
+        method="POST",
+        body="{}",
+        headers={"content-type": "application/json"},
+        resumable=media,
+    )
+
+    response = None
+    while response is None:
+        _, response = request.next_chunk()
+    return server, response
+
+
+def test_pipe_upload_sends_unknown_size_until_end():
+    """Test that only the final chunk carries the total size."""
+    payload = bytes(range(256)) * 2500  # 640000 bytes, a short last chunk
+
+    server, response = _upload(payload)
+
+    assert response == {"id": "abc"}
+    assert server.data == payload
+    assert server.ranges == [
+        "bytes 0-262143/*",
+        "bytes 262144-524287/*",
+        "bytes 524288-639999/640000",
+    ]
+
+
+def test_pipe_upload_finishes_on_exact_chunk_boundary():
+    """Test a stream whose length is an exact multiple of the chunk size."""
+    payload = b"x" * (CHUNK_GRANULARITY * 2)
+
+    server, _ = _upload(payload)
+
+    assert server.data == payload
+    assert server.ranges[-1] == "bytes 262144-524287/524288"
+
+
+def test_pipe_upload_rejects_unaligned_chunk_size():
+    """Test that chunk sizes must be multiples of 256KiB."""
+    with pytest.raises(ValueError):
+        PipeMediaUpload(io.BytesIO(b""), chunksize=1000)
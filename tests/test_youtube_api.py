@@ -0,0 +1,412 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import httplib2
+import pytest
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+
+from youtube_processor.core.client import YouTubeClientManager
+from youtube_processor.core.quota import QuotaLedger
+from youtube_processor.core.retry import RetryPolicy
+from youtube_processor.core.sessions import UploadSessionStore
+from youtube_processor.core.streaming import CHUNK_GRANULARITY
+from youtube_processor.core.upload_index import ChecksumCache, UploadIndex
+from youtube_processor.core.youtube_api import YouTubeAPI
+from youtube_processor.exceptions import VideoUploadError
+from youtube_processor.models import PostUploadCall, VideoMetadata
+
+
+def _credentials(expires_in):
+    credentials = Credentials(
+        token="token",
+        refresh_token="refresh",
+        client_id="client",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+    credentials.expiry = datetime.utcnow() + timedelta(seconds=expires_in)
+    return credentials
+
+
+def test_client_manager_refreshes_before_expiry(tmp_path):
+    """Test that tokens close to expiry are refreshed and saved proactively."""
+    token_path = tmp_path / "token.json"
+    token_path.write_text(_credentials(60).to_json())
+    manager = YouTubeClientManager(token_path=token_path, refresh_margin=300)
+
+    def refresh(credentials, request):
+        credentials.token = "fresh"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    with patch.object(Credentials, "refresh", autospec=True, side_effect=refresh):
+        first = manager.credentials
+        second = manager.credentials
+
+    assert first is second
+    assert first.token == "fresh"
+    assert '"fresh"' in token_path.read_text()
+
+
+def test_client_manager_builds_one_service_per_thread(tmp_path):
+    """Test that services are reused within a thread but not shared across."""
+    token_path = tmp_path / "token.json"
+    token_path.write_text(_credentials(3600).to_json())
+    manager = YouTubeClientManager(token_path=token_path)
+
+    services = []
+    thread = threading.Thread(target=lambda: services.append(manager.service()))
+    thread.start()
+    thread.join()
+
+    assert manager.service() is manager.service()
+    assert services[0] is not manager.service()
+    assert hasattr(manager.service(), "videos")
+
+
+class _FlakyUploadServer:
+    """Resumable upload endpoint that fails chosen chunk requests."""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)  # request number -> status code
+        self.requests = 0
+        self.ranges = []
+        self.data = b""
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if "upload/youtube" in uri:
+            return httplib2.Response({"status": 200, "location": "https://s/1"}), b""
+
+        self.requests += 1
+        content_range = headers["Content-Range"]
+        self.ranges.append(content_range)
+        if body:
+            # The server keeps what it received even when it then fails
+            self.data += body.read() if hasattr(body, "read") else body
+        status = self.failures.pop(self.requests, None)
+        if status is not None:
+            return httplib2.Response({"status": status}), b"{}"
+        total = content_range.rsplit("/", 1)[1]
+        if total != "*" and len(self.data) == int(total):
+            return httplib2.Response({"status": 200}), b'{"id": "abc"}'
+        return (
+            httplib2.Response({"status": 308, "range": f"0-{len(self.data) - 1}"}),
+            b"",
+        )
+
+
+def _api(http, tmp_path, root_url=None, max_retries=2):
+    manager = YouTubeClientManager(token_path=tmp_path / "token.json")
+    document = dict(manager._discovery_document())
+    if root_url is not None:
+        document["rootUrl"] = root_url
+    client_manager = MagicMock(spec=YouTubeClientManager)
+    client_manager.service.return_value = build_from_document(document, http=http)
+    return YouTubeAPI(
+        client_manager,
+        RetryPolicy(max_retries=max_retries, sleep=lambda s: None),
+        UploadSessionStore(tmp_path / "sessions.json"),
+        QuotaLedger(tmp_path / "quota.json", project="test"),
+        UploadIndex(tmp_path / "uploads.json"),
+    )
+
+
+def _upload(api, tmp_path, payload, progress=None):
+    video_path = tmp_path / "video.mp4"
+    if not video_path.exists():
+        video_path.write_bytes(payload)
+    metadata = VideoMetadata(title="Test", description="Test")
+    with patch("youtube_processor.core.youtube_api.settings") as settings:
+        settings.ADAPTIVE_UPLOAD_CHUNKS = False
+        settings.UPLOAD_CHUNK_SIZE = CHUNK_GRANULARITY
+        return api.upload_video(video_path, metadata, progress=progress)
+
+
+def test_upload_resumes_from_acknowledged_offset(tmp_path):
+    """Test that a transient failure resumes the session instead of restarting."""
+    payload = b"x" * (CHUNK_GRANULARITY * 3)
+    server = _FlakyUploadServer({2: 503})
+    progress = []
+
+    video_id = _upload(
+        _api(server, tmp_path),
+        tmp_path,
+        payload,
+        lambda sent, total: progress.append((sent, total)),
+    )
+
+    assert video_id == "abc"
+    assert server.data == payload
+    assert server.ranges == [
+        "bytes 0-262143/786432",
+        "bytes 262144-524287/786432",
+        "bytes */786432",  # Status query; the failed chunk had arrived
+        "bytes 524288-786431/786432",
+    ]
+    assert progress == [(262144, 786432), (786432, 786432)]
+
+
+def test_upload_gives_up_on_fatal_errors(tmp_path):
+    """Test that client errors are not retried."""
+    server = _FlakyUploadServer({1: 400})
+
+    with pytest.raises(VideoUploadError):
+        _upload(_api(server, tmp_path), tmp_path, b"x" * CHUNK_GRANULARITY)
+
+    assert server.requests == 1
+
+
+def test_retry_policy_classifies_errors():
+    """Test which errors count as transient."""
+    policy = RetryPolicy()
+
+    def http_error(status, reason=""):
+        content = f'{{"error": {{"errors": [{{"reason": "{reason}"}}]}}}}'
+        return HttpError(httplib2.Response({"status": status}), content.encode())
+
+    assert policy.is_retryable(http_error(503))
+    assert policy.is_retryable(http_error(403, "rateLimitExceeded"))
+    assert not policy.is_retryable(http_error(403, "forbidden"))
+    assert not policy.is_retryable(http_error(404))
+    assert policy.is_retryable(ConnectionResetError())
+    assert not policy.is_retryable(ValueError())
+
+
+class _ResumableHandler(BaseHTTPRequestHandler):
+    """Minimal local implementation of the resumable upload protocol."""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, headers=(), body=b""):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.server.initiations += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        location = f"http://127.0.0.1:{self.server.server_port}/session/1"
+        self._reply(200, [("Location", location)])
+
+    def do_PUT(self):
+        content_range = self.headers["Content-Range"]
+        self.server.ranges.append(content_range)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.data += body
+        total = int(content_range.rsplit("/", 1)[1])
+
+        if body and self.server.fail_after == len(self.server.ranges):
+            self._reply(503)  # Received the chunk, then died
+        elif len(self.server.data) == total:
+            self._reply(200, body=b'{"id": "abc"}')
+        elif self.server.data:
+            self._reply(308, [("Range", f"bytes=0-{len(self.server.data) - 1}")])
+        else:
+            self._reply(308)
+
+
+def test_upload_resumes_interrupted_session_after_restart(tmp_path):
+    """Test that a new client resumes an upload an earlier one left behind."""
+    payload = bytes(range(256)) * 3072  # 786432 bytes, three chunks
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ResumableHandler)
+    server.initiations, server.ranges, server.data = 0, [], b""
+    server.fail_after = 2
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root_url = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        with pytest.raises(VideoUploadError):
+            _upload(_api(build_http(), tmp_path, root_url, 0), tmp_path, payload)
+        store = UploadSessionStore(tmp_path / "sessions.json")
+        [(_, session)] = store.index.items()
+        assert session["bytes_acknowledged"] == CHUNK_GRANULARITY
+
+        api = _api(build_http(), tmp_path, root_url, 0)
+        video_id = _upload(api, tmp_path, payload)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert video_id == "abc"
+    assert server.initiations == 1
+    assert server.data == payload
+    assert server.ranges[2:] == ["bytes */786432", "bytes 524288-786431/786432"]
+    assert store.index.items() == []
+
+
+class _BatchServer:
+    """Answers batch requests part by part; playlist "gone" does not exist."""
+
+    def __init__(self, flaky):
+        self.flaky = set(flaky)  # playlists failing once with 503
+        self.batches = []
+        self.thumbnails = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if "thumbnails/set" in uri:
+            self.thumbnails.append(uri)
+            return httplib2.Response({"status": 200}), b"{}"
+
+        message = Parser().parsestr(
+            f"content-type: {headers['content-type']}\r\n\r\n{body}"
+        )
+        parts, playlists = [], []
+        for part in message.get_payload():
+            request = part.get_payload()
+            payload = request[request.index("{") :]
+            playlist = json.loads(payload)["snippet"]["playlistId"]
+            playlists.append(playlist)
+            if playlist in self.flaky:
+                self.flaky.discard(playlist)
+                status = "503 Service Unavailable"
+            elif playlist == "gone":
+                status = "404 Not Found"
+            else:
+                status = "200 OK"
+            parts.append(
+                f"--b\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:]}\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{{}}"
+            )
+        self.batches.append(playlists)
+        content = "\r\n".join(parts) + "\r\n--b--"
+        response = {"status": 200, "content-type": 'multipart/mixed; boundary="b"'}
+        return httplib2.Response(response), content.encode()
+
+
+def test_post_upload_batches_playlist_calls(tmp_path):
+    """Test that playlist calls share batch requests with per-call results."""
+    server = _BatchServer(flaky={"p2"})
+    api = _api(server, tmp_path)
+    thumbnail = tmp_path / "thumb.jpg"
+    thumbnail.write_bytes(b"jpeg")
+    calls = api.post_upload_calls(
+        "v1",
+        VideoMetadata(
+            title="A",
+            description="",
+            playlist_ids=["p1", "p2", "gone"],
+            thumbnail_path=thumbnail,
+        ),
+    ) + [PostUploadCall(method="playlistItems.insert", video_id="v2", target="p1")]
+
+    results = api.post_upload(calls, batch_size=3)
+
+    # Inserts are not idempotent, so the part failing with 503 is not resent
+    assert server.batches == [["p1", "p2", "gone"], ["p1"]]
+    assert len(server.thumbnails) == 1
+    assert [result.success for result in results] == [True, False, False, True, True]
+    assert "503" in results[1].error
+    assert "404" in results[2].error
+    assert api.quota.used() == 4 * 50 + 50
+
+
+class _RecordingServer:
+    def __init__(self):
+        self.requests = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.requests.append((method, uri, json.loads(body) if body else None))
+        return httplib2.Response({"status": 200}), b"{}"
+
+
+def test_upload_of_indexed_content_updates_changed_parts_only(tmp_path):
+    """Test that known content gets a small videos.update, not an upload."""
+    server = _RecordingServer()
+    api = _api(server, tmp_path)
+    metadata = VideoMetadata(title="Old", description="Same")
+    api.upload_index.record("key", "vid", api._video_body(metadata))
+    video_path = tmp_path / "missing.mp4"  # Never read
+
+    assert api.upload_video(video_path, metadata, index_key="key") == "vid"
+    assert server.requests == []
+
+    fixed = metadata.model_copy(update={"title": "New"})
+    assert api.upload_video(video_path, fixed, index_key="key") == "vid"
+
+    [(method, uri, body)] = server.requests
+    assert method == "PUT"
+    assert "part=snippet&" in uri
+    assert body["id"] == "vid"
+    assert body["snippet"]["title"] == "New"
+    assert "status" not in body
+    assert api.upload_index.lookup("key")["body"]["snippet"]["title"] == "New"
+    assert api.quota.used() == 50
+
+
+def test_manifest_upload_settings_reach_the_request_body(tmp_path):
+    """Test that privacy and license settings are sent, others left out."""
+    server = _RecordingServer()
+    api = _api(server, tmp_path)
+    metadata = VideoMetadata(title="Same", description="Same")
+    api.upload_index.record("key", "vid", api._video_body(metadata))
+    assert "license" not in api._video_body(metadata)["status"]
+
+    public = metadata.model_copy(
+        update={"privacy_status": "public", "license": "creativeCommons"}
+    )
+    assert api.upload_video(tmp_path / "missing.mp4", public, index_key="key")
+
+    [(_, uri, body)] = server.requests
+    assert "part=status&" in uri
+    assert body["status"]["privacyStatus"] == "public"
+    assert body["status"]["license"] == "creativeCommons"
+    assert "snippet" not in body
+
+
+def test_post_upload_calls_are_not_repeated_for_the_same_video(tmp_path):
+    """Test that a rerun skips playlist insertions that already succeeded."""
+    server = _BatchServer(flaky=set())
+    api = _api(server, tmp_path)
+    api.upload_index.record("key", "v1", {})
+    metadata = VideoMetadata(title="A", description="", playlist_ids=["p1"])
+
+    calls = api.post_upload_calls("v1", metadata, index_key="key")
+    api.post_upload(api.upload_index.pending(calls))
+    api.upload_index.record("key", "v1", {"snippet": {"title": "B"}})
+    more = metadata.model_copy(update={"playlist_ids": ["p1", "p2"]})
+    pending = api.upload_index.pending(api.post_upload_calls("v1", more, "key"))
+
+    assert [call.target for call in pending] == ["p2"]
+    # A re-uploaded video starts over
+    api.upload_index.record("key", "v2", {})
+    assert len(api.upload_index.pending(api.post_upload_calls("v2", more, "key"))) == 2
+
+
+def test_checksum_cache_hashes_files_once_per_version(tmp_path):
+    """Test that unchanged files are not hashed again."""
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"video")
+    checksums = ChecksumCache(tmp_path / "checksums.json")
+
+    with patch(
+        "youtube_processor.core.upload_index.file_checksum", return_value="abc"
+    ) as mock_checksum:
+        assert checksums.checksum(video) == "abc"
+        assert ChecksumCache(tmp_path / "checksums.json").checksum(video) == "abc"
+        video.write_bytes(b"edited")
+        checksums.checksum(video)
+
+    assert mock_checksum.call_count == 2
+
+
+def test_default_stores_stay_out_of_the_project(tmp_path):
+    """Test that tests never share the real upload index or quota ledger."""
+    stores = [
+        ChecksumCache(),
+        UploadIndex(),
+        QuotaLedger(project="test"),
+        UploadSessionStore(),
+    ]
+
+    assert all(tmp_path in store.path.parents for store in stores)